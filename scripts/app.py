@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
-import pydeck as pdk
+
+from who_data import (
+    DATA_SOURCE, PERIODS, BackgroundRefresher, EventMap, EventStore, FeedTemplate, FilteredViews, Theme,
+    degraded_notice, facet_format, live_badge, prepare_events, source_from_uri,
+)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # WHO SIGNAL INTELLIGENCE DASHBOARD - STREAMLIT VERSION
@@ -14,9 +18,8 @@ st.set_page_config(
     page_icon="🌍"
 )
 
-@st.cache_data(ttl=1800)
 def load_data():
-    """Load WHO event data - Real African disease outbreak data including recent Malawi cholera case"""
+    """Sample events, served when WHO_DATA_SOURCE is not set"""
     data = {
         'country': ['Malawi', 'Mozambique', 'Nigeria', 'Democratic Republic of the Congo', 'Uganda', 'South Africa', 
                     'Ethiopia', 'Kenya', 'Ghana', 'Somalia', 'Zimbabwe', 'Tanzania', 'Cameroon', 'Zambia', 
@@ -72,11 +75,38 @@ def load_data():
                         '2025-12-18', '2025-12-15']
     }
     
-    df = pd.DataFrame(data)
-    df['report_date'] = pd.to_datetime(df['report_date'])
-    return df
+    return prepare_events(pd.DataFrame(data))
+
+REFRESH_TTL = 1800   # seconds a pull of the data stays fresh
+REFRESH_LEAD = 120   # start re-pulling this long before it expires
+REFRESH_MIN_INTERVAL = 60   # concurrent or repeated refreshes within this window share one pull
+VIEW_CACHE_BUDGET = 256 * 2**20   # bytes of filtered tables kept for reuse across sessions
+
+@st.cache_resource
+def get_store():
+    """Process-wide event table kept fresh by a background refresher"""
+    if DATA_SOURCE:
+        # A cold start during an outage serves the source's snapshot on disk, with the degraded notice
+        source = source_from_uri(DATA_SOURCE, prepare=prepare_events)
+        store = EventStore(source.load, ttl=REFRESH_TTL, min_interval=REFRESH_MIN_INTERVAL,
+                           checked_at=lambda: source.checked_at, fallback=source.cached)
+    else:
+        store = EventStore(load_data, ttl=REFRESH_TTL, min_interval=REFRESH_MIN_INTERVAL)
+    BackgroundRefresher(store, lead=REFRESH_LEAD).start()
+    return store
+
+@st.cache_resource
+def get_views():
+    """Filtered tables shared by every session, keyed by snapshot version and selection"""
+    return FilteredViews(get_store(), budget=VIEW_CACHE_BUDGET)
 
-df = load_data()
+store = get_store()
+views = get_views()
+try:
+    df = store.current()
+except Exception as e:
+    st.error(f"The WHO data source could not be reached and no snapshot is saved yet: {e}")
+    st.stop()
 
 if 'theme' not in st.session_state:
     st.session_state.theme = 'light'
@@ -84,242 +114,318 @@ if 'theme' not in st.session_state:
 def toggle_theme():
     st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
 
-if st.session_state.theme == 'light':
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    html, body, .stApp { background: #e8eef5 !important; font-family: 'Inter', sans-serif; color: #2c3e50; }
-    .block-container { padding: 0.5rem 1.5rem 1rem 1.5rem !important; padding-top: 0 !important; max-width: 100% !important; padding-right: 300px !important; }
-    header, footer, #MainMenu, div[data-testid="stToolbar"] { display: none !important; }
-    
-    section[data-testid="stSidebar"] {
-        position: fixed !important; left: 10px; top: 10px; bottom: 10px; width: 280px;
-        background: #e8eef5 !important; border-radius: 16px; 
-        box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
-        padding: 1rem; overflow-y: auto; z-index: 10;
-    }
-    section[data-testid="stSidebar"]::-webkit-scrollbar { width: 6px; }
-    section[data-testid="stSidebar"]::-webkit-scrollbar-track { background: transparent; }
-    section[data-testid="stSidebar"]::-webkit-scrollbar-thumb { background: rgba(255,255,255,0.4); border-radius: 3px; }
-    
-    .sidebar-title { color: #0056b3; font-size: 12px; font-weight: 700; text-transform: uppercase; letter-spacing: 1px; margin: 0.75rem 0 0.5rem 0; }
-    
-    .header-bar {
-        background: #e8eef5; border-radius: 16px; box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
-        padding: 0.75rem 1.25rem; margin-bottom: 1rem; margin-left: 300px; 
-        display: flex; align-items: center; justify-content: space-between;
-    }
-    .header-title { font-size: 18px; font-weight: 700; color: #2c3e50; }
-    .header-sub { font-size: 11px; color: #6a7a94; margin-top: 2px; }
-    .live-badge {
-        background: linear-gradient(135deg, #00c853, #00e676); color: white;
-        font-size: 10px; font-weight: 600; padding: 4px 10px; border-radius: 12px;
-        box-shadow: 2px 2px 6px rgba(0,200,83,0.2);
-    }
-    
-    .metrics-row { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.75rem; margin-bottom: 1rem; margin-left: 300px; }
-    .metric-card { 
-        background: #e8eef5; border-radius: 14px; 
-        box-shadow: 5px 5px 10px #d1d9e6, -5px -5px 10px #ffffff; 
-        padding: 1rem; text-align: center; 
-    }
-    .metric-value { font-size: 28px; font-weight: 700; color: #009edb; line-height: 1.2; }
-    .metric-label { font-size: 12px; color: #6a7a94; text-transform: uppercase; letter-spacing: 0.5px; margin-top: 4px; }
-    
-    .map-container {
-        background: #e8eef5; border-radius: 16px; 
-        box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
-        padding: 1rem; margin-bottom: 1rem; margin-left: 300px;
-    }
-    
-    .right-sidebar {
-        position: fixed; right: 10px; top: 10px; bottom: 80px; width: 280px;
-        background: #e8eef5; border-radius: 16px; 
-        box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
-        padding: 1rem; overflow-y: auto; z-index: 10;
-    }
-    .right-sidebar::-webkit-scrollbar { width: 6px; }
-    .right-sidebar::-webkit-scrollbar-track { background: transparent; }
-    .right-sidebar::-webkit-scrollbar-thumb { background: rgba(255,255,255,0.3); border-radius: 3px; }
-    
-    .right-sidebar-title { 
-        color: #0056b3; font-size: 12px; font-weight: 700; text-transform: uppercase; 
-        letter-spacing: 1px; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 2px solid #d1d9e6; 
-    }
-    
-    .signal-item { padding: 0.75rem 0; border-bottom: 1px solid #d1d9e6; }
-    .signal-item:last-child { border-bottom: none; }
-    .signal-num {
-        display: inline-flex; align-items: center; justify-content: center;
-        width: 20px; height: 20px; background: linear-gradient(135deg, #009edb, #0056b3);
-        color: white; font-size: 10px; font-weight: 700; border-radius: 50%;
-        margin-right: 8px; flex-shrink: 0;
-    }
-    .signal-country-text { font-size: 11px; font-weight: 600; color: #0056b3; text-transform: uppercase; }
-    .signal-disease-text { font-size: 12px; font-weight: 600; color: #2c3e50; margin: 4px 0 4px 28px; }
-    .signal-meta { font-size: 9px; color: #6a7a94; margin-left: 28px; margin-bottom: 4px; }
-    .signal-desc { font-size: 10px; color: #5a6a7a; line-height: 1.4; margin-left: 28px; }
-    .signal-grade-badge { 
-        display: inline-block; font-size: 9px; padding: 2px 6px; 
-        border-radius: 4px; margin-left: 28px; margin-top: 4px; 
-    }
-    .sg3-badge { background: rgba(255,51,85,0.15); color: #ff3355; }
-    .sg2-badge { background: rgba(255,153,51,0.15); color: #ff9933; }
-    .sg1-badge { background: rgba(255,204,0,0.15); color: #cc9900; }
-    
-    .ticker-wrapper {
-        position: fixed; bottom: 10px; left: 310px; right: 300px;
-        background: #e8eef5; border-radius: 12px; 
-        box-shadow: 5px 5px 10px #d1d9e6, -5px -5px 10px #ffffff;
-        padding: 10px 20px; overflow: hidden; z-index: 15;
-    }
-    .ticker-content {
-        display: inline-block; white-space: nowrap; animation: scroll 30s linear infinite;
-        font-family: 'Inter', sans-serif; font-size: 12px; color: #0056b3; font-weight: 600;
-    }
-    
-    @keyframes scroll { 0% { transform: translateX(0); } 100% { transform: translateX(-50%); } }
-    
-    div[data-baseweb="select"] > div {
-        background: #e8eef5 !important; border: none !important;
-        box-shadow: inset 3px 3px 6px #d1d9e6, inset -3px -3px 6px #ffffff !important;
-        color: #2c3e50 !important;
-    }
-    .stButton > button {
-        background: #e8eef5 !important; color: #009edb !important; border: none !important;
-        border-radius: 8px !important; box-shadow: 3px 3px 6px #d1d9e6, -3px -3px 6px #ffffff !important;
-        font-size: 11px !important; padding: 6px 12px !important; font-weight: 600 !important;
-    }
-    .stButton > button:hover { box-shadow: 2px 2px 4px #d1d9e6, -2px -2px 4px #ffffff !important; }
-    </style>
-    """, unsafe_allow_html=True)
-else:
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    html, body, .stApp { background: #0f1419 !important; font-family: 'Inter', sans-serif; color: #e2e8f0; }
-    .block-container { padding: 0.5rem 1.5rem 1rem 1.5rem !important; padding-top: 0 !important; max-width: 100% !important; padding-right: 300px !important; }
-    header, footer, #MainMenu, div[data-testid="stToolbar"] { display: none !important; }
-    
-    section[data-testid="stSidebar"] {
-        position: fixed !important; left: 10px; top: 10px; bottom: 10px; width: 280px;
-        background: #1a1f26 !important; border-radius: 16px; border: 1px solid #2a3441;
-        padding: 1rem; overflow-y: auto; z-index: 10;
-    }
-    section[data-testid="stSidebar"]::-webkit-scrollbar { width: 6px; }
-    section[data-testid="stSidebar"]::-webkit-scrollbar-track { background: transparent; }
-    section[data-testid="stSidebar"]::-webkit-scrollbar-thumb { background: rgba(59,130,246,0.3); border-radius: 3px; }
-    
-    .sidebar-title { color: #3b82f6; font-size: 12px; font-weight: 700; text-transform: uppercase; letter-spacing: 1px; margin: 0.75rem 0 0.5rem 0; }
-    
-    .header-bar {
-        background: #1a1f26; border-radius: 16px; border: 1px solid #2a3441;
-        padding: 0.75rem 1.25rem; margin-bottom: 1rem; margin-left: 300px;
-        display: flex; align-items: center; justify-content: space-between;
-    }
-    .header-title { font-size: 18px; font-weight: 700; color: #e2e8f0; }
-    .header-sub { font-size: 11px; color: #94a3b8; margin-top: 2px; }
-    .live-badge {
-        background: linear-gradient(135deg, #00c853, #00e676); color: white;
-        font-size: 10px; font-weight: 600; padding: 4px 10px; border-radius: 12px;
-        box-shadow: 0 0 10px rgba(0,200,83,0.3);
-    }
-    
-    .metrics-row { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.75rem; margin-bottom: 1rem; margin-left: 300px; }
-    .metric-card { 
-        background: #1a1f26; border-radius: 14px; border: 1px solid #2a3441;
-        padding: 1rem; text-align: center; 
-    }
-    .metric-value { font-size: 28px; font-weight: 700; color: #3b82f6; line-height: 1.2; }
-    .metric-label { font-size: 12px; color: #94a3b8; text-transform: uppercase; letter-spacing: 0.5px; margin-top: 4px; }
-    
-    .map-container {
-        background: #1a1f26; border-radius: 16px; border: 1px solid #2a3441;
-        padding: 1rem; margin-bottom: 1rem; margin-left: 300px;
-    }
-    
-    .right-sidebar {
-        position: fixed; right: 10px; top: 10px; bottom: 80px; width: 280px;
-        background: #1a1f26; border-radius: 16px; border: 1px solid #2a3441;
-        padding: 1rem; overflow-y: auto; z-index: 10;
-    }
-    .right-sidebar::-webkit-scrollbar { width: 6px; }
-    .right-sidebar::-webkit-scrollbar-track { background: transparent; }
-    .right-sidebar::-webkit-scrollbar-thumb { background: rgba(59,130,246,0.3); border-radius: 3px; }
-    
-    .right-sidebar-title { 
-        color: #3b82f6; font-size: 12px; font-weight: 700; text-transform: uppercase; 
-        letter-spacing: 1px; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 1px solid #2a3441; 
-    }
-    
-    .signal-item { padding: 0.75rem 0; border-bottom: 1px solid #2a3441; }
-    .signal-item:last-child { border-bottom: none; }
-    .signal-num {
-        display: inline-flex; align-items: center; justify-content: center;
-        width: 20px; height: 20px; background: linear-gradient(135deg, #3b82f6, #2563eb);
-        color: white; font-size: 10px; font-weight: 700; border-radius: 50%;
-        margin-right: 8px; flex-shrink: 0;
-    }
-    .signal-country-text { font-size: 11px; font-weight: 600; color: #3b82f6; text-transform: uppercase; }
-    .signal-disease-text { font-size: 12px; font-weight: 600; color: #e2e8f0; margin: 4px 0 4px 28px; }
-    .signal-meta { font-size: 9px; color: #94a3b8; margin-left: 28px; margin-bottom: 4px; }
-    .signal-desc { font-size: 10px; color: #94a3b8; line-height: 1.4; margin-left: 28px; }
-    .signal-grade-badge { 
-        display: inline-block; font-size: 9px; padding: 2px 6px; 
-        border-radius: 4px; margin-left: 28px; margin-top: 4px; 
-    }
-    .sg3-badge { background: rgba(255,51,85,0.2); color: #ff3355; }
-    .sg2-badge { background: rgba(255,153,51,0.2); color: #ff9933; }
-    .sg1-badge { background: rgba(255,204,0,0.2); color: #ffcc00; }
-    
-    .ticker-wrapper {
-        position: fixed; bottom: 10px; left: 310px; right: 300px;
-        background: #1a1f26; border-radius: 12px; border: 1px solid #2a3441;
-        padding: 10px 20px; overflow: hidden; z-index: 15;
-    }
-    .ticker-content {
-        display: inline-block; white-space: nowrap; animation: scroll 30s linear infinite;
-        font-family: 'Inter', sans-serif; font-size: 12px; color: #3b82f6; font-weight: 600;
-    }
-    
-    @keyframes scroll { 0% { transform: translateX(0); } 100% { transform: translateX(-50%); } }
-    
-    div[data-baseweb="select"] > div {
-        background: #0f1419 !important; border: 1px solid #2a3441 !important;
-        color: #e2e8f0 !important;
-    }
-    .stButton > button {
-        background: #1a1f26 !important; color: #3b82f6 !important; border: 1px solid #2a3441 !important;
-        border-radius: 8px !important; font-size: 11px !important; padding: 6px 12px !important; font-weight: 600 !important;
-    }
-    .stButton > button:hover { border-color: #3b82f6 !important; }
-    </style>
-    """, unsafe_allow_html=True)
+LIGHT_CSS = """
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
 
-with st.sidebar:
+html, body, .stApp { background: #e8eef5 !important; font-family: 'Inter', sans-serif; color: #2c3e50; }
+.block-container { padding: 0.5rem 1.5rem 1rem 1.5rem !important; padding-top: 0 !important; max-width: 100% !important; padding-right: 300px !important; }
+header, footer, #MainMenu, div[data-testid="stToolbar"] { display: none !important; }
+
+section[data-testid="stSidebar"] {
+    position: fixed !important; left: 10px; top: 10px; bottom: 10px; width: 280px;
+    background: #e8eef5 !important; border-radius: 16px; 
+    box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
+    padding: 1rem; overflow-y: auto; z-index: 10;
+}
+section[data-testid="stSidebar"]::-webkit-scrollbar { width: 6px; }
+section[data-testid="stSidebar"]::-webkit-scrollbar-track { background: transparent; }
+section[data-testid="stSidebar"]::-webkit-scrollbar-thumb { background: rgba(255,255,255,0.4); border-radius: 3px; }
+
+.sidebar-title { color: #0056b3; font-size: 12px; font-weight: 700; text-transform: uppercase; letter-spacing: 1px; margin: 0.75rem 0 0.5rem 0; }
+
+.header-bar {
+    background: #e8eef5; border-radius: 16px; box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
+    padding: 0.75rem 1.25rem; margin-bottom: 1rem; margin-left: 300px; 
+    display: flex; align-items: center; justify-content: space-between;
+}
+.header-title { font-size: 18px; font-weight: 700; color: #2c3e50; }
+.header-sub { font-size: 11px; color: #6a7a94; margin-top: 2px; }
+.live-badge {
+    background: linear-gradient(135deg, #00c853, #00e676); color: white;
+    font-size: 10px; font-weight: 600; padding: 4px 10px; border-radius: 12px;
+    box-shadow: 2px 2px 6px rgba(0,200,83,0.2);
+}
+.live-badge.stale { background: linear-gradient(135deg, #ff9933, #ffb366); box-shadow: none; }
+
+.metrics-row { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.75rem; margin-bottom: 1rem; margin-left: 300px; }
+.metric-card { 
+    background: #e8eef5; border-radius: 14px; 
+    box-shadow: 5px 5px 10px #d1d9e6, -5px -5px 10px #ffffff; 
+    padding: 1rem; text-align: center; 
+}
+.metric-value { font-size: 28px; font-weight: 700; color: #009edb; line-height: 1.2; }
+.metric-label { font-size: 12px; color: #6a7a94; text-transform: uppercase; letter-spacing: 0.5px; margin-top: 4px; }
+
+.map-container {
+    background: #e8eef5; border-radius: 16px; 
+    box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
+    padding: 1rem; margin-bottom: 1rem; margin-left: 300px;
+}
+
+.right-sidebar {
+    position: fixed; right: 10px; top: 10px; bottom: 80px; width: 280px;
+    background: #e8eef5; border-radius: 16px; 
+    box-shadow: 6px 6px 12px #d1d9e6, -6px -6px 12px #ffffff;
+    padding: 1rem; overflow-y: auto; z-index: 10;
+}
+.right-sidebar::-webkit-scrollbar { width: 6px; }
+.right-sidebar::-webkit-scrollbar-track { background: transparent; }
+.right-sidebar::-webkit-scrollbar-thumb { background: rgba(255,255,255,0.3); border-radius: 3px; }
+
+.right-sidebar-title { 
+    color: #0056b3; font-size: 12px; font-weight: 700; text-transform: uppercase; 
+    letter-spacing: 1px; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 2px solid #d1d9e6; 
+}
+
+.signal-item { padding: 0.75rem 0; border-bottom: 1px solid #d1d9e6; }
+.signal-item:last-child { border-bottom: none; }
+.signal-num {
+    display: inline-flex; align-items: center; justify-content: center;
+    width: 20px; height: 20px; background: linear-gradient(135deg, #009edb, #0056b3);
+    color: white; font-size: 10px; font-weight: 700; border-radius: 50%;
+    margin-right: 8px; flex-shrink: 0;
+}
+.signal-country-text { font-size: 11px; font-weight: 600; color: #0056b3; text-transform: uppercase; }
+.signal-disease-text { font-size: 12px; font-weight: 600; color: #2c3e50; margin: 4px 0 4px 28px; }
+.signal-meta { font-size: 9px; color: #6a7a94; margin-left: 28px; margin-bottom: 4px; }
+.signal-desc { font-size: 10px; color: #5a6a7a; line-height: 1.4; margin-left: 28px; }
+.signal-grade-badge { 
+    display: inline-block; font-size: 9px; padding: 2px 6px; 
+    border-radius: 4px; margin-left: 28px; margin-top: 4px; 
+}
+.sg3-badge { background: rgba(255,51,85,0.15); color: #ff3355; }
+.sg2-badge { background: rgba(255,153,51,0.15); color: #ff9933; }
+.sg1-badge { background: rgba(255,204,0,0.15); color: #cc9900; }
+
+.ticker-wrapper {
+    position: fixed; bottom: 10px; left: 310px; right: 300px;
+    background: #e8eef5; border-radius: 12px; 
+    box-shadow: 5px 5px 10px #d1d9e6, -5px -5px 10px #ffffff;
+    padding: 10px 20px; overflow: hidden; z-index: 15;
+}
+.ticker-content {
+    display: inline-block; white-space: nowrap; animation: scroll 30s linear infinite;
+    font-family: 'Inter', sans-serif; font-size: 12px; color: #0056b3; font-weight: 600;
+}
+
+@keyframes scroll { 0% { transform: translateX(0); } 100% { transform: translateX(-50%); } }
+
+div[data-baseweb="select"] > div {
+    background: #e8eef5 !important; border: none !important;
+    box-shadow: inset 3px 3px 6px #d1d9e6, inset -3px -3px 6px #ffffff !important;
+    color: #2c3e50 !important;
+}
+.stButton > button {
+    background: #e8eef5 !important; color: #009edb !important; border: none !important;
+    border-radius: 8px !important; box-shadow: 3px 3px 6px #d1d9e6, -3px -3px 6px #ffffff !important;
+    font-size: 11px !important; padding: 6px 12px !important; font-weight: 600 !important;
+}
+.stButton > button:hover { box-shadow: 2px 2px 4px #d1d9e6, -2px -2px 4px #ffffff !important; }
+"""
+
+DARK_CSS = """
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
+
+html, body, .stApp { background: #0f1419 !important; font-family: 'Inter', sans-serif; color: #e2e8f0; }
+.block-container { padding: 0.5rem 1.5rem 1rem 1.5rem !important; padding-top: 0 !important; max-width: 100% !important; padding-right: 300px !important; }
+header, footer, #MainMenu, div[data-testid="stToolbar"] { display: none !important; }
+
+section[data-testid="stSidebar"] {
+    position: fixed !important; left: 10px; top: 10px; bottom: 10px; width: 280px;
+    background: #1a1f26 !important; border-radius: 16px; border: 1px solid #2a3441;
+    padding: 1rem; overflow-y: auto; z-index: 10;
+}
+section[data-testid="stSidebar"]::-webkit-scrollbar { width: 6px; }
+section[data-testid="stSidebar"]::-webkit-scrollbar-track { background: transparent; }
+section[data-testid="stSidebar"]::-webkit-scrollbar-thumb { background: rgba(59,130,246,0.3); border-radius: 3px; }
+
+.sidebar-title { color: #3b82f6; font-size: 12px; font-weight: 700; text-transform: uppercase; letter-spacing: 1px; margin: 0.75rem 0 0.5rem 0; }
+
+.header-bar {
+    background: #1a1f26; border-radius: 16px; border: 1px solid #2a3441;
+    padding: 0.75rem 1.25rem; margin-bottom: 1rem; margin-left: 300px;
+    display: flex; align-items: center; justify-content: space-between;
+}
+.header-title { font-size: 18px; font-weight: 700; color: #e2e8f0; }
+.header-sub { font-size: 11px; color: #94a3b8; margin-top: 2px; }
+.live-badge {
+    background: linear-gradient(135deg, #00c853, #00e676); color: white;
+    font-size: 10px; font-weight: 600; padding: 4px 10px; border-radius: 12px;
+    box-shadow: 0 0 10px rgba(0,200,83,0.3);
+}
+.live-badge.stale { background: linear-gradient(135deg, #ff9933, #ffb366); box-shadow: none; }
+
+.metrics-row { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.75rem; margin-bottom: 1rem; margin-left: 300px; }
+.metric-card { 
+    background: #1a1f26; border-radius: 14px; border: 1px solid #2a3441;
+    padding: 1rem; text-align: center; 
+}
+.metric-value { font-size: 28px; font-weight: 700; color: #3b82f6; line-height: 1.2; }
+.metric-label { font-size: 12px; color: #94a3b8; text-transform: uppercase; letter-spacing: 0.5px; margin-top: 4px; }
+
+.map-container {
+    background: #1a1f26; border-radius: 16px; border: 1px solid #2a3441;
+    padding: 1rem; margin-bottom: 1rem; margin-left: 300px;
+}
+
+.right-sidebar {
+    position: fixed; right: 10px; top: 10px; bottom: 80px; width: 280px;
+    background: #1a1f26; border-radius: 16px; border: 1px solid #2a3441;
+    padding: 1rem; overflow-y: auto; z-index: 10;
+}
+.right-sidebar::-webkit-scrollbar { width: 6px; }
+.right-sidebar::-webkit-scrollbar-track { background: transparent; }
+.right-sidebar::-webkit-scrollbar-thumb { background: rgba(59,130,246,0.3); border-radius: 3px; }
+
+.right-sidebar-title { 
+    color: #3b82f6; font-size: 12px; font-weight: 700; text-transform: uppercase; 
+    letter-spacing: 1px; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 1px solid #2a3441; 
+}
+
+.signal-item { padding: 0.75rem 0; border-bottom: 1px solid #2a3441; }
+.signal-item:last-child { border-bottom: none; }
+.signal-num {
+    display: inline-flex; align-items: center; justify-content: center;
+    width: 20px; height: 20px; background: linear-gradient(135deg, #3b82f6, #2563eb);
+    color: white; font-size: 10px; font-weight: 700; border-radius: 50%;
+    margin-right: 8px; flex-shrink: 0;
+}
+.signal-country-text { font-size: 11px; font-weight: 600; color: #3b82f6; text-transform: uppercase; }
+.signal-disease-text { font-size: 12px; font-weight: 600; color: #e2e8f0; margin: 4px 0 4px 28px; }
+.signal-meta { font-size: 9px; color: #94a3b8; margin-left: 28px; margin-bottom: 4px; }
+.signal-desc { font-size: 10px; color: #94a3b8; line-height: 1.4; margin-left: 28px; }
+.signal-grade-badge { 
+    display: inline-block; font-size: 9px; padding: 2px 6px; 
+    border-radius: 4px; margin-left: 28px; margin-top: 4px; 
+}
+.sg3-badge { background: rgba(255,51,85,0.2); color: #ff3355; }
+.sg2-badge { background: rgba(255,153,51,0.2); color: #ff9933; }
+.sg1-badge { background: rgba(255,204,0,0.2); color: #ffcc00; }
+
+.ticker-wrapper {
+    position: fixed; bottom: 10px; left: 310px; right: 300px;
+    background: #1a1f26; border-radius: 12px; border: 1px solid #2a3441;
+    padding: 10px 20px; overflow: hidden; z-index: 15;
+}
+.ticker-content {
+    display: inline-block; white-space: nowrap; animation: scroll 30s linear infinite;
+    font-family: 'Inter', sans-serif; font-size: 12px; color: #3b82f6; font-weight: 600;
+}
+
+@keyframes scroll { 0% { transform: translateX(0); } 100% { transform: translateX(-50%); } }
+
+div[data-baseweb="select"] > div {
+    background: #0f1419 !important; border: 1px solid #2a3441 !important;
+    color: #e2e8f0 !important;
+}
+.stButton > button {
+    background: #1a1f26 !important; color: #3b82f6 !important; border: 1px solid #2a3441 !important;
+    border-radius: 8px !important; font-size: 11px !important; padding: 6px 12px !important; font-weight: 600 !important;
+}
+.stButton > button:hover { border-color: #3b82f6 !important; }
+"""
+
+# Colours the inline styles and the map tooltip take from the active theme
+THEME_TOKENS = {
+    'light': dict(surface='#e8eef5', text='#2c3e50', muted='#6a7a94', accent='#0056b3', border='#d1d9e6',
+                  tooltip_bg='#fff', inset='inset 2px 2px 4px #d1d9e6,inset -2px -2px 4px #fff',
+                  map_style="mapbox://styles/akanimo1/cld9l944e002g01oefypmh70y"),
+    'dark': dict(surface='#0f1419', text='#e2e8f0', muted='#94a3b8', accent='#3b82f6', border='#2a3441',
+                 tooltip_bg='#1a1f26', inset='none',
+                 map_style="mapbox://styles/akanimo1/cmj2p5vsl006401s5d32ofmnf"),
+}
+TOOLTIP_HTML = (
+    "<div style='background:{tooltip_bg};padding:10px 14px;border-radius:8px;border:1px solid {border};"
+    "font-family:Inter,sans-serif;box-shadow:0 4px 12px rgba(0,0,0,0.15);'>"
+    "<div style='color:{accent};font-size:10px;font-weight:700;text-transform:uppercase;'>"
+    "<strong>{{country}}</strong></div>"
+    "<div style='color:{text};font-size:14px;font-weight:700;margin:4px 0;'>{{disease}}</div>"
+    "<div style='color:{muted};font-size:10px;margin-top:4px;'>{{location}} • {{grade}}</div>"
+    "<div style='color:{muted};font-size:9px;margin-top:4px;border-top:1px solid {border};padding-top:4px;'>"
+    "Cases: {{cases}} • Deaths: {{deaths}}</div></div>"
+)
+
+@st.cache_resource
+def get_themes():
+    """Both themes with their stylesheets minified and tooltips filled in, built once per process"""
+    return {name: Theme(name, css, tooltip=TOOLTIP_HTML.format(**THEME_TOKENS[name]), **THEME_TOKENS[name])
+            for name, css in (('light', LIGHT_CSS), ('dark', DARK_CSS))}
+
+theme = get_themes()[st.session_state.theme]
+# Only full runs get here (first load and the theme toggle); fragment reruns leave the stylesheet in place
+st.html(theme.stylesheet)
+
+# Filters live in session state; every fragment below reads them through current_selections()
+FILTER_KEYS = {'grade': 'grade_filter', 'country': 'country_filter', 'disease': 'disease_filter',
+               'event_type': 'type_filter'}
+# Fragments that read the filters: a filter change reruns these and leaves the theme, header and footer as sent
+FILTER_DEPENDENTS = ['filters', 'grade_summary', 'weekly_trend', 'ticker', 'metrics', 'map', 'feed', 'cache_stats']
+
+def current_selections():
+    """The sidebar selection as FilteredViews takes it, read back from session state"""
+    dates = views.index().dates
+    period = st.session_state.get('period_filter', next(iter(PERIODS)))
+    reported = dates.window(PERIODS[period]) if dates is not None else None
+    filters = {name: st.session_state.get(key, []) for name, key in FILTER_KEYS.items()}
+    return dict(report_date=reported, **filters)
+
+def rerun_dependents():
+    st.rerun(FILTER_DEPENDENTS)
+
+def rerun_grade_summary():
+    st.rerun(['grade_summary', 'cache_stats'])
+
+@st.fragment(key="filters")
+def filters():
+    """Reporting period and the four facet filters, with their cross-filter counts"""
+    index = views.index()
+    df = index.frame
+    selections = current_selections()
+    reported = selections["report_date"]
+    st.markdown('<div class="sidebar-title">📅 Reported</div>', unsafe_allow_html=True)
+    st.selectbox("Reported", list(PERIODS), key="period_filter", label_visibility="collapsed",
+                 on_change=rerun_dependents)
+    if reported is not None:
+        st.caption(f"{reported[0]:%d %b %Y} – {reported[1]:%d %b %Y} · {index.dates.count(*reported):,} events")
+
+    # Cross-filter counts: how many events each option keeps under the other selections
+    facets = views.cached("facets", selections, lambda index, selections: index.facets(**selections))
     st.markdown('<div class="sidebar-title">🎛️ Filter by Grade</div>', unsafe_allow_html=True)
-    selected_grades = st.multiselect("Grade", sorted(df['grade'].dropna().unique()), key="grade_filter", label_visibility="collapsed")
-    
+    st.multiselect("Grade", sorted(df['grade'].dropna().unique()), key="grade_filter",
+                   format_func=facet_format(facets.get("grade", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🌍 Country</div>', unsafe_allow_html=True)
-    selected_countries = st.multiselect("Country", sorted(df['country'].dropna().unique()), key="country_filter", label_visibility="collapsed")
-    
+    st.multiselect("Country", sorted(df['country'].dropna().unique()), key="country_filter",
+                   format_func=facet_format(facets.get("country", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🦠 Disease</div>', unsafe_allow_html=True)
-    selected_diseases = st.multiselect("Disease", sorted(df['disease'].dropna().unique()), key="disease_filter", label_visibility="collapsed")
-    
+    st.multiselect("Disease", sorted(df['disease'].dropna().unique()), key="disease_filter",
+                   format_func=facet_format(facets.get("disease", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🚨 Event Type</div>', unsafe_allow_html=True)
-    selected_types = st.multiselect("Type", sorted(df['event_type'].dropna().unique()), key="type_filter", label_visibility="collapsed")
-    
+    st.multiselect("Type", sorted(df['event_type'].dropna().unique()), key="type_filter",
+                   format_func=facet_format(facets.get("event_type", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
+@st.fragment(key="grade_summary")
+def grade_summary():
+    """Grade counts; the "Match filters" toggle reruns only this fragment and the cache counters"""
     st.markdown('<div class="sidebar-title">📊 Grade Summary</div>', unsafe_allow_html=True)
-    gc = df['grade'].value_counts()
+    # Served from the snapshot's count tables, never from a scan of the table
+    match_filters = st.toggle("Match filters", value=True, key="grade_scope",
+                              help="Count only the events the filters keep",
+                              on_change=rerun_grade_summary)
+    if match_filters:
+        gc = views.kpis(**current_selections()).counts.get('grade', {})
+    else:
+        gc = views.index().totals.get('grade', {})
     g3, g2, g1 = gc.get('Grade 3', 0), gc.get('Grade 2', 0), gc.get('Grade 1', 0)
-    
-    bg_color = '#e8eef5' if st.session_state.theme == 'light' else '#0f1419'
-    text_color = '#2c3e50' if st.session_state.theme == 'light' else '#e2e8f0'
-    label_color = '#6a7a94' if st.session_state.theme == 'light' else '#94a3b8'
-    shadow = 'inset 2px 2px 4px #d1d9e6,inset -2px -2px 4px #fff' if st.session_state.theme == 'light' else 'none'
-    
+
+    bg_color, text_color, label_color, shadow = theme['surface'], theme['text'], theme['muted'], theme['inset']
+
     st.markdown(f"""
     <div style="display:flex;flex-direction:column;gap:8px;">
         <div style="display:flex;justify-content:space-between;align-items:center;padding:8px 12px;background:{bg_color};border-radius:8px;box-shadow:{shadow};border-left:3px solid #ff3355;">
@@ -336,21 +442,27 @@ with st.sidebar:
         </div>
     </div>
     """, unsafe_allow_html=True)
+
+@st.fragment(key="weekly_trend")
+def weekly_trend():
+    """Events per epi-week for the current filters"""
+    st.markdown('<div class="sidebar-title">📈 Weekly Trend</div>', unsafe_allow_html=True)
+    # Rolled up from the pre-aggregated cube, which refreshes update from their deltas
+    weekly = views.weekly(26, **current_selections())
+    if weekly.empty:
+        st.info("No dated events match the current filters")
+    else:
+        st.bar_chart(weekly, height=140)
+
+with st.sidebar:
+    filters()
+    grade_summary()
+    weekly_trend()
     
     st.markdown("---")
     st.markdown('<div class="sidebar-title">🔗 Resources</div>', unsafe_allow_html=True)
     st.markdown("[WHO Event Tracker](https://eventtracker.afro.who.int/)")
 
-filtered_df = df.copy()
-if selected_grades:
-    filtered_df = filtered_df[filtered_df['grade'].isin(selected_grades)]
-if selected_countries:
-    filtered_df = filtered_df[filtered_df['country'].isin(selected_countries)]
-if selected_diseases:
-    filtered_df = filtered_df[filtered_df['disease'].isin(selected_diseases)]
-if selected_types:
-    filtered_df = filtered_df[filtered_df['event_type'].isin(selected_types)]
-
 theme_icon = '☀️' if st.session_state.theme == 'dark' else '🌙'
 col1, col2 = st.columns([6, 1])
 
@@ -362,157 +474,146 @@ with col1:
             <div class="header-sub">Live tracking of graded events in the African region</div>
         </div>
         <div style="display:flex;align-items:center;gap:10px;">
-            <div class="live-badge">● LIVE</div>
+            {live_badge(store)}
         </div>
     </div>
     """, unsafe_allow_html=True)
 
 with col2:
-    if st.button(theme_icon, key="theme_toggle", help="Toggle theme", use_container_width=True):
-        toggle_theme()
-        st.rerun()
-
-ticker_df = filtered_df.sort_values('report_date', ascending=False).head(8)
-ticker_items = [f"🔴 {row['country']}: {row['disease']} ({row['grade']})" for _, row in ticker_df.iterrows()]
-ticker_text = "  •  ".join(ticker_items)
-ticker_text_doubled = f"LIVE UPDATES: {ticker_text}  •  {ticker_text}"
-
-st.markdown(f'<div class="ticker-wrapper"><div class="ticker-content">{ticker_text_doubled}</div></div>', unsafe_allow_html=True)
-
-new_count = len(filtered_df[filtered_df['status'] == 'New'])
-ongoing_count = len(filtered_df[filtered_df['status'] == 'Ongoing'])
-outbreak_count = len(filtered_df[filtered_df['event_type'] == 'Outbreak'])
-total_count = len(filtered_df)
-
-st.markdown(f"""
-<div class="metrics-row">
-    <div class="metric-card">
-        <div class="metric-value">{total_count}</div>
-        <div class="metric-label">Total Events</div>
-    </div>
-    <div class="metric-card">
-        <div class="metric-value">{new_count}</div>
-        <div class="metric-label">New Events</div>
-    </div>
-    <div class="metric-card">
-        <div class="metric-value">{ongoing_count}</div>
-        <div class="metric-label">Ongoing</div>
-    </div>
-    <div class="metric-card">
-        <div class="metric-value">{outbreak_count}</div>
-        <div class="metric-label">Outbreaks</div>
+    # The click run itself sees the new theme, so toggling costs one full run instead of two
+    st.button(theme_icon, key="theme_toggle", help="Toggle theme", use_container_width=True, on_click=toggle_theme)
+
+notice = degraded_notice(store)
+if notice:
+    st.warning(notice, icon="⚠️")
+
+# Compiled once; the headlines are escaped, rendered in one batch and cached per snapshot and selection
+TICKER_TEMPLATE = FeedTemplate(
+    'classic-ticker',
+    item='🔴 {country}: {disease} ({grade})',
+    separator='  •  ',
+    defaults={'country': 'Unknown', 'disease': 'Event', 'grade': 'Ungraded'},
+)
+
+@st.fragment(key="ticker")
+def ticker():
+    """Scrolling headlines of the newest matching events"""
+    ticker_text = views.feed(TICKER_TEMPLATE, 8, **current_selections())
+    ticker_text_doubled = f"LIVE UPDATES: {ticker_text}  •  {ticker_text}"
+
+    st.markdown(f'<div class="ticker-wrapper"><div class="ticker-content">{ticker_text_doubled}</div></div>',
+                unsafe_allow_html=True)
+
+ticker()
+
+@st.fragment(key="metrics")
+def metrics():
+    """The four KPI cards"""
+    kpis = views.kpis(**current_selections())   # every card from one pass over the category codes
+    new_count = kpis.count('status', 'New')
+    ongoing_count = kpis.count('status', 'Ongoing')
+    outbreak_count = kpis.count('event_type', 'Outbreak')
+    total_count = kpis.total
+
+    st.markdown(f"""
+    <div class="metrics-row">
+        <div class="metric-card">
+            <div class="metric-value">{total_count}</div>
+            <div class="metric-label">Total Events</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{new_count}</div>
+            <div class="metric-label">New Events</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{ongoing_count}</div>
+            <div class="metric-label">Ongoing</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-value">{outbreak_count}</div>
+            <div class="metric-label">Outbreaks</div>
+        </div>
     </div>
-</div>
-""", unsafe_allow_html=True)
-
-map_title_color = '#0056b3' if st.session_state.theme == 'light' else '#3b82f6'
-legend_color = '#6a7a94' if st.session_state.theme == 'light' else '#94a3b8'
-
-st.markdown(f"""
-<div class="map-container">
-    <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.75rem;">
-        <div style="font-size:12px;font-weight:600;color:{map_title_color};text-transform:uppercase;letter-spacing:1px;">📍 Event Distribution</div>
-        <div style="display:flex;gap:12px;">
-            <div style="display:flex;align-items:center;gap:4px;font-size:10px;color:{legend_color};">
-                <div style="width:10px;height:10px;border-radius:50%;background:#ff3355;"></div>Grade 3
-            </div>
-            <div style="display:flex;align-items:center;gap:4px;font-size:10px;color:{legend_color};">
-                <div style="width:10px;height:10px;border-radius:50%;background:#ff9933;"></div>Grade 2
-            </div>
-            <div style="display:flex;align-items:center;gap:4px;font-size:10px;color:{legend_color};">
-                <div style="width:10px;height:10px;border-radius:50%;background:#ffcc00;"></div>Grade 1
+    """, unsafe_allow_html=True)
+
+metrics()
+
+# Markers coloured by grade and sized by event count; the data is filled in per selection by views.deck
+EVENT_MAP = EventMap(
+    f'classic-{theme.name}', theme['map_style'],
+    tooltip={"html": theme['tooltip'], "style": {"backgroundColor": "transparent"}},
+    radius=(25000, 5000), zoom=3.2, radius_min_pixels=10, radius_max_pixels=45, pickable=True, auto_highlight=True,
+)
+
+@st.fragment(key="map")
+def event_map():
+    """Map title, legend and the deck of matching events"""
+    map_title_color, legend_color = theme['accent'], theme['muted']
+
+    st.markdown(f"""
+    <div class="map-container">
+        <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.75rem;">
+            <div style="font-size:12px;font-weight:600;color:{map_title_color};text-transform:uppercase;letter-spacing:1px;">📍 Event Distribution</div>
+            <div style="display:flex;gap:12px;">
+                <div style="display:flex;align-items:center;gap:4px;font-size:10px;color:{legend_color};">
+                    <div style="width:10px;height:10px;border-radius:50%;background:#ff3355;"></div>Grade 3
+                </div>
+                <div style="display:flex;align-items:center;gap:4px;font-size:10px;color:{legend_color};">
+                    <div style="width:10px;height:10px;border-radius:50%;background:#ff9933;"></div>Grade 2
+                </div>
+                <div style="display:flex;align-items:center;gap:4px;font-size:10px;color:{legend_color};">
+                    <div style="width:10px;height:10px;border-radius:50%;background:#ffcc00;"></div>Grade 1
+                </div>
             </div>
         </div>
     </div>
-</div>
-""", unsafe_allow_html=True)
-
-map_df = filtered_df.dropna(subset=['lat', 'lon']).copy()
-
-if len(map_df) > 0:
-    def get_color(grade):
-        colors = {
-            'Grade 3': [255, 51, 85, 200],
-            'Grade 2': [255, 153, 51, 200],
-            'Grade 1': [255, 204, 0, 200]
-        }
-        return colors.get(grade, [160, 160, 176, 180])
-    
-    map_df['color'] = map_df['grade'].apply(get_color)
-    map_df['radius'] = map_df['event_count'].fillna(1) * 5000 + 25000
-    
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=map_df,
-        get_position='[lon, lat]',
-        get_color='color',
-        get_radius='radius',
-        radius_min_pixels=10,
-        radius_max_pixels=45,
-        pickable=True,
-        auto_highlight=True,
-    )
-    
-    MAPBOX_STYLE = "mapbox://styles/akanimo1/cld9l944e002g01oefypmh70y" if st.session_state.theme == 'light' else "mapbox://styles/akanimo1/cmj2p5vsl006401s5d32ofmnf"
-    
-    view = pdk.ViewState(
-        latitude=map_df['lat'].mean(),
-        longitude=map_df['lon'].mean(),
-        zoom=3.2,
-        pitch=0
-    )
-    
-    tooltip_bg = '#fff' if st.session_state.theme == 'light' else '#1a1f26'
-    tooltip_border = '#d1d9e6' if st.session_state.theme == 'light' else '#2a3441'
-    tooltip_title_color = '#0056b3' if st.session_state.theme == 'light' else '#3b82f6'
-    tooltip_text_color = '#2c3e50' if st.session_state.theme == 'light' else '#e2e8f0'
-    tooltip_meta_color = '#6a7a94' if st.session_state.theme == 'light' else '#94a3b8'
-    
-    tooltip = {
-        "html": f"<div style='background:{tooltip_bg};padding:10px 14px;border-radius:8px;border:1px solid {tooltip_border};font-family:Inter,sans-serif;box-shadow:0 4px 12px rgba(0,0,0,0.15);'><div style='color:{tooltip_title_color};font-size:10px;font-weight:700;text-transform:uppercase;'><strong>{{country}}</strong></div><div style='color:{tooltip_text_color};font-size:14px;font-weight:700;margin:4px 0;'>{{disease}}</div><div style='color:{tooltip_meta_color};font-size:10px;margin-top:4px;'>{{location}} • {{grade}}</div><div style='color:{tooltip_meta_color};font-size:9px;margin-top:4px;border-top:1px solid {tooltip_border};padding-top:4px;'>Cases: {{cases}} • Deaths: {{deaths}}</div></div>",
-        "style": {"backgroundColor": "transparent"}
-    }
-    
-    deck = pdk.Deck(
-        layers=[layer],
-        initial_view_state=view,
-        tooltip=tooltip,
-        map_style=MAPBOX_STYLE,
-    )
-    
-    st.pydeck_chart(deck, use_container_width=True, height=550)
-else:
-    st.info("No events with location data to display")
-
-feed_df = filtered_df.sort_values('report_date', ascending=False).head(10)
-
-right_sidebar_html = '<div class="right-sidebar"><div class="right-sidebar-title">📡 Recent Signals</div><div style="overflow-y:auto;height:calc(100% - 40px);">'
-
-for i, (idx, row) in enumerate(feed_df.iterrows(), 1):
-    grade = str(row.get('grade', 'Ungraded'))
-    tag_class = {'Grade 3': 'sg3-badge', 'Grade 2': 'sg2-badge', 'Grade 1': 'sg1-badge'}.get(grade, 'sg1-badge')
-    country = str(row.get('country', 'Unknown'))
-    disease = str(row.get('disease', 'Event'))
-    description = str(row.get('description', 'No description available'))
-    status = str(row.get('status', ''))
-    event_type = str(row.get('event_type', ''))
-    cases = row.get('cases', 0)
-    deaths = row.get('deaths', 0)
-    
-    desc_display = description[:130] + '...' if len(description) > 130 else description
-    
-    right_sidebar_html += f'''
+    """, unsafe_allow_html=True)
+
+    # Built once per snapshot, selection and theme; an unchanged map is byte-identical and not re-sent
+    deck = views.deck(EVENT_MAP, **current_selections())
+    if deck is not None:
+        st.pydeck_chart(deck, use_container_width=True, height=550)
+    else:
+        st.info("No events with location data to display")
+
+event_map()
+
+# Compiled once; the panel is rendered in one batch and cached per snapshot, selection and theme
+FEED_TEMPLATE = FeedTemplate(
+    'classic',
+    header='<div class="right-sidebar"><div class="right-sidebar-title">📡 Recent Signals</div>'
+           '<div style="overflow-y:auto;height:calc(100% - 40px);">',
+    item='''
     <div class="signal-item">
         <div style="display:flex;align-items:center;margin-bottom:4px;">
-            <span class="signal-num">{i}</span>
+            <span class="signal-num">{num}</span>
             <span class="signal-country-text">{country}</span>
         </div>
         <div class="signal-disease-text">{disease}</div>
         <div class="signal-meta">{event_type} • {status} • Cases: {cases} • Deaths: {deaths}</div>
-        <div class="signal-desc">{desc_display}</div>
-        <span class="signal-grade-badge {tag_class}">{grade}</span>
+        <div class="signal-desc">{description_snippet}</div>
+        <span class="signal-grade-badge {badge}">{grade}</span>
     </div>
-    '''
+    ''',
+    footer='</div></div>',
+    defaults={'grade': 'Ungraded', 'country': 'Unknown', 'disease': 'Event', 'cases': 0, 'deaths': 0,
+              'description_snippet': 'No description available'},
+    badges={'Grade 3': 'sg3-badge', 'Grade 2': 'sg2-badge', 'Grade 1': 'sg1-badge'},
+    badge_default='sg1-badge',
+)
 
-right_sidebar_html += '</div></div>'
-st.markdown(right_sidebar_html, unsafe_allow_html=True)
+@st.fragment(key="feed")
+def feed():
+    """The Recent Signals panel"""
+    st.markdown(views.feed(FEED_TEMPLATE, 10, **current_selections()), unsafe_allow_html=True)
+
+feed()
+
+# Last, so a full run counts every panel's lookups
+@st.fragment(key="cache_stats")
+def cache_stats():
+    """View cache counters, rerun after every panel that reads the cache so they include its lookups"""
+    st.caption(views.describe())
+
+with st.sidebar:
+    cache_stats()
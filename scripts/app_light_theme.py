@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
-import pydeck as pdk
+
+from who_data import (
+    DATA_SOURCE, PERIODS, BackgroundRefresher, EventMap, EventStore, FeedTemplate, FilteredViews, degraded_notice,
+    facet_format, live_badge, prepare_events, source_from_uri,
+)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 1. CONFIG - Always first
@@ -15,10 +19,9 @@ st.set_page_config(
 # ═══════════════════════════════════════════════════════════════════════════════
 # 2. SAMPLE DATA (replace with your actual data loading)
 # ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data
 def load_data():
-    # Replace this with your actual data loading logic
-    return pd.DataFrame({
+    """Sample events, served when WHO_DATA_SOURCE is not set"""
+    return prepare_events(pd.DataFrame({
         'country': ['Nigeria', 'Kenya', 'South Africa', 'Ethiopia'],
         'disease': ['Cholera', 'Ebola', 'Measles', 'Yellow Fever'],
         'grade': ['Grade 3', 'Grade 2', 'Grade 1', 'Grade 3'],
@@ -29,9 +32,38 @@ def load_data():
         'event_type': ['Outbreak', 'Outbreak', 'Epidemic', 'Outbreak'],
         'location': ['Lagos', 'Nairobi', 'Cape Town', 'Addis Ababa'],
         'description': ['Cholera outbreak affecting multiple regions', 'New Ebola cases reported', 'Measles outbreak in urban areas', 'Yellow fever emergency declared']
-    })
-
-df = load_data()
+    }))
+
+REFRESH_TTL = 1800   # seconds a pull of the data stays fresh
+REFRESH_LEAD = 120   # start re-pulling this long before it expires
+REFRESH_MIN_INTERVAL = 60   # concurrent or repeated refreshes within this window share one pull
+VIEW_CACHE_BUDGET = 256 * 2**20   # bytes of filtered tables kept for reuse across sessions
+
+@st.cache_resource
+def get_store():
+    """Process-wide event table kept fresh by a background refresher"""
+    if DATA_SOURCE:
+        # A cold start during an outage serves the source's snapshot on disk, with the degraded notice
+        source = source_from_uri(DATA_SOURCE, prepare=prepare_events)
+        store = EventStore(source.load, ttl=REFRESH_TTL, min_interval=REFRESH_MIN_INTERVAL,
+                           checked_at=lambda: source.checked_at, fallback=source.cached)
+    else:
+        store = EventStore(load_data, ttl=REFRESH_TTL, min_interval=REFRESH_MIN_INTERVAL)
+    BackgroundRefresher(store, lead=REFRESH_LEAD).start()
+    return store
+
+@st.cache_resource
+def get_views():
+    """Filtered tables shared by every session, keyed by snapshot version and selection"""
+    return FilteredViews(get_store(), budget=VIEW_CACHE_BUDGET)
+
+store = get_store()
+views = get_views()
+try:
+    df = store.current()
+except Exception as e:
+    st.error(f"The WHO data source could not be reached and no snapshot is saved yet: {e}")
+    st.stop()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 3. LIGHT NEUMORPHIC THEME STYLING
@@ -117,6 +149,10 @@ div[data-baseweb="select"] > div {
     border-radius: 12px;
     box-shadow: 2px 2px 6px rgba(0,200,83,0.3);
 }
+.live-badge.stale {
+    background: linear-gradient(135deg, #ff9933, #ffb366);
+    box-shadow: none;
+}
 
 /* === METRICS NEUMORPHIC === */
 .metrics-row {
@@ -370,24 +406,72 @@ div[data-baseweb="select"] > div {
 # ═══════════════════════════════════════════════════════════════════════════════
 # 4. SIDEBAR - Filters (SAME AS DARK THEME)
 # ═══════════════════════════════════════════════════════════════════════════════
-with st.sidebar:
+# Filters live in session state; every fragment below reads them through current_selections()
+FILTER_KEYS = {'grade': 'gr', 'country': 'co', 'disease': 'ds', 'event_type': 'et'}
+# Fragments that read the filters: a filter change reruns these and leaves the theme, header and footer as sent
+FILTER_DEPENDENTS = ['filters', 'grade_summary', 'weekly_trend', 'metrics', 'map', 'feed', 'ticker', 'cache_stats']
+
+def current_selections():
+    """The sidebar selection as FilteredViews takes it, read back from session state"""
+    dates = views.index().dates
+    period = st.session_state.get('rp', next(iter(PERIODS)))
+    reported = dates.window(PERIODS[period]) if dates is not None else None
+    filters = {name: st.session_state.get(key, []) for name, key in FILTER_KEYS.items()}
+    return dict(report_date=reported, **filters)
+
+def rerun_dependents():
+    st.rerun(FILTER_DEPENDENTS)
+
+def rerun_grade_summary():
+    st.rerun(['grade_summary', 'cache_stats'])
+
+@st.fragment(key="filters")
+def filters():
+    """Reporting period and the four facet filters, with their cross-filter counts"""
+    index = views.index()
+    df = index.frame
+    selections = current_selections()
+    reported = selections["report_date"]
+    st.markdown('<div class="sidebar-title">📅 Reported</div>', unsafe_allow_html=True)
+    st.selectbox("Reported", list(PERIODS), key="rp", label_visibility="collapsed", on_change=rerun_dependents)
+    if reported is not None:
+        st.caption(f"{reported[0]:%d %b %Y} – {reported[1]:%d %b %Y} · {index.dates.count(*reported):,} events")
+
+    # Cross-filter counts: how many events each option keeps under the other selections
+    facets = views.cached("facets", selections, lambda index, selections: index.facets(**selections))
     st.markdown('<div class="sidebar-title">🎛️ Filter by Grade</div>', unsafe_allow_html=True)
-    selected_grades = st.multiselect("Grade", sorted(df['grade'].dropna().unique()), key="gr", label_visibility="collapsed")
-    
+    st.multiselect("Grade", sorted(df['grade'].dropna().unique()), key="gr",
+                   format_func=facet_format(facets.get("grade", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🌍 Country</div>', unsafe_allow_html=True)
-    selected_countries = st.multiselect("Country", sorted(df['country'].dropna().unique()), key="co", label_visibility="collapsed")
-    
+    st.multiselect("Country", sorted(df['country'].dropna().unique()), key="co",
+                   format_func=facet_format(facets.get("country", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🦠 Disease</div>', unsafe_allow_html=True)
-    selected_diseases = st.multiselect("Disease", sorted(df['disease'].dropna().unique()), key="ds", label_visibility="collapsed")
-    
+    st.multiselect("Disease", sorted(df['disease'].dropna().unique()), key="ds",
+                   format_func=facet_format(facets.get("disease", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🚨 Event Type</div>', unsafe_allow_html=True)
-    selected_types = st.multiselect("Type", sorted(df['event_type'].dropna().unique()), key="et", label_visibility="collapsed")
-    
-    # GRADE SUMMARY IN SIDEBAR
+    st.multiselect("Type", sorted(df['event_type'].dropna().unique()), key="et",
+                   format_func=facet_format(facets.get("event_type", {})), label_visibility="collapsed",
+                   on_change=rerun_dependents)
+
+@st.fragment(key="grade_summary")
+def grade_summary():
+    """Grade counts; the "Match filters" toggle reruns only this fragment and the cache counters"""
     st.markdown('<div class="sidebar-title">📊 Grade Summary</div>', unsafe_allow_html=True)
-    gc = df['grade'].value_counts()
+    # Served from the snapshot's count tables, never from a scan of the table
+    match_filters = st.toggle("Match filters", value=True, key="gs", help="Count only the events the filters keep",
+                              on_change=rerun_grade_summary)
+    if match_filters:
+        gc = views.kpis(**current_selections()).counts.get('grade', {})
+    else:
+        gc = views.index().totals.get('grade', {})
     g3, g2, g1 = gc.get('Grade 3', 0), gc.get('Grade 2', 0), gc.get('Grade 1', 0)
-    
+
     st.markdown(f"""
     <div style="display:flex;flex-direction:column;gap:6px;">
         <div class="grade-summary-item" style="border-left:3px solid #ff3355;">
@@ -401,175 +485,193 @@ with st.sidebar:
         </div>
     </div>
     """, unsafe_allow_html=True)
+
+@st.fragment(key="weekly_trend")
+def weekly_trend():
+    """Events per epi-week for the current filters"""
+    st.markdown('<div class="sidebar-title">📈 Weekly Trend</div>', unsafe_allow_html=True)
+    # Rolled up from the pre-aggregated cube, which refreshes update from their deltas
+    weekly = views.weekly(26, **current_selections())
+    if weekly.empty:
+        st.info("No dated events match the current filters")
+    else:
+        st.bar_chart(weekly, height=140)
+
+with st.sidebar:
+    filters()
+    grade_summary()
+    weekly_trend()
     
     st.markdown("---")
     st.markdown('<div class="sidebar-title">🔗 Resources</div>', unsafe_allow_html=True)
     st.markdown("[WHO Event Tracker](https://eventtracker.afro.who.int/)")
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# 5. FILTER DATA
+# 5. VIEW CACHE
 # ═══════════════════════════════════════════════════════════════════════════════
-filtered_df = df.copy()
-if selected_grades:
-    filtered_df = filtered_df[filtered_df['grade'].isin(selected_grades)]
-if selected_types:
-    filtered_df = filtered_df[filtered_df['event_type'].isin(selected_types)]
-if selected_countries:
-    filtered_df = filtered_df[filtered_df['country'].isin(selected_countries)]
-if selected_diseases:
-    filtered_df = filtered_df[filtered_df['disease'].isin(selected_diseases)]
+@st.fragment(key="cache_stats")
+def cache_stats():
+    """View cache counters, rerun after every panel that reads the cache so they include its lookups"""
+    st.caption(views.describe())
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 6. HEADER
 # ═══════════════════════════════════════════════════════════════════════════════
 col_header1, col_header2 = st.columns([4, 1])
 with col_header1:
-    st.markdown("""
+    st.markdown(f"""
     <div class="header-bar">
         <div>
             <div class="header-title">🌍 WHO Signal Intelligence Dashboard</div>
             <div class="header-sub">Live tracking of graded events in the African region</div>
         </div>
-        <div class="live-badge">● LIVE</div>
+        {live_badge(store)}
     </div>
     """, unsafe_allow_html=True)
 with col_header2:
     if st.button("🔄 Refresh Data", key="refresh", use_container_width=True):
-        st.cache_data.clear()
+        try:
+            store.refresh()
+        except Exception:
+            pass  # the store keeps its last good table and the notice below says why
         st.rerun()
 
+notice = degraded_notice(store)
+if notice:
+    st.warning(notice, icon="⚠️")
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 7. METRICS
 # ═══════════════════════════════════════════════════════════════════════════════
-new_count = len(filtered_df[filtered_df['status'] == 'New'])
-ongoing_count = len(filtered_df[filtered_df['status'] == 'Ongoing'])
-outbreak_count = len(filtered_df[filtered_df['event_type'] == 'Outbreak'])
-total_count = len(filtered_df)
-
-st.markdown(f"""
-<div class="metrics-row">
-    <div class="metric-card"><div class="metric-value">{total_count}</div><div class="metric-label">Total Events</div></div>
-    <div class="metric-card"><div class="metric-value">{new_count}</div><div class="metric-label">New Events</div></div>
-    <div class="metric-card"><div class="metric-value">{ongoing_count}</div><div class="metric-label">Ongoing</div></div>
-    <div class="metric-card"><div class="metric-value">{outbreak_count}</div><div class="metric-label">Outbreaks</div></div>
-</div>
-""", unsafe_allow_html=True)
+@st.fragment(key="metrics")
+def metrics():
+    """The four KPI cards"""
+    kpis = views.kpis(**current_selections())   # every card from one pass over the category codes
+    new_count = kpis.count('status', 'New')
+    ongoing_count = kpis.count('status', 'Ongoing')
+    outbreak_count = kpis.count('event_type', 'Outbreak')
+    total_count = kpis.total
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# 8. MAP
-# ═══════════════════════════════════════════════════════════════════════════════
-st.markdown("""
-<div class="map-container">
-    <div class="map-header">
-        <div class="map-title">📍 Event Distribution</div>
+    st.markdown(f"""
+    <div class="metrics-row">
+        <div class="metric-card"><div class="metric-value">{total_count}</div><div class="metric-label">Total Events</div></div>
+        <div class="metric-card"><div class="metric-value">{new_count}</div><div class="metric-label">New Events</div></div>
+        <div class="metric-card"><div class="metric-value">{ongoing_count}</div><div class="metric-label">Ongoing</div></div>
+        <div class="metric-card"><div class="metric-value">{outbreak_count}</div><div class="metric-label">Outbreaks</div></div>
     </div>
-</div>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
-map_df = filtered_df.dropna(subset=['lat', 'lon']).copy()
+metrics()
 
-if len(map_df) > 0:
-    def get_color(grade):
-        colors = {'Grade 3': [255,51,85,200], 'Grade 2': [255,153,51,200], 'Grade 1': [255,204,0,200]}
-        return colors.get(grade, [160,160,176,180])
-    
-    map_df['color'] = map_df['grade'].apply(get_color)
-    map_df['radius'] = map_df['event_count'].fillna(1) * 5000 + 20000
-    
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=map_df,
-        get_position='[lon, lat]',
-        get_color='color',
-        get_radius='radius',
-        radius_min_pixels=5,
-        radius_max_pixels=30,
-        pickable=True,
-        auto_highlight=True,
-    )
-    
-    # Use standard (light) map style
-    view = pdk.ViewState(
-        latitude=map_df['lat'].mean(),
-        longitude=map_df['lon'].mean(),
-        zoom=3,
-        pitch=0
-    )
-    
-    tooltip = {
+# ═══════════════════════════════════════════════════════════════════════════════
+# 8. MAP
+# ═══════════════════════════════════════════════════════════════════════════════
+# Markers coloured by grade and sized by event count; the data is filled in per selection by views.deck
+EVENT_MAP = EventMap(
+    'light', "mapbox://styles/mapbox/standard",
+    tooltip={
         "html": "<div style='background:#fff;padding:8px 12px;border-radius:8px;box-shadow:0 2px 8px rgba(0,0,0,0.15);font-family:Inter,sans-serif;'><div style='color:#0056b3;font-size:10px;font-weight:600;'>{country}</div><div style='color:#2c3e50;font-size:13px;font-weight:600;margin:3px 0;'>{disease}</div><div style='color:#6a7a94;font-size:10px;'>{location} • {grade}</div></div>",
         "style": {"backgroundColor": "transparent"}
-    }
-
-    r = pdk.Deck(
-        layers=[layer],
-        initial_view_state=view,
-        tooltip=tooltip,
-        map_style="mapbox://styles/mapbox/standard",
-    )
-    
-    # KPI Overlay on Map
-    countries_affected = filtered_df['country'].nunique()
-    st.markdown(f'''
-    <div class="kpi-overlay">
-        <div class="kpi-overlay-card">
-            <span class="kpi-overlay-value">{len(filtered_df)}</span>
-            <span class="kpi-overlay-label">Active Events</span>
-        </div>
-        <div class="kpi-overlay-card">
-            <span class="kpi-overlay-value">{countries_affected}</span>
-            <span class="kpi-overlay-label">Countries</span>
+    },
+    fields=('country', 'disease', 'location', 'grade'), radius=(20000, 5000), zoom=3,
+    radius_min_pixels=5, radius_max_pixels=30, pickable=True, auto_highlight=True,
+)
+
+@st.fragment(key="map")
+def event_map():
+    """Map header, KPI overlay and the deck of matching events"""
+    st.markdown("""
+    <div class="map-container">
+        <div class="map-header">
+            <div class="map-title">📍 Event Distribution</div>
         </div>
     </div>
-    ''', unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
+
+    selections = current_selections()
+    # Built once per snapshot and selection; an unchanged map is byte-identical and not re-sent
+    deck = views.deck(EVENT_MAP, **selections)
+
+    if deck is not None:
+        # KPI Overlay on Map
+        kpis = views.kpis(**selections)
+        countries_affected = kpis.countries
+        st.markdown(f'''
+        <div class="kpi-overlay">
+            <div class="kpi-overlay-card">
+                <span class="kpi-overlay-value">{kpis.total}</span>
+                <span class="kpi-overlay-label">Active Events</span>
+            </div>
+            <div class="kpi-overlay-card">
+                <span class="kpi-overlay-value">{countries_affected}</span>
+                <span class="kpi-overlay-label">Countries</span>
+            </div>
+        </div>
+        ''', unsafe_allow_html=True)
     
-    st.pydeck_chart(r, use_container_width=True, height=530)
-else:
-    st.info("No events with location data")
+        st.pydeck_chart(deck, use_container_width=True, height=530)
+    else:
+        st.info("No events with location data")
+
+event_map()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 9. RIGHT SIDEBAR - Recent Signals
 # ═══════════════════════════════════════════════════════════════════════════════
-feed_df = filtered_df.head(10)
-
-right_sidebar_html = '<div class="right-sidebar"><div class="right-sidebar-title">📡 Recent Signals</div><div class="right-sidebar-content">'
-
-for i, (idx, row) in enumerate(feed_df.iterrows(), 1):
-    grade = str(row.get('grade', 'Ungraded'))
-    tag = {'Grade 3': 'sg3-badge', 'Grade 2': 'sg2-badge', 'Grade 1': 'sg1-badge'}.get(grade, 'sgu-badge')
-    country = str(row.get('country', 'Unknown'))
-    disease = str(row.get('disease', 'Event'))
-    description = str(row.get('description', ''))
-    status = str(row.get('status', ''))
-    event_type = str(row.get('event_type', ''))
-    
-    desc_display = description[:150] + '...' if len(description) > 150 else description
-    
-    right_sidebar_html += f'''
+# Compiled once; the panel is rendered in one batch and cached per snapshot, selection and theme
+FEED_TEMPLATE = FeedTemplate(
+    'light',
+    header='<div class="right-sidebar"><div class="right-sidebar-title">📡 Recent Signals</div>'
+           '<div class="right-sidebar-content">',
+    item='''
     <div class="signal-item">
         <div class="signal-header">
-            <span class="signal-num">{i}</span>
+            <span class="signal-num">{num}</span>
             <span class="signal-country-text">{country}</span>
         </div>
         <div class="signal-disease-text">{disease}</div>
         <div class="signal-meta">{event_type} • {status}</div>
-        <div class="signal-desc">{desc_display}</div>
-        <span class="signal-grade-badge {tag}">{grade}</span>
+        <div class="signal-desc">{description_snippet}</div>
+        <span class="signal-grade-badge {badge}">{grade}</span>
     </div>
-    '''
+    ''',
+    footer='</div></div>',
+    defaults={'grade': 'Ungraded', 'country': 'Unknown', 'disease': 'Event', 'description_snippet': ''},
+    badges={'Grade 3': 'sg3-badge', 'Grade 2': 'sg2-badge', 'Grade 1': 'sg1-badge'},
+    badge_default='sgu-badge',
+)
+
+@st.fragment(key="feed")
+def feed():
+    """The Recent Signals panel"""
+    st.markdown(views.feed(FEED_TEMPLATE, 10, **current_selections()), unsafe_allow_html=True)
 
-right_sidebar_html += '</div></div>'
-st.markdown(right_sidebar_html, unsafe_allow_html=True)
+feed()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 10. LIVE TICKER
 # ═══════════════════════════════════════════════════════════════════════════════
-ticker_df = filtered_df.head(8)
-ticker_items = [f"🔴 {r.get('country','')}: {r.get('disease','')} ({r.get('grade','')})" for _, r in ticker_df.iterrows()]
-ticker_text = "  •  ".join(ticker_items)
-
-st.markdown(f'''
-<div class="ticker-wrapper">
-    <div class="ticker-content">{ticker_text}</div>
-</div>
-''', unsafe_allow_html=True)
+# Compiled once; the headlines are escaped, rendered in one batch and cached per snapshot and selection
+TICKER_TEMPLATE = FeedTemplate(
+    'light-ticker',
+    item='🔴 {country}: {disease} ({grade})',
+    separator='  •  ',
+    defaults={'country': 'Unknown', 'disease': 'Event', 'grade': 'Ungraded'},
+)
+
+@st.fragment(key="ticker")
+def ticker():
+    """Scrolling headlines of the newest matching events"""
+    ticker_text = views.feed(TICKER_TEMPLATE, 8, **current_selections())
+
+    st.markdown(f'''
+    <div class="ticker-wrapper">
+        <div class="ticker-content">{ticker_text}</div>
+    </div>
+    ''', unsafe_allow_html=True)
+
+ticker()
+
+# Drawn last, so a full run counts every panel's lookups
+with st.sidebar:
+    cache_stats()
@@ -0,0 +1,588 @@
+"""
+Micro-benchmarks for the dashboard data layer.
+
+    python scripts/benchmark.py schema --rows 200000
+    python scripts/benchmark.py schema --csv events.csv --rows 1000000
+    python scripts/benchmark.py herd --sessions 50
+    python scripts/benchmark.py xlsx --rows 200000 --sheets 4
+    python scripts/benchmark.py filters --synthetic --rows 1000000
+    python scripts/benchmark.py recent --synthetic --sizes 100000 1000000
+    python scripts/benchmark.py deck --synthetic --rows 300000
+    python scripts/benchmark.py cube --synthetic --rows 1000000 --changes 1000
+    python scripts/benchmark.py fixtures --rows 1000000 --out fixtures/
+    python scripts/benchmark.py reruns scripts/app.py --synthetic --rows 20000
+
+Without ``--csv`` the published sheet (through its local snapshot) is
+resampled up to ``--rows`` rows; ``--synthetic`` generates that many
+events offline instead.
+"""
+import argparse
+import http.server
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from who_data import (
+    EVENT_SCHEMA, SHEET_CSV_URL, CsvUrlSource, EventMap, EventStore, FilterIndex, MetricsKernel, apply_schema,
+    generate_events, write_fixtures,
+)
+from who_data.columns import find_column
+from who_data.cube import EventCube, epi_weeks
+from who_data.filters import FACET_COLUMNS
+from who_data.synthetic import write_xlsx
+from who_data.xlsx import peak_rss_mb, read_workbook
+
+
+def best_of(fn, repeat=5):
+    """Fastest of ``repeat`` runs of ``fn`` in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def load_events(args):
+    """Untyped event table scaled to ``args.rows`` rows"""
+    if args.synthetic:
+        return generate_events(args.rows, seed=args.seed)
+    raw = pd.read_csv(args.csv) if args.csv else CsvUrlSource(SHEET_CSV_URL).load()
+    if args.rows and args.rows != len(raw):
+        picks = np.random.default_rng(args.seed).integers(0, len(raw), args.rows)
+        raw = raw.iloc[picks].reset_index(drop=True)
+    return raw
+
+
+def bench_schema(args):
+    """Memory and filter latency of untyped string columns against the typed schema"""
+    raw = load_events(args)
+    typed = apply_schema(raw, dayfirst=args.dayfirst)
+    print(f"{len(raw):,} rows\n")
+
+    def workload(df):
+        ops = {}
+        for name in ("country", "disease", "grade", "event_type"):
+            col = find_column(df, name)
+            if col is not None:
+                picks = df[col].dropna().unique()[:2].tolist()
+                ops[f"isin {name}"] = lambda col=col, picks=picks: df[col].isin(picks)
+                ops[f"value_counts {name}"] = lambda col=col: df[col].value_counts()
+        col = find_column(df, "status")
+        if col is not None:
+            ops["status == 'New'"] = lambda: (df[col] == "New").sum()
+        return ops
+
+    raw_ops, typed_ops = workload(raw), workload(typed)
+    print(f"{'operation':<26}{'untyped ms':>12}{'typed ms':>12}{'speed-up':>10}")
+    for name, fn in raw_ops.items():
+        before, after = best_of(fn), best_of(typed_ops[name])
+        print(f"{name:<26}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+    print(f"\n{'column':<26}{'untyped MB':>12}{'typed MB':>12}")
+    for name in EVENT_SCHEMA:
+        col = find_column(raw, name)
+        if col is not None:
+            before = raw[col].memory_usage(deep=True, index=False) / 1e6
+            after = typed[col].memory_usage(deep=True, index=False) / 1e6
+            print(f"{name:<26}{before:>12.2f}{after:>12.2f}")
+    total_before = raw.memory_usage(deep=True).sum() / 1e6
+    total_after = typed.memory_usage(deep=True).sum() / 1e6
+    print(f"{'whole frame':<26}{total_before:>12.2f}{total_after:>12.2f}")
+
+
+def bench_filters(args):
+    """Chained isin filtering, metric cards, date ranges and facet counts against the filter indexes"""
+    df = apply_schema(load_events(args), dayfirst=args.dayfirst)
+    start = time.perf_counter()
+    index = FilterIndex(df)
+    print(f"{len(df):,} rows, index built in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    def top(name, n):
+        col = find_column(df, name)
+        return [] if col is None else df[col].value_counts().index[:n].tolist()
+
+    selections = {
+        "one grade": {"grade": top("grade", 1)},
+        "grade + country": {"grade": top("grade", 2), "country": top("country", 3)},
+        "four filters": {"grade": top("grade", 2), "country": top("country", 5),
+                         "disease": top("disease", 3), "event_type": top("event_type", 1)},
+    }
+
+    def chained(selection):
+        out = df.copy()
+        for name, values in selection.items():
+            col = find_column(out, name)
+            out = out[out[col].isin(values)]
+        return out
+
+    print(f"{'selection':<18}{'rows':>10}{'isin chain ms':>15}{'positions ms':>14}{'+ gather ms':>13}{'speed-up':>10}")
+    for label, selection in selections.items():
+        expected = chained(selection)
+        assert expected.index.equals(index.select(**selection).index)
+        before = best_of(lambda: chained(selection))
+        positions = best_of(lambda: index.positions(**selection))
+        after = best_of(lambda: index.select(**selection))
+        print(f"{label:<18}{len(expected):>10,}{before:>15.1f}{positions:>14.1f}{after:>13.1f}{before / after:>9.0f}x")
+
+    def cards(filtered):
+        status, kind = find_column(filtered, "status"), find_column(filtered, "event_type")
+        return (len(filtered), len(filtered[filtered[status] == "New"]), len(filtered[filtered[status] == "Ongoing"]),
+                len(filtered[filtered[kind] == "Outbreak"]), filtered[find_column(filtered, "grade")].value_counts())
+
+    kernel = MetricsKernel(df)
+    print(f"\n{'metric cards':<18}{'rows':>10}{'mask+len ms':>15}{'kernel ms':>14}{'speed-up':>10}")
+    for label, selection in selections.items():
+        filtered, positions = index.select(**selection), index.positions(**selection)
+        kpis = index.kpis(**selection)
+        assert cards(filtered)[:4] == (kpis.total, kpis.count("status", "New"), kpis.count("status", "Ongoing"),
+                                       kpis.count("event_type", "Outbreak"))
+        before = best_of(lambda: cards(filtered))
+        after = best_of(lambda: kernel(positions))
+        print(f"{label:<18}{len(filtered):>10,}{before:>15.1f}{after:>14.1f}{before / after:>9.0f}x")
+
+    if index.dates is not None:
+        col = find_column(df, "report_date")
+        print(f"\n{'report_date':<18}{'rows':>10}{'sort+compare ms':>17}{'span ms':>13}{'speed-up':>10}")
+        for days in (7, 30, 90):
+            start, end = index.dates.window(days)
+
+            def compared():
+                dated = df.sort_values(col)
+                return dated[(dated[col] >= start) & (dated[col] < end + pd.Timedelta(days=1))]
+
+            assert len(compared()) == index.dates.count(start, end)
+            before = best_of(compared)
+            after = best_of(lambda: index.dates.positions(start, end))
+            print(f"{f'last {days} days':<18}{index.dates.count(start, end):>10,}{before:>17.1f}{after:>13.3f}"
+                  f"{before / after:>9.0f}x")
+
+    def facets_by_filtering(selection):
+        out = {}
+        for name in FACET_COLUMNS:
+            col = find_column(df, name)
+            if col is None:
+                continue
+            rest = chained({k: v for k, v in selection.items() if k != name})
+            out[name] = rest[col].value_counts().to_dict()
+        return out
+
+    print(f"\n{'facet counts':<18}{'options':>10}{'filter+count ms':>17}{'popcount ms':>13}{'speed-up':>10}")
+    for label, selection in selections.items():
+        expected = facets_by_filtering(selection)
+        facets = index.facets(**selection)
+        assert all({k: v for k, v in facets[name].items() if v} == expected[name] for name in expected)
+        before = best_of(lambda: facets_by_filtering(selection))
+        after = best_of(lambda: index.facets(**selection))
+        options = sum(len(v) for v in facets.values())
+        print(f"{label:<18}{options:>10}{before:>17.1f}{after:>13.1f}{before / after:>9.0f}x")
+
+
+def bench_recent(args):
+    """Newest signals by sorting the filtered table against a partial selection over the date index"""
+    events = apply_schema(load_events(args), dayfirst=args.dayfirst)
+    col = find_column(events, "report_date")
+    print(f"{'rows':>10}  {'selection':<16}{'matching':>10}{'sort+head ms':>14}{'top-k ms':>10}{'speed-up':>10}")
+    for size in args.sizes:
+        df = events.iloc[:size]
+        index = FilterIndex(df)
+        grades = df[find_column(df, "grade")].value_counts().index
+        countries = df[find_column(df, "country")].value_counts().index
+        selections = {
+            "everything": {},
+            "one grade": {"grade": grades[:1].tolist()},
+            "four filters": {"grade": grades[:2].tolist(), "country": countries[:5].tolist(),
+                             "disease": df[find_column(df, "disease")].value_counts().index[:3].tolist()},
+        }
+        for label, selection in selections.items():
+            filtered = index.select(**selection)
+            positions = index.positions(**selection)
+            expected = filtered.sort_values(col, ascending=False, kind="stable").head(args.top)
+            got = index.frame.take(index.dates.latest(args.top, positions))
+            assert got.index.equals(expected.index)
+            before = best_of(lambda: filtered.sort_values(col, ascending=False).head(args.top))
+            after = best_of(lambda: index.frame.take(index.dates.latest(args.top, positions)))
+            print(f"{len(df):>10,}  {label:<16}{len(filtered):>10,}{before:>14.2f}{after:>10.2f}{before / after:>9.0f}x")
+
+
+def _pydeck_per_row(df):
+    """The map layer as the dashboards used to build it: every column, a colour list per row, indented JSON"""
+    import pydeck as pdk
+
+    colors = {"Grade 3": [255, 51, 85, 200], "Grade 2": [255, 153, 51, 200], "Grade 1": [255, 204, 0, 200]}
+    map_df = df.dropna(subset=["lat", "lon"]).copy()
+    map_df["color"] = map_df["grade"].apply(lambda grade: colors.get(grade, [160, 160, 176, 180]))
+    map_df["radius"] = map_df["event_count"].fillna(1) * 5000 + 25000
+    layer = pdk.Layer("ScatterplotLayer", data=map_df, get_position="[lon, lat]", get_color="color",
+                      get_radius="radius", pickable=True)
+    view = pdk.ViewState(latitude=map_df["lat"].mean(), longitude=map_df["lon"].mean(), zoom=3.2)
+    return pdk.Deck(layers=[layer], initial_view_state=view, tooltip={"html": "{country}"}).to_json()
+
+
+def bench_deck(args):
+    """Build time and size of the map layer: per-row pydeck against EventMap's vectorised compact spec"""
+    events = apply_schema(load_events(args), dayfirst=args.dayfirst)
+    event_map = EventMap("bench", None, {"html": "{country}"}, pickable=True)
+    print(f"{'points':>10}{'pydeck ms':>11}{'MB':>8}{'EventMap ms':>13}{'MB':>8}{'speed-up':>10}")
+    for size in args.sizes:
+        df = events.iloc[:size]
+        before_json, after_json = _pydeck_per_row(df), event_map.spec(df)
+        expected = [point["radius"] for point in json.loads(before_json)["layers"][0]["data"]]
+        radii = [point["radius"] for point in json.loads(after_json)["layers"][0]["data"]]
+        assert radii == expected and min(radii) > 0, "EventMap radii differ from the per-row layer"
+        before = best_of(lambda: _pydeck_per_row(df), repeat=args.repeat)
+        after = best_of(lambda: event_map.spec(df), repeat=args.repeat)
+        print(f"{size:>10,}{before:>11.0f}{len(before_json) / 1e6:>8.1f}{after:>13.0f}"
+              f"{len(after_json.encode()) / 1e6:>8.1f}{before / after:>9.0f}x")
+
+
+def bench_cube(args):
+    """Roll-ups from the event cube against group-bys over the raw events, and delta updates against rebuilds"""
+    df = apply_schema(load_events(args), dayfirst=args.dayfirst)
+    start = time.perf_counter()
+    cube = EventCube.build(df)
+    print(f"{len(df):,} events in {len(cube):,} cells, built in {time.perf_counter() - start:.2f}s\n")
+
+    grade, country = find_column(df, "grade"), find_column(df, "country")
+    top = df[country].value_counts().index[:3].tolist()
+
+    def weekly(frame):
+        return frame.groupby(epi_weeks(frame), observed=True).size()
+
+    queries = {
+        "events by grade": (lambda: df.groupby(grade, observed=True).size(),
+                            lambda: cube.rollup("grade")["events"]),
+        "weekly trend": (lambda: weekly(df),
+                         lambda: cube.rollup("epi_week")["events"]),
+        "3 countries x week": (lambda: weekly(df[df[country].isin(top)]),
+                               lambda: cube.slice(country=top).rollup("epi_week")["events"]),
+    }
+    print(f"{'query':<22}{'raw ms':>10}{'cube ms':>10}{'speed-up':>10}")
+    for label, (raw, rolled) in queries.items():
+        before, after = best_of(raw), best_of(rolled)
+        print(f"{label:<22}{before:>10.1f}{after:>10.1f}{before / after:>9.1f}x")
+
+    # A refresh that edits, adds and removes a few events
+    rng = np.random.default_rng(args.seed)
+    changed = df.copy()
+    edits = rng.choice(len(df), args.changes, replace=False)
+    changed.loc[edits[: args.changes // 2], find_column(df, "cases")] += 1
+    changed = changed.drop(index=edits[args.changes // 2:]).reset_index(drop=True)
+    extra = apply_schema(generate_events(args.changes // 2, seed=args.seed + 1), dayfirst=args.dayfirst)
+    changed = pd.concat([changed, extra], ignore_index=True)
+    frames = iter([df, changed])
+    store = EventStore(lambda: next(frames))
+    store.refresh()
+    delta = store.refresh()
+    updated = cube.updated(delta)
+    rebuilt = EventCube.build(store.frame)
+    assert updated.cells.sort_index().equals(rebuilt.cells.sort_index())
+    before = best_of(lambda: EventCube.build(store.frame), repeat=3)
+    after = best_of(lambda: cube.updated(delta), repeat=3)
+    print(f"\n{len(delta):,} changed events: rebuild {before:.0f} ms, "
+          f"apply delta {after:.0f} ms ({before / after:.0f}x)")
+
+
+def stub_server(body, delay):
+    """Local stand-in for the published sheet that counts the requests it gets"""
+    hits = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(time.time())
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/pub?output=csv", hits
+
+
+def bench_herd(args):
+    """Upstream requests made when many sessions refresh at the same moment"""
+    body = load_events(args).to_csv(index=False).encode()
+    server, url, hits = stub_server(body, args.delay)
+
+    def stampede(refresh):
+        barrier = threading.Barrier(args.sessions)
+        errors = []
+
+        def session():
+            barrier.wait()
+            try:
+                refresh()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=session) for _ in range(args.sessions)]
+        hits.clear()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(hits), (time.perf_counter() - start) * 1000, len(errors)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = EventStore(CsvUrlSource(url, directory=directory).load, min_interval=args.min_interval)
+        print(f"{args.sessions} sessions, {len(body) / 1e6:.1f} MB body, {args.delay * 1000:.0f} ms upstream latency\n")
+        print(f"{'strategy':<28}{'requests':>10}{'wall ms':>10}{'errors':>8}")
+        for name, refresh in (("pd.read_csv per session", lambda: pd.read_csv(url)),
+                              ("single-flight store", store.refresh),
+                              ("again within min interval", store.refresh)):
+            requests, wall, errors = stampede(refresh)
+            print(f"{name:<28}{requests:>10}{wall:>10.0f}{errors:>8}")
+    server.shutdown()
+
+
+def _read_in_child(path, streaming, dayfirst):
+    """Read ``path`` in a fresh interpreter so peak RSS belongs to one reader only"""
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    if streaming:
+        frame, _ = read_workbook(path, dayfirst=dayfirst)
+    else:
+        sheets = pd.read_excel(path, sheet_name=None).values()
+        frame = apply_schema(pd.concat(sheets, ignore_index=True), dayfirst=dayfirst)
+    return len(frame), time.perf_counter() - start, peak_rss_mb() - before
+
+
+def bench_xlsx(args):
+    """Throughput and peak memory of pandas.read_excel against the streaming reader"""
+    df = load_events(args)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "events.xlsx")
+        write_xlsx(df, path, args.sheets)
+        print(f"{len(df):,} rows in {args.sheets} sheet(s), {os.path.getsize(path) / 1e6:.1f} MB workbook\n")
+        print(f"{'reader':<24}{'rows':>10}{'seconds':>10}{'rows/s':>10}{'peak RSS +MB':>14}")
+        spawn = multiprocessing.get_context("spawn")
+        for name, streaming in (("pandas.read_excel", False), ("streaming, typed chunks", True)):
+            with spawn.Pool(1) as pool:
+                rows, seconds, rss = pool.apply(_read_in_child, (path, streaming, args.dayfirst))
+            print(f"{name:<24}{rows:>10,}{seconds:>10.2f}{rows / seconds:>10,.0f}{rss:>14.0f}")
+
+
+def make_fixtures(args):
+    """Write synthetic events as CSV, XLSX and Parquet fixtures"""
+    start = time.perf_counter()
+    df = generate_events(args.rows, seed=args.seed)
+    print(f"{len(df):,} events generated in {time.perf_counter() - start:.1f}s")
+    for fmt in args.formats:
+        start = time.perf_counter()
+        path, = write_fixtures(df, args.out, formats=(fmt,), name=f"events_{args.rows}")
+        print(f"{str(path):<40}{os.path.getsize(path) / 1e6:>8.1f} MB{time.perf_counter() - start:>8.1f}s")
+
+
+RERUN_STEPS = (
+    ("first load", None, {}),
+    ("full rerun", "", {}),
+    ("grade filter", "Grade", {"prefix": "Grade 3"}),
+    ("period", "Reported", {"value": "Last 30 days"}),
+    ("match filters off", "Match filters", {"value": False}),
+    ("theme toggle", "🌙", {"click": True}),   # two-theme dashboards only
+)
+
+
+class StreamlitSession:
+    """Minimal browser stand-in: sends reruns over the websocket and counts what comes back"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.widgets = {}   # label -> (element proto, fragment id)
+        self.states = {}    # widget id -> WidgetState sent with every rerun
+        self.cached = set()   # hashes of the messages a browser would keep and report back
+
+    async def rerun(self, fragment_id=""):
+        """Milliseconds, bytes and deltas until the run (or fragment run) finishes"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        message.rerun_script.fragment_id = fragment_id
+        message.rerun_script.cached_message_hashes.extend(self.cached)
+        start = time.perf_counter()
+        await self.connection.send(message.SerializeToString())
+        received = deltas = 0
+        while True:
+            raw = await self.connection.recv()
+            received += len(raw)
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if forward.metadata.cacheable:
+                self.cached.add(forward.hash)
+            if kind == "delta":
+                deltas += 1
+                self.track(forward.delta)
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return (time.perf_counter() - start) * 1000, received, deltas
+
+    def track(self, delta):
+        """Remember widgets by label and keep the sent selections in step with relabelled options"""
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        widget = getattr(element, element.WhichOneof("type"))
+        if not getattr(widget, "id", "") or not getattr(widget, "label", ""):
+            return
+        self.widgets[widget.label] = (widget, delta.fragment_id)
+        state = self.states.get(widget.id)
+        if state is not None and state.WhichOneof("value") == "string_array_value":
+            # Facet counts are part of the option labels; a browser follows the new labels
+            current = {option.split(" (")[0]: option for option in widget.options}
+            selected = [current[label.split(" (")[0]] for label in state.string_array_value.data
+                        if label.split(" (")[0] in current]
+            del state.string_array_value.data[:]
+            state.string_array_value.data.extend(selected)
+
+    async def interact(self, label, prefix=None, value=None, click=False):
+        """Set the widget called ``label`` and rerun whatever its change triggers"""
+        from streamlit.proto.Common_pb2 import StringArray
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget, fragment_id = self.widgets[label]
+        state = WidgetState(id=widget.id)
+        if click:
+            state.trigger_value = True
+        elif prefix is not None:
+            state.string_array_value.CopyFrom(StringArray(data=[o for o in widget.options if o.startswith(prefix)]))
+        elif isinstance(value, bool):
+            state.bool_value = value
+        else:
+            state.string_value = value
+        self.states[widget.id] = state
+        try:
+            return await self.rerun(fragment_id)
+        finally:
+            if click:
+                del self.states[widget.id]   # a trigger is only sent with the run it causes
+
+
+async def _drive(url):
+    import websockets
+
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as connection:
+        session = StreamlitSession(connection)
+        return [(name, await (session.interact(label, **change) if label else session.rerun()))
+                for name, label, change in RERUN_STEPS if not label or label in session.widgets]
+
+
+def bench_reruns(args):
+    """Time and bytes a dashboard sends back for a full rerun and for each kind of filter change"""
+    import asyncio
+    import importlib.util
+    import urllib.request
+
+    if importlib.util.find_spec("websockets") is None:
+        raise SystemExit("reruns talks to Streamlit's websocket directly and needs the websockets package, "
+                         "which the dashboards themselves do not: pip install websockets")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = dict(os.environ)
+    if args.synthetic:
+        env["WHO_DATA_SOURCE"] = f"synthetic:?rows={args.rows}&seed={args.seed}"
+    elif args.csv:
+        env["WHO_DATA_SOURCE"] = args.csv
+    with tempfile.TemporaryDirectory() as directory:
+        env["WHO_SNAPSHOT_DIR"] = directory
+        server = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", args.app, "--server.headless", "true",
+             "--server.port", str(port), "--server.enableXsrfProtection", "false",
+             "--browser.gatherUsageStats", "false"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.time() + 60
+            while True:
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+                    break
+                except OSError:
+                    if time.time() > deadline or server.poll() is not None:
+                        raise RuntimeError(f"streamlit did not come up on port {port}")
+                    time.sleep(0.2)
+            results = asyncio.run(_drive(f"ws://127.0.0.1:{port}/_stcore/stream"))
+        finally:
+            server.terminate()
+            server.wait()
+    print(f"{args.app}\n")
+    print(f"{'step':<20}{'ms':>8}{'KB sent':>10}{'deltas':>8}")
+    for name, (ms, received, deltas) in results:
+        print(f"{name:<20}{ms:>8.0f}{received / 1024:>10.0f}{deltas:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    schema = sub.add_parser("schema", help=bench_schema.__doc__)
+    schema.set_defaults(run=bench_schema)
+
+    herd = sub.add_parser("herd", help=bench_herd.__doc__)
+    herd.add_argument("--sessions", type=int, default=50)
+    herd.add_argument("--delay", type=float, default=0.5, help="seconds the stub server takes to answer")
+    herd.add_argument("--min-interval", type=float, default=60)
+    herd.set_defaults(run=bench_herd)
+
+    xlsx = sub.add_parser("xlsx", help=bench_xlsx.__doc__)
+    xlsx.add_argument("--sheets", type=int, default=4, help="tabs to spread the rows over")
+    xlsx.set_defaults(run=bench_xlsx)
+
+    filters = sub.add_parser("filters", help=bench_filters.__doc__)
+    filters.set_defaults(run=bench_filters)
+
+    recent = sub.add_parser("recent", help=bench_recent.__doc__)
+    recent.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000],
+                        help="table sizes to measure, each a prefix of --rows events")
+    recent.add_argument("--top", type=int, default=10, help="signals to pick, as the Recent Signals feed does")
+    recent.set_defaults(run=bench_recent)
+
+    deck = sub.add_parser("deck", help=bench_deck.__doc__)
+    deck.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000],
+                      help="points to plot, each a prefix of --rows events")
+    deck.add_argument("--repeat", type=int, default=3)
+    deck.set_defaults(run=bench_deck)
+
+    cube = sub.add_parser("cube", help=bench_cube.__doc__)
+    cube.add_argument("--changes", type=int, default=1000, help="events a simulated refresh edits, adds and removes")
+    cube.set_defaults(run=bench_cube)
+
+    fixtures = sub.add_parser("fixtures", help=make_fixtures.__doc__)
+    fixtures.add_argument("--out", default="fixtures", help="directory to write the fixtures to")
+    fixtures.add_argument("--formats", nargs="+", default=["csv", "parquet", "xlsx"], choices=["csv", "parquet", "xlsx"])
+    fixtures.set_defaults(run=make_fixtures)
+
+    reruns = sub.add_parser("reruns", help=bench_reruns.__doc__)
+    reruns.add_argument("app", help="dashboard script to serve, e.g. scripts/app.py")
+    reruns.set_defaults(run=bench_reruns)
+
+    for command in sub.choices.values():
+        command.add_argument("--csv", help="read events from this CSV instead of the published sheet")
+        command.add_argument("--synthetic", action="store_true", help="generate --rows events instead (see who_data.synthetic)")
+        command.add_argument("--rows", type=int, default=100_000, help="resample the events to this many rows")
+        command.add_argument("--seed", type=int, default=0)
+        command.add_argument("--dayfirst", action="store_true", help="parse dates as DD/MM/YYYY")
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
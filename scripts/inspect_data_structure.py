@@ -1,31 +1,54 @@
+"""
+Inspect the WHO event tracker feed.
+
+    python scripts/inspect_data_structure.py
+    python scripts/inspect_data_structure.py --profile --dayfirst
+    python scripts/inspect_data_structure.py --csv events.csv --json report.json
+
+By default prints columns, dtypes, nulls and HTML found in descriptions,
+with what ``sanitize_descriptions`` turns it into.
+``--profile`` also times download, parse, date parsing and WEEKLINE
+decoding (the old per-row regex next to ``parse_weeklines``) separately,
+shows deep memory per column with a cheaper dtype to store it in, and
+``--json`` writes the same figures as a report that can be compared from
+one run to the next.
+"""
+import argparse
+import json
+import time
+import urllib.request
+from io import BytesIO
+
+import numpy as np
 import pandas as pd
 
-# Load the data from the URL
-url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQZWLeXBFUhH05FAjiJeZZxoGtm-coEqBASMOz_UrUt_VQeewe9qbOXYZmLQcJTJitOk5nd14zVCQAx/pub?output=csv"
+from who_data import EVENT_SCHEMA, SHEET_CSV_URL, CsvUrlSource, parse_weeklines
+from who_data.columns import find_column
+from who_data.schema import convert_column
+from who_data.text import plain_text
 
-print("📊 Loading data from WHO Event Tracker...")
-print(f"URL: {url}\n")
+CATEGORY_MAX_RATIO = 0.5   # suggest a categorical when at most this share of values is distinct
 
-try:
-    df = pd.read_csv(url)
-    
+
+def describe(df):
+    """Print columns, dtypes, sample values, HTML in descriptions and nulls"""
     print("=" * 80)
     print("DATASET OVERVIEW")
     print("=" * 80)
     print(f"Total rows: {len(df)}")
     print(f"Total columns: {len(df.columns)}\n")
-    
+
     print("=" * 80)
     print("COLUMN NAMES")
     print("=" * 80)
     for i, col in enumerate(df.columns, 1):
         print(f"{i:2d}. {col}")
-    
+
     print("\n" + "=" * 80)
     print("DATA TYPES")
     print("=" * 80)
     print(df.dtypes)
-    
+
     print("\n" + "=" * 80)
     print("FIRST 3 ROWS OF DATA")
     print("=" * 80)
@@ -34,15 +57,15 @@ try:
     pd.set_option('display.width', None)
     pd.set_option('display.max_colwidth', 50)
     print(df.head(3))
-    
+
     print("\n" + "=" * 80)
     print("KEY COLUMNS SAMPLE DATA")
     print("=" * 80)
-    
+
     # Check for important columns
-    important_cols = ['country', 'disease', 'grade', 'event_type', 'status', 
+    important_cols = ['country', 'disease', 'grade', 'event_type', 'status',
                       'description', 'cases', 'deaths', 'lat', 'lon', 'report_date']
-    
+
     for col in important_cols:
         if col in df.columns:
             print(f"\n{col.upper()}:")
@@ -51,21 +74,23 @@ try:
             print(f"  - Sample values: {df[col].dropna().unique()[:5].tolist()}")
         else:
             print(f"\n{col.upper()}: ❌ NOT FOUND IN DATASET")
-    
+
     print("\n" + "=" * 80)
     print("CHECKING FOR HTML IN DESCRIPTION COLUMN")
     print("=" * 80)
-    
+
     if 'description' in df.columns:
         html_pattern = df['description'].astype(str).str.contains('<', na=False)
         html_count = html_pattern.sum()
         print(f"Rows with HTML tags in description: {html_count} out of {len(df)}")
-        
+
         if html_count > 0:
             print("\nSample descriptions with HTML:")
-            for idx, desc in enumerate(df[html_pattern]['description'].head(3), 1):
+            samples = df[html_pattern]['description'].head(3)
+            for idx, (desc, text) in enumerate(zip(samples, plain_text(samples)), 1):
                 print(f"\n{idx}. {desc[:200]}...")
-    
+                print(f"   as plain text: {text[:200]}...")
+
     print("\n" + "=" * 80)
     print("NULL VALUE SUMMARY")
     print("=" * 80)
@@ -77,8 +102,164 @@ try:
             print(f"{col}: {count} ({pct:.1f}%)")
     else:
         print("No missing values found!")
-        
-except Exception as e:
-    print(f"❌ Error loading data: {e}")
-    import traceback
-    traceback.print_exc()
+
+
+def timed(timings, stage, fn):
+    """Run ``fn``, record its wall time in ms under ``stage`` and return its result"""
+    start = time.perf_counter()
+    result = fn()
+    timings[stage] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def suggest_dtype(series):
+    """Cheapest dtype that holds ``series`` without losing information, or None if it is already right"""
+    schema = {name.lower(): kind for name, kind in EVENT_SCHEMA.items()}
+    kind = schema.get(str(series.name).lower())
+    if kind is not None:
+        return None if str(series.dtype).startswith(kind) else kind
+
+    values = series.dropna()
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype) or values.empty:
+        return None
+    if not pd.api.types.is_numeric_dtype(series):
+        numbers = pd.to_numeric(values, errors="coerce")
+        if numbers.notna().all():
+            values = numbers
+        elif values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            return "category"
+        else:
+            # Free text: one Arrow buffer instead of a Python object per cell
+            return "string[pyarrow]" if series.dtype == object else None
+
+    integral = bool((values == np.round(values)).all())
+    if integral and values.abs().max() <= np.iinfo(np.int32).max:
+        target = "int32" if len(values) == len(series) else "Int32"
+    else:
+        target = "float32"
+    return None if str(series.dtype) == target else target
+
+
+def memory_report(df):
+    """Deep memory per column now and after casting to the suggested dtype"""
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        current = int(series.memory_usage(deep=True, index=False))
+        suggested = suggest_dtype(series)
+        after = current
+        if suggested is not None:
+            cast = series.astype(suggested) if suggested == "string[pyarrow]" else convert_column(series, suggested)
+            after = int(cast.memory_usage(deep=True, index=False))
+        rows.append({
+            "column": col,
+            "dtype": str(series.dtype),
+            "nulls": int(series.isna().sum()),
+            "unique": int(series.nunique()),
+            "memory_bytes": current,
+            "suggested_dtype": suggested,
+            "suggested_memory_bytes": after,
+        })
+    return rows
+
+
+def profile(args):
+    """Time each ingestion stage and measure memory, returning the report and the parsed frame"""
+    timings = {}
+    if args.csv:
+        source = args.csv
+        body = timed(timings, "read_file", lambda: open(args.csv, "rb").read())
+    else:
+        source = SHEET_CSV_URL
+        body = timed(timings, "download", lambda: urllib.request.urlopen(SHEET_CSV_URL, timeout=60).read())
+    df = timed(timings, "parse_csv", lambda: pd.read_csv(BytesIO(body)))
+
+    for name in ("report_date", "start_date"):
+        col = find_column(df, name)
+        if col is not None:
+            timed(timings, f"parse_dates_{name}",
+                  lambda col=col: pd.to_datetime(df[col], dayfirst=args.dayfirst, errors="coerce"))
+    col = find_column(df, "weekline")
+    if col is not None:
+        timed(timings, "weekline_year_regex",
+              lambda: df[col].astype(str).str.extract(r'(\d{4})')[0].astype(float).astype('Int64'))
+        timed(timings, "weekline_parse", lambda: parse_weeklines(df[col]))
+
+    columns = memory_report(df)
+    report = {
+        "source": source,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "bytes": len(body),
+        "rows": len(df),
+        "columns": len(df.columns),
+        "timings_ms": timings,
+        "memory_bytes": sum(c["memory_bytes"] for c in columns),
+        "suggested_memory_bytes": sum(c["suggested_memory_bytes"] for c in columns),
+        "column_report": columns,
+    }
+    return report, df
+
+
+def print_profile(report):
+    print("=" * 80)
+    print("INGESTION TIMINGS")
+    print("=" * 80)
+    print(f"{report['bytes'] / 1e6:.2f} MB, {report['rows']:,} rows, {report['columns']} columns")
+    for stage, ms in report["timings_ms"].items():
+        print(f"{stage:<28}{ms:>10.1f} ms")
+
+    print("\n" + "=" * 80)
+    print("MEMORY PER COLUMN (deep)")
+    print("=" * 80)
+    print(f"{'column':<24}{'dtype':<16}{'MB':>8}   {'suggested':<16}{'MB':>8}")
+    for c in sorted(report["column_report"], key=lambda c: -c["memory_bytes"]):
+        suggested = c["suggested_dtype"] or "-"
+        print(f"{c['column']:<24}{c['dtype']:<16}{c['memory_bytes'] / 1e6:>8.2f}   "
+              f"{suggested:<16}{c['suggested_memory_bytes'] / 1e6:>8.2f}")
+    print(f"{'whole frame':<40}{report['memory_bytes'] / 1e6:>8.2f}   "
+          f"{'':<16}{report['suggested_memory_bytes'] / 1e6:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", help="inspect this CSV instead of the published sheet")
+    parser.add_argument("--profile", action="store_true", help="time each ingestion stage and report memory per column")
+    parser.add_argument("--json", metavar="PATH", help="write the profile as JSON to PATH ('-' for stdout)")
+    parser.add_argument("--dayfirst", action="store_true", help="parse dates as DD/MM/YYYY")
+    args = parser.parse_args()
+    quiet = args.json == "-"
+
+    if not quiet:
+        print("📊 Loading data from WHO Event Tracker...")
+        print(f"URL: {args.csv or SHEET_CSV_URL}\n")
+
+    try:
+        if args.profile or args.json:
+            report, df = profile(args)
+        else:
+            source = CsvUrlSource(SHEET_CSV_URL)
+            df = pd.read_csv(args.csv) if args.csv else source.load()
+            if not args.csv:
+                print(f"Snapshot: {source.snapshot.status} ({source.snapshot.data_path})\n")
+            report = None
+    except Exception as e:
+        print(f"❌ Error loading data: {e}")
+        import traceback
+        traceback.print_exc()
+        raise SystemExit(1)
+
+    if quiet:
+        print(json.dumps(report, indent=2))
+        return
+    describe(df)
+    if report is not None:
+        print()
+        print_profile(report)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
-import pydeck as pdk
+
+from who_data import (
+    DATA_SOURCE, PERIODS, SHARED_SNAPSHOT_PATH, SHEET_CSV_URL, BackgroundRefresher, EventMap, EventStore,
+    FilteredViews, SharedSnapshot, apply_schema, degraded_notice, facet_format, live_badge, parse_weeklines,
+    source_from_uri,
+)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # WHO Signal Intelligence Dashboard - Light Neumorphic Theme
@@ -16,26 +20,65 @@ st.set_page_config(
 # ═══════════════════════════════════════════════════════════════════════════════
 # LOAD DATA
 # ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=3600)
-def load_data():
-    """Load WHO event data from Google Sheets"""
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQZWLeXBFUhH05FAjiJeZZxoGtm-coEqBASMOz_UrUt_VQeewe9qbOXYZmLQcJTJitOk5nd14zVCQAx/pub?output=csv"
-    df = pd.read_csv(url)
-    
+def clean_events(df):
+    """Normalise the sheet columns and apply the typed schema"""
     # Clean column names
     df.columns = df.columns.str.upper()
     
-    # Add year if weekline exists
+    # Add year, ISO week and week start if weekline exists (each distinct label parsed once)
     if 'WEEKLINE' in df.columns:
-        df['YEAR'] = df['WEEKLINE'].str.extract(r'(\d{4})').astype(float).astype('Int64')
-    
-    # Parse dates
-    if 'REPORT_DATE' in df.columns:
-        df['REPORT_DATE'] = pd.to_datetime(df['REPORT_DATE'], dayfirst=True, errors='coerce')
+        weeks = parse_weeklines(df['WEEKLINE'])
+        df['YEAR'], df['EPI_WEEK'], df['WEEK_START'] = weeks['year'], weeks['week'], weeks['week_start']
     
-    return df
+    # Typed columns: categories, float32 coordinates, Int32 counts, parsed dates
+    return apply_schema(df, dayfirst=True)
+
+REFRESH_TTL = 3600   # seconds a pull of the sheet stays fresh
+REFRESH_LEAD = 120   # start re-pulling this long before it expires
+REFRESH_MIN_INTERVAL = 60   # concurrent or repeated refreshes within this window share one pull
+VIEW_CACHE_BUDGET = 256 * 2**20   # bytes of filtered tables kept for reuse across sessions
+
+SHARED_POLL = 60   # how often workers look for a newer shared snapshot
+
+@st.cache_resource
+def get_store():
+    """Process-wide event table kept fresh by a background refresher"""
+    source = source_from_uri(DATA_SOURCE or SHEET_CSV_URL, prepare=clean_events)
+    if SHARED_SNAPSHOT_PATH:
+        # One worker downloads and publishes; the others map its Arrow file
+        shared = SharedSnapshot(SHARED_SNAPSHOT_PATH)
+        # Freshness comes from when upstream last confirmed the data, not from each poll of the file
+        loader = shared.loader(lambda: source.load(max_age=REFRESH_TTL - REFRESH_LEAD),
+                               checked_at=lambda: source.checked_at)
+        store = EventStore(loader, ttl=REFRESH_TTL, min_interval=REFRESH_MIN_INTERVAL,
+                           checked_at=shared.checked_at, fallback=shared.cached)
+        refresher = BackgroundRefresher(store, ttl=SHARED_POLL, lead=0)
+    else:
+        store = EventStore(source.load, ttl=REFRESH_TTL, min_interval=REFRESH_MIN_INTERVAL,
+                           checked_at=lambda: source.checked_at, fallback=source.cached)
+        refresher = BackgroundRefresher(store, lead=REFRESH_LEAD)
+    if source.cached() is not None:
+        # Serve the snapshot on disk straight away; the refresher brings it up to date
+        store.apply(source.cached(), refreshed_at=source.checked_at)
+    refresher.start()
+    return store
 
-df = load_data()
+@st.cache_resource
+def get_views():
+    """Filtered tables shared by every session, keyed by snapshot version and selection"""
+    return FilteredViews(get_store(), budget=VIEW_CACHE_BUDGET)
+
+def load_data():
+    """Load WHO event data (Google Sheets unless WHO_DATA_SOURCE says otherwise) without waiting on the network"""
+    return get_store().current()
+
+store = get_store()
+views = get_views()
+try:
+    df = load_data()
+except Exception as e:
+    st.error(f"The WHO data source could not be reached and no snapshot is saved yet: {e}")
+    st.stop()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CSS STYLING - Neumorphic Light Theme
@@ -116,6 +159,10 @@ section[data-testid="stSidebar"] {
     padding: 4px 10px;
     border-radius: 12px;
 }
+.live-badge.stale {
+    background: linear-gradient(135deg, #ff9933, #ffb366);
+    box-shadow: none;
+}
 
 /* Metrics */
 .metric-card {
@@ -149,46 +196,87 @@ section[data-testid="stSidebar"] {
 # ═══════════════════════════════════════════════════════════════════════════════
 # SIDEBAR FILTERS
 # ═══════════════════════════════════════════════════════════════════════════════
-with st.sidebar:
+# Filters live in session state; every fragment below reads them through current_selections()
+FILTER_KEYS = {'grade': 'gr', 'country': 'co', 'disease': 'ds', 'event_type': 'et'}
+# Fragments that read the filters: a filter change reruns these and leaves the theme and header as sent
+FILTER_DEPENDENTS = ['filters', 'grade_summary', 'weekly_trend', 'metrics', 'map', 'cache_stats']
+
+def current_selections():
+    """The sidebar selection as FilteredViews takes it, read back from session state"""
+    index = views.index()
+    dates = index.dates
+    period = st.session_state.get('rp', next(iter(PERIODS)))
+    reported = dates.window(PERIODS[period]) if dates is not None else None
+    # The year box defaults to the latest year before it has been touched
+    year = st.session_state.get('yr', max(index.totals.get('year', {}), default=None))
+    filters = {name: st.session_state.get(key, []) for name, key in FILTER_KEYS.items()}
+    return dict(report_date=reported, year=[year] if year else None, **filters)
+
+def rerun_dependents():
+    st.rerun(FILTER_DEPENDENTS)
+
+def rerun_grade_summary():
+    st.rerun(['grade_summary', 'cache_stats'])
+
+@st.fragment(key="filters")
+def filters():
+    """Reporting period, year and the four facet filters, with their cross-filter counts"""
+    index = views.index()
+    df = index.frame
+    selections = current_selections()
+    reported = selections["report_date"]
+    st.markdown('<div class="sidebar-title">📅 Reported</div>', unsafe_allow_html=True)
+    st.selectbox("Reported", list(PERIODS), key="rp", label_visibility="collapsed", on_change=rerun_dependents)
+    if reported is not None:
+        st.caption(f"{reported[0]:%d %b %Y} – {reported[1]:%d %b %Y} · {index.dates.count(*reported):,} events")
+
+    years = sorted(df['YEAR'].dropna().unique(), reverse=True) if 'YEAR' in df.columns else []
+    # Cross-filter counts: how many events each option keeps under the other selections
+    facets = views.cached("facets", selections, lambda index, selections: index.facets(**selections))
     st.markdown('<div class="sidebar-title">🎛️ Filter by Grade</div>', unsafe_allow_html=True)
-    selected_grades = st.multiselect("Grade", sorted(df['GRADE'].dropna().unique()) if 'GRADE' in df.columns else [], key="gr", label_visibility="collapsed")
-    
+    if 'GRADE' in df.columns:
+        st.multiselect("Grade", sorted(df['GRADE'].dropna().unique()), key="gr",
+                       format_func=facet_format(facets.get("grade", {})), label_visibility="collapsed",
+                       on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">📅 Year</div>', unsafe_allow_html=True)
     if 'YEAR' in df.columns:
-        years = sorted(df['YEAR'].dropna().unique(), reverse=True)
-        selected_year = st.selectbox("Year", years, key="yr", label_visibility="collapsed")
-    else:
-        selected_year = None
-    
+        st.selectbox("Year", years, key="yr", label_visibility="collapsed", on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🚨 Event Type</div>', unsafe_allow_html=True)
     if 'EVENT_TYPE' in df.columns:
-        selected_types = st.multiselect("Type", sorted(df['EVENT_TYPE'].dropna().unique()), key="et", label_visibility="collapsed")
-    else:
-        selected_types = []
-    
+        st.multiselect("Type", sorted(df['EVENT_TYPE'].dropna().unique()), key="et",
+                       format_func=facet_format(facets.get("event_type", {})), label_visibility="collapsed",
+                       on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🌍 Country</div>', unsafe_allow_html=True)
     if 'COUNTRY' in df.columns:
-        selected_countries = st.multiselect("Country", sorted(df['COUNTRY'].dropna().unique()), key="co", label_visibility="collapsed")
-    else:
-        selected_countries = []
-    
+        st.multiselect("Country", sorted(df['COUNTRY'].dropna().unique()), key="co",
+                       format_func=facet_format(facets.get("country", {})), label_visibility="collapsed",
+                       on_change=rerun_dependents)
+
     st.markdown('<div class="sidebar-title">🦠 Disease</div>', unsafe_allow_html=True)
     if 'DISEASE' in df.columns:
-        selected_diseases = st.multiselect("Disease", sorted(df['DISEASE'].dropna().unique()), key="ds", label_visibility="collapsed")
-    else:
-        selected_diseases = []
-    
-    # Grade Summary
+        st.multiselect("Disease", sorted(df['DISEASE'].dropna().unique()), key="ds",
+                       format_func=facet_format(facets.get("disease", {})), label_visibility="collapsed",
+                       on_change=rerun_dependents)
+
+@st.fragment(key="grade_summary")
+def grade_summary():
+    """Grade counts; the "Match filters" toggle reruns only this fragment and the cache counters"""
     st.markdown('<div class="sidebar-title">📊 Grade Summary</div>', unsafe_allow_html=True)
     if 'GRADE' in df.columns:
-        gc = df['GRADE'].value_counts()
+        # Served from the snapshot's count tables, never from a scan of the table
+        match_filters = st.toggle("Match filters", value=True, key="gs", help="Count only the events the filters keep",
+                              on_change=rerun_grade_summary)
+        gc = views.kpis(**current_selections()).counts["grade"] if match_filters else views.index().totals["grade"]
         g3 = gc.get('Grade 3', 0)
         g2 = gc.get('Grade 2', 0)
         g1 = gc.get('Grade 1', 0)
         gu = gc.get('Ungraded', 0)
     else:
         g3 = g2 = g1 = gu = 0
-    
+
     st.markdown(f"""
     <div style="display:flex;flex-direction:column;gap:6px;">
         <div style="display:flex;justify-content:space-between;padding:6px 10px;background:#e8eef5;border-radius:8px;box-shadow:inset 2px 2px 4px #d1d9e6,inset -2px -2px 4px #fff;border-left:3px solid #ff3355;">
@@ -210,122 +298,124 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# FILTER DATA
-# ═══════════════════════════════════════════════════════════════════════════════
-filtered_df = df.copy()
-if selected_year and 'YEAR' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['YEAR'] == selected_year]
-if selected_grades:
-    filtered_df = filtered_df[filtered_df['GRADE'].isin(selected_grades)]
-if selected_types:
-    filtered_df = filtered_df[filtered_df['EVENT_TYPE'].isin(selected_types)]
-if selected_countries:
-    filtered_df = filtered_df[filtered_df['COUNTRY'].isin(selected_countries)]
-if selected_diseases:
-    filtered_df = filtered_df[filtered_df['DISEASE'].isin(selected_diseases)]
+@st.fragment(key="weekly_trend")
+def weekly_trend():
+    """Events per epi-week for the current filters"""
+    st.markdown('<div class="sidebar-title">📈 Weekly Trend</div>', unsafe_allow_html=True)
+    # Rolled up from the pre-aggregated cube, which refreshes update from their deltas
+    weekly = views.weekly(26, **current_selections())
+    if weekly.empty:
+        st.info("No dated events match the current filters")
+    else:
+        st.bar_chart(weekly, height=140)
+
+with st.sidebar:
+    filters()
+    grade_summary()
+    weekly_trend()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # HEADER
 # ═══════════════════════════════════════════════════════════════════════════════
-st.markdown("""
+st.markdown(f"""
 <div class="header-bar">
     <div>
         <div class="header-title">🌍 WHO Signal Intelligence Dashboard</div>
         <div style="font-size:11px;color:#6a7a94;">Live tracking of graded events in the African region</div>
     </div>
-    <div class="live-badge">● LIVE</div>
+    {live_badge(store)}
 </div>
 """, unsafe_allow_html=True)
 
+notice = degraded_notice(store)
+if notice:
+    st.warning(notice, icon="⚠️")
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # METRICS
 # ═══════════════════════════════════════════════════════════════════════════════
-col1, col2, col3, col4 = st.columns(4)
+@st.fragment(key="metrics")
+def metrics():
+    """The four KPI cards"""
+    kpis = views.kpis(**current_selections())   # every card from one pass over the category codes
+    col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">{len(filtered_df)}</div>
-        <div class="metric-label">Total Events</div>
-    </div>
-    """, unsafe_allow_html=True)
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{kpis.total}</div>
+            <div class="metric-label">Total Events</div>
+        </div>
+        """, unsafe_allow_html=True)
 
-with col2:
-    new_count = len(filtered_df[filtered_df['STATUS'] == 'New']) if 'STATUS' in filtered_df.columns else 0
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">{new_count}</div>
-        <div class="metric-label">New Events</div>
-    </div>
-    """, unsafe_allow_html=True)
+    with col2:
+        new_count = kpis.count('status', 'New')
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{new_count}</div>
+            <div class="metric-label">New Events</div>
+        </div>
+        """, unsafe_allow_html=True)
 
-with col3:
-    ongoing = len(filtered_df[filtered_df['STATUS'] == 'Ongoing']) if 'STATUS' in filtered_df.columns else 0
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">{ongoing}</div>
-        <div class="metric-label">Ongoing</div>
-    </div>
-    """, unsafe_allow_html=True)
+    with col3:
+        ongoing = kpis.count('status', 'Ongoing')
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{ongoing}</div>
+            <div class="metric-label">Ongoing</div>
+        </div>
+        """, unsafe_allow_html=True)
 
-with col4:
-    outbreaks = len(filtered_df[filtered_df['EVENT_TYPE'] == 'Outbreak']) if 'EVENT_TYPE' in filtered_df.columns else 0
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">{outbreaks}</div>
-        <div class="metric-label">Outbreaks</div>
-    </div>
-    """, unsafe_allow_html=True)
+    with col4:
+        outbreaks = kpis.count('event_type', 'Outbreak')
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{outbreaks}</div>
+            <div class="metric-label">Outbreaks</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+metrics()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAP
 # ═══════════════════════════════════════════════════════════════════════════════
-st.markdown('<div style="height:20px;"></div>', unsafe_allow_html=True)
+# Opaque markers coloured by grade over the whole region; the data is filled in per selection by views.deck
+EVENT_MAP = EventMap(
+    'light-neumorphic', 'mapbox://styles/mapbox/light-v11',
+    tooltip={
+        'html': '<b>{COUNTRY}</b><br/>{DISEASE}<br/>{GRADE}',
+        'style': {'color': 'white', 'backgroundColor': '#2c3e50'}
+    },
+    colors={'Grade 3': (255, 51, 85, 255), 'Grade 2': (255, 153, 51, 255), 'Grade 1': (255, 204, 0, 255)},
+    other_color=(160, 160, 176, 255), fields=('COUNTRY', 'DISEASE', 'GRADE'), radius=50000, zoom=2, center=(0, 20),
+    pickable=True, auto_highlight=True,
+)
 
-if 'LAT' in filtered_df.columns and 'LON' in filtered_df.columns:
-    # Prepare map data
-    map_df = filtered_df.dropna(subset=['LAT', 'LON']).copy()
-    
-    # Color mapping for grades
-    def get_color(grade):
-        colors = {
-            'Grade 3': [255, 51, 85],
-            'Grade 2': [255, 153, 51],
-            'Grade 1': [255, 204, 0],
-            'Ungraded': [160, 160, 176]
-        }
-        return colors.get(grade, [160, 160, 176])
-    
-    map_df['color'] = map_df['GRADE'].apply(get_color) if 'GRADE' in map_df.columns else [[160, 160, 176]] * len(map_df)
-    
-    # Create map
-    st.pydeck_chart(pdk.Deck(
-        map_style='mapbox://styles/mapbox/light-v11',
-        initial_view_state=pdk.ViewState(
-            latitude=0,
-            longitude=20,
-            zoom=2,
-            pitch=0,
-        ),
-        layers=[
-            pdk.Layer(
-                'ScatterplotLayer',
-                data=map_df,
-                get_position='[LON, LAT]',
-                get_color='color',
-                get_radius=50000,
-                pickable=True,
-                auto_highlight=True,
-            ),
-        ],
-        tooltip={
-            'html': '<b>{COUNTRY}</b><br/>{DISEASE}<br/>{GRADE}',
-            'style': {'color': 'white', 'backgroundColor': '#2c3e50'}
-        }
-    ))
-else:
-    st.info("No geographic data available for mapping.")
+@st.fragment(key="map")
+def event_map():
+    """The deck of matching events"""
+    st.markdown('<div style="height:20px;"></div>', unsafe_allow_html=True)
+
+    # Built once per snapshot and selection; an unchanged map is byte-identical and not re-sent
+    deck = views.deck(EVENT_MAP, **current_selections())
+    if deck is not None:
+        st.pydeck_chart(deck)
+    else:
+        st.info("No geographic data available for mapping.")
+
+event_map()
 
 st.markdown("---")
 st.caption("Data updates every hour • WHO African Region")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# VIEW CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+@st.fragment(key="cache_stats")
+def cache_stats():
+    """View cache counters, rerun after every panel that reads the cache so they include its lookups"""
+    st.caption(views.describe())
+
+with st.sidebar:
+    cache_stats()
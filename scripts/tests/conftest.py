@@ -0,0 +1,81 @@
+"""Make ``who_data`` importable when pytest runs from the repository root, and stub the published sheet"""
+import hashlib
+import http.server
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROWS = 200
+
+
+def sheet_csv(rows=ROWS, disease="Cholera"):
+    """A small published sheet as CSV bytes"""
+    return pd.DataFrame({
+        "country": [f"Country {i}" for i in range(rows)],
+        "disease": [disease] * rows,
+        "grade": ["Grade 1", "Grade 2", "Grade 3", "Ungraded"] * (rows // 4),
+    }).to_csv(index=False).encode()
+
+
+class StubSheet:
+    """
+    Local stand-in for the published sheet.
+
+    Serves ``body`` with an ETag and answers a matching ``If-None-Match``
+    with 304, like Google does; ``validators = False`` drops the ETag so
+    every request gets the full body. ``delay`` seconds pass before each
+    answer, and the headers of every request are kept in ``hits``.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.validators = True
+        self.delay = 0
+        self.hits = []
+        self.url = None
+
+    @property
+    def etag(self):
+        return f'"{hashlib.sha1(self.body).hexdigest()[:16]}"'
+
+    def handler(self):
+        sheet = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                sheet.hits.append(dict(self.headers))
+                time.sleep(sheet.delay)
+                if sheet.validators and self.headers.get("If-None-Match") == sheet.etag:
+                    self.send_response(304)
+                    self.send_header("ETag", sheet.etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(sheet.body)))
+                if sheet.validators:
+                    self.send_header("ETag", sheet.etag)
+                self.end_headers()
+                self.wfile.write(sheet.body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def sheet():
+    """A ``StubSheet`` of ``ROWS`` events listening on a free local port"""
+    stub = StubSheet(sheet_csv())
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{server.server_port}/pub?output=csv"
+    yield stub
+    server.shutdown()
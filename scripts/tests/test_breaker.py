@@ -0,0 +1,109 @@
+"""CircuitBreaker state machine"""
+import asyncio
+import time
+
+import pytest
+
+from who_data.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+COOLDOWN = 0.1
+
+
+def breaker(**kwargs):
+    return CircuitBreaker(**{"budget": 1.0, "attempts": 1, "backoff": 0, "threshold": 2, "cooldown": COOLDOWN,
+                             **kwargs})
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionError("down")
+
+
+def run(breaker, make_coro):
+    return asyncio.run(breaker.run(make_coro))
+
+
+def opened(breaker):
+    for _ in range(breaker.threshold):
+        with pytest.raises(ConnectionError):
+            run(breaker, fail)
+    return breaker
+
+
+def test_failures_below_threshold_keep_it_closed():
+    b = breaker()
+    with pytest.raises(ConnectionError):
+        run(b, fail)
+    assert b.state == CLOSED and b.failures == 1
+    assert run(b, ok) == "ok" and b.failures == 0
+
+
+def test_open_breaker_fails_fast_without_calling_upstream():
+    b = opened(breaker())
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        return "ok"
+
+    assert b.state == OPEN
+    with pytest.raises(CircuitOpen) as e:
+        run(b, upstream)
+    assert calls == [] and isinstance(e.value.cause, ConnectionError)
+
+
+def test_trial_success_closes_and_failure_reopens():
+    b = opened(breaker())
+    time.sleep(COOLDOWN)
+    assert b.state == HALF_OPEN
+    with pytest.raises(ConnectionError):
+        run(b, fail)
+    assert b.state == OPEN
+
+    time.sleep(COOLDOWN)
+    assert run(b, ok) == "ok" and b.state == CLOSED
+
+
+def test_only_one_trial_at_a_time():
+    b = opened(breaker())
+    time.sleep(COOLDOWN)
+
+    async def both():
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "ok"
+        trial = asyncio.ensure_future(b.run(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpen):
+            await b.run(ok)
+        return await trial
+
+    assert asyncio.run(both()) == "ok" and b.state == CLOSED
+
+
+def test_cancelled_trial_lets_the_next_trial_through():
+    b = opened(breaker())
+    time.sleep(COOLDOWN)
+
+    async def cancelled():
+        trial = asyncio.ensure_future(b.run(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancelled())
+    assert b.state == OPEN
+    time.sleep(COOLDOWN)
+    assert run(b, ok) == "ok" and b.state == CLOSED
+
+
+def test_budget_bounds_a_hanging_call():
+    b = breaker(budget=0.05)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        run(b, lambda: asyncio.sleep(10))
+    assert time.monotonic() - start < 1 and b.failures == 1
@@ -0,0 +1,54 @@
+"""LiveCube kept current by deltas against rebuilding the cube from each pull"""
+import numpy as np
+import pandas as pd
+
+from who_data import EventStore, LiveCube, apply_schema, generate_events
+from who_data.cube import EventCube, aggregate
+
+
+def pulls(rows=5_000, changes=200, refreshes=4, seed=7):
+    """Successive pulls of one sheet, each editing, removing and adding a few events"""
+    rng = np.random.default_rng(seed)
+    frame = apply_schema(generate_events(rows, seed=seed))
+    yield frame
+    for i in range(refreshes):
+        frame = frame.copy()
+        edits = rng.choice(len(frame), changes, replace=False)
+        frame.loc[frame.index[edits[: changes // 2]], "cases"] += 3
+        frame.loc[frame.index[edits[changes // 2: changes * 3 // 4]], "grade"] = None
+        frame = frame.drop(index=frame.index[edits[changes * 3 // 4:]])
+        extra = apply_schema(generate_events(changes // 2, seed=seed + i + 1))
+        frame = pd.concat([frame, extra], ignore_index=True)
+        yield frame
+
+
+def test_applied_deltas_match_a_rebuild(monkeypatch):
+    builds = []
+    build = EventCube.build.__func__
+    monkeypatch.setattr(EventCube, "build", classmethod(lambda cls, frame: builds.append(1) or build(cls, frame)))
+    store = EventStore(pulls().__next__)
+    live = LiveCube(store)
+    store.refresh()
+    live.current()
+
+    for _ in range(4):
+        store.refresh()
+        updated = live.current()
+        rebuilt = aggregate(store.frame)
+        assert updated.cells.sort_index().equals(rebuilt.sort_index())
+    assert len(builds) == 1   # only the first cube was built; every later one came from a delta
+
+    totals = live.current().rollup()
+    assert totals["events"] == len(store.frame)
+    assert totals["cases"] == store.frame["cases"].fillna(0).sum()
+
+
+def test_slices_and_rollups_match_groupby():
+    frame = apply_schema(generate_events(5_000, seed=8))
+    cube = EventCube.build(frame)
+    selected = frame[frame["country"].isin(["Chad", "Nigeria"]) & (frame["grade"] == "Grade 3")]
+    by_disease = selected.groupby("disease", observed=True)["cases"].sum()
+
+    rolled = cube.slice(country=["Chad", "Nigeria"], grade=["Grade 3"]).rollup("disease")["cases"]
+    assert len(selected) and rolled.to_dict() == by_disease.to_dict()
+    assert rolled.sum() == selected["cases"].fillna(0).sum()
@@ -0,0 +1,65 @@
+"""DateIndex lookups against the same question asked of pandas"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from who_data.dates import DateIndex, parse_weeklines
+
+
+@pytest.fixture
+def dates():
+    """Report dates with many same-day rows and some undated ones, in sheet order"""
+    rng = np.random.default_rng(0)
+    days = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 60, 5_000), unit="D")
+    hours = pd.to_timedelta(rng.integers(0, 3, 5_000) * 6, unit="h")
+    values = pd.Series(days + hours)
+    values[rng.choice(5_000, 300, replace=False)] = pd.NaT
+    return values
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 100, 4_699, 4_700, 4_750, 6_000])
+def test_latest_matches_a_stable_descending_sort(dates, n):
+    index = DateIndex(dates)
+    expected = dates.sort_values(ascending=False, kind="stable", na_position="last").head(n).index
+    assert index.latest(n).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("n", [0, 1, 10, 500, 2_000])
+def test_latest_of_a_subset_keeps_the_subset_order_on_ties(dates, n):
+    index = DateIndex(dates)
+    positions = np.random.default_rng(1).permutation(len(dates))[:1_500]
+    subset = dates.iloc[positions].reset_index(drop=True)
+    expected = subset.sort_values(ascending=False, kind="stable", na_position="last").head(n).index
+    assert index.latest(n, positions).tolist() == positions[expected].tolist()
+
+
+def test_positions_and_count_match_a_boolean_range(dates):
+    index = DateIndex(dates)
+    start, end = pd.Timestamp("2025-01-10"), pd.Timestamp("2025-01-20")
+    inside = (dates >= start) & (dates < end + pd.Timedelta(days=1))
+    assert sorted(index.positions(start, end)) == np.flatnonzero(inside).tolist()
+    assert index.count(start, end) == inside.sum()
+    assert index.count() == dates.notna().sum()
+    assert np.unpackbits(index.mask(start, end), count=len(dates)).astype(bool).tolist() == inside.tolist()
+
+
+def test_window_ends_at_the_newest_report(dates):
+    index = DateIndex(dates)
+    start, end = index.window(30)
+    assert end == dates.max().normalize() and end - start == pd.Timedelta(days=29)
+    assert index.window(None) is None
+    assert DateIndex(pd.Series([pd.NaT, pd.NaT])).window(7) is None
+
+
+def test_weeklines_match_iso_calendar():
+    labels = pd.Series(["2025-W01", "2020-W53", "2025-W53", "2024 week 9", "2024", "W12", None, "2025-W01"])
+    parsed = parse_weeklines(labels.astype("category"))
+
+    assert parsed["year"].tolist() == [2025, 2020, 2025, 2024, 2024, pd.NA, pd.NA, 2025]
+    assert parsed["week"].tolist() == [1, 53, 53, 9, pd.NA, 12, pd.NA, 1]
+    starts = parsed["week_start"]
+    for i, (year, week) in {0: (2025, 1), 1: (2020, 53), 3: (2024, 9)}.items():
+        assert starts[i] == pd.Timestamp.fromisocalendar(year, week, 1)
+    # 2025 has no week 53, and a label without a year or week has no start
+    assert starts[[2, 4, 5, 6]].isna().all()
+    assert parsed.index.equals(labels.index)
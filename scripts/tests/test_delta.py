@@ -0,0 +1,53 @@
+"""delta.diff against the two pulls it compares"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from who_data import apply_schema, generate_events
+from who_data.delta import diff, event_keys, row_hashes
+
+INSERTED, UPDATED, REMOVED = 1000, 2, 500
+
+
+def delta_of(old, new):
+    return diff(old, event_keys(old), row_hashes(old), new, event_keys(new), row_hashes(new))
+
+
+@pytest.fixture
+def pulls():
+    """Two pulls of the same sheet: events removed, a few updated, new ones added and the rows shuffled"""
+    rng = np.random.default_rng(1)
+    old = apply_schema(generate_events(20_000, seed=0))
+    new = old.drop(old.index[rng.choice(len(old), REMOVED, replace=False)])
+    edits = rng.choice(len(new), UPDATED, replace=False)
+    new.iloc[edits, new.columns.get_loc("cases")] = new["cases"].iloc[edits] + 7
+    new = pd.concat([new, apply_schema(generate_events(INSERTED, seed=99))], ignore_index=True)
+    return old, new.sample(frac=1, random_state=2).reset_index(drop=True)
+
+
+def test_identical_pulls_have_no_delta(pulls):
+    old, _ = pulls
+    assert delta_of(old, old.sample(frac=1, random_state=0)).empty
+
+
+def test_changes_are_split_into_inserts_updates_and_removals(pulls):
+    delta = delta_of(*pulls)
+    assert (len(delta.inserted), len(delta.updated), len(delta.removed)) == (INSERTED, UPDATED, REMOVED)
+    assert (delta.updated["cases"].to_numpy() == delta.previous["cases"].to_numpy() + 7).all()
+
+
+def test_delta_turns_the_old_pull_into_the_new_one(pulls):
+    old, new = pulls
+    delta = delta_of(old, new)
+    gone = set(delta.removed.index) | set(delta.previous.index)
+    rebuilt = pd.concat([old.drop(index=list(gone)), delta.updated, delta.inserted])
+    assert sorted(row_hashes(rebuilt)) == sorted(row_hashes(new))
+
+
+def test_id_column_pairs_updates_exactly():
+    old = pd.DataFrame({"id": ["a", "b", "c"], "country": ["Chad"] * 3, "cases": [1, 2, 3]})
+    new = pd.DataFrame({"id": ["c", "a", "d"], "country": ["Chad"] * 3, "cases": [3, 5, 4]})
+    delta = delta_of(old, new)
+    assert delta.inserted["id"].tolist() == ["d"]
+    assert delta.updated["id"].tolist() == ["a"] and delta.previous["cases"].tolist() == [1]
+    assert delta.removed["id"].tolist() == ["b"]
@@ -0,0 +1,66 @@
+"""FeedTemplate against formatting each row of the frame on its own"""
+import html
+import string
+
+import pandas as pd
+
+from who_data import FeedTemplate, sanitize_descriptions
+
+ITEM = ('<div class="{badge}"><b>{num}.</b> {country}: {disease} ({grade}) '
+        '{cases:,} cases, {cases:>6} {title!r} <p>{description_snippet}</p> {{literal}}</div>')
+DEFAULTS = {"country": "Unknown", "grade": "Ungraded", "cases": 0}
+BADGES = {"Grade 3": "g3", "Grade 2": "g2"}
+
+
+class Safe(str):
+    """Text that is already HTML"""
+
+
+class Escaping(string.Formatter):
+    """str.format that escapes every field after formatting it, as the panels must"""
+
+    def format_field(self, value, spec):
+        text = format(value, spec)
+        return text if isinstance(value, Safe) else html.escape(text)
+
+
+def events():
+    df = pd.DataFrame({
+        "country": ["Chad", "<b>Mali</b>", None, "Côte d'Ivoire"],
+        "disease": ["Cholera", "Mpox & measles", "Ebola", ""],
+        "grade": ["Grade 3", None, "Grade 2", "Grade 1"],
+        "cases": pd.array([12_345, None, 7, 1_000_000], dtype="Int64"),
+        "title": ["a", "<x>", "it's", None],
+        "description": ["<p>Rising</p>", "&lt;script&gt;", None, "Stable"],
+    })
+    return sanitize_descriptions(df)
+
+
+def by_row(df):
+    """Each item formatted from one row's values, defaults filled in"""
+    items = []
+    for num, row in enumerate(df.to_dict("records"), start=1):
+        fields = {key: DEFAULTS.get(key, "") if pd.isna(value) or value == "" else value for key, value in row.items()}
+        fields["description_snippet"] = Safe(fields["description_snippet"])
+        fields["badge"] = Safe(BADGES.get(fields["grade"], "g1"))
+        items.append(Escaping().format(ITEM, num=num, **fields))
+    return items
+
+
+def test_render_matches_formatting_each_row():
+    template = FeedTemplate("test", ITEM, header="<ul>", footer="</ul>", separator="\n",
+                            defaults=DEFAULTS, badges=BADGES, badge_default="g1")
+    df = events()
+    assert template.render(df) == "<ul>" + "\n".join(by_row(df)) + "</ul>"
+
+
+def test_format_specs_and_conversions_are_kept():
+    template = FeedTemplate("specs", "{cases:,}|{cases:08.1f}|{title!r}|{title}")
+    df = pd.DataFrame({"cases": [1234567], "title": ["<b>"]})
+    assert template.render(df) == "1,234,567|1234567.0|&#x27;&lt;b&gt;&#x27;|&lt;b&gt;"
+
+
+def test_template_without_fields_repeats_its_text():
+    template = FeedTemplate("static", "<li>{{event}}</li>", separator=",")
+    assert template.render(events()) == ",".join(["<li>{event}</li>"] * 4)
+    assert template.render(events().iloc[:0]) == ""
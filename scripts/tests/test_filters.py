@@ -0,0 +1,71 @@
+"""FilterIndex selections and facet counts against filtering the table with pandas"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from who_data import FilterIndex, apply_schema, generate_events
+from who_data.filters import FACET_COLUMNS
+
+SELECTIONS = [
+    {},
+    {"grade": ["Grade 3"]},
+    {"grade": ["Grade 2", "Grade 3"], "country": ["Chad", "Nigeria", "Niger"]},
+    {"disease": ["Cholera"], "event_type": [], "country": ["Nowhere"]},
+    {"grade": ["Grade 1"], "report_date": ("2024-03-01", "2024-06-30")},
+    {"status": ["Ongoing"], "report_date": (None, "2024-01-31"), "unknown_column": ["x"]},
+]
+
+
+@pytest.fixture(scope="module")
+def events():
+    df = apply_schema(generate_events(20_000, seed=3))
+    # Some missing values, which no selection should ever match
+    df.loc[df.index[::97], "grade"] = None
+    df.loc[df.index[::89], "report_date"] = pd.NaT
+    return df
+
+
+def chained(df, **selections):
+    """The rows the sidebar used to keep: one isin per filter and a date comparison"""
+    keep = pd.Series(True, index=df.index)
+    for name, values in selections.items():
+        if not values or name not in df:
+            continue
+        if name == "report_date":
+            start, end = values
+            if start is not None:
+                keep &= df[name] >= pd.Timestamp(start)
+            if end is not None:
+                keep &= df[name] < pd.Timestamp(end) + pd.Timedelta(days=1)
+        else:
+            keep &= df[name].isin(values)
+    return df[keep]
+
+
+def matched(index, selection):
+    """Rows set in the selection's bitmap"""
+    packed = index.mask(**selection)
+    return index.rows if packed is None else int(np.unpackbits(packed, count=index.rows).sum())
+
+
+@pytest.mark.parametrize("selection", SELECTIONS)
+def test_select_matches_chained_isin(events, selection):
+    index = FilterIndex(events)
+    expected = chained(events, **selection)
+    assert index.select(**selection).index.equals(expected.index)
+    assert matched(index, selection) == len(expected)
+
+
+def test_nothing_selected_is_the_whole_table(events):
+    index = FilterIndex(events)
+    assert index.mask(grade=[], country=None) is None
+    assert index.select() is events
+
+
+@pytest.mark.parametrize("selection", SELECTIONS)
+def test_facets_count_each_option_under_the_other_filters(events, selection):
+    facets = FilterIndex(events).facets(**selection)
+    assert set(facets) == set(FACET_COLUMNS)
+    for name, counts in facets.items():
+        others = chained(events, **{k: v for k, v in selection.items() if k != name})
+        assert counts == {value: rows for value, rows in others[name].value_counts().items()}
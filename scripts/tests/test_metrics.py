@@ -0,0 +1,38 @@
+"""MetricsKernel figures against computing each card with pandas"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from who_data import MetricsKernel, apply_schema, generate_events
+from who_data.metrics import COUNTED_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def events():
+    df = apply_schema(generate_events(10_000, seed=5))
+    df.loc[df.index[::53], "status"] = None
+    df.loc[df.index[::41], "cases"] = None
+    return df
+
+
+@pytest.mark.parametrize("positions", [None, np.arange(0), np.arange(0, 10_000, 7), np.array([3, 3, 9])])
+def test_kpis_match_filtering_per_card(events, positions):
+    kpis = MetricsKernel(events)(positions)
+    df = events if positions is None else events.iloc[positions]
+
+    assert kpis.total == len(df)
+    assert kpis.count("status", "New") == len(df[df["status"] == "New"])
+    assert kpis.count("event_type", "Outbreak") == len(df[df["event_type"] == "Outbreak"])
+    for name in COUNTED_COLUMNS:
+        counts = df[name].value_counts()
+        assert {k: v for k, v in kpis.counts[name].items() if v} == counts[counts > 0].to_dict()
+    assert kpis.countries == df["country"].nunique()
+    assert kpis.sums == {"cases": int(df["cases"].sum()), "deaths": int(df["deaths"].sum())}
+
+
+def test_text_columns_are_counted_like_categories():
+    df = pd.DataFrame({"status": ["New", None, "New", "Closed"], "cases": ["3", "x", "4", None]})
+    kpis = MetricsKernel(df)()
+    assert kpis.counts["status"] == {"Closed": 1, "New": 2}
+    assert kpis.sums["cases"] == 7 and "deaths" not in kpis.sums
+    assert kpis.count("grade", "Grade 3") == 0 and kpis.countries == 0
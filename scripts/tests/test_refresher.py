@@ -0,0 +1,32 @@
+"""BackgroundRefresher paces itself by the store's TTL and minimum interval"""
+import time
+
+import pandas as pd
+
+from who_data import BackgroundRefresher, EventStore
+
+TTL = 1.0
+RUN = 3.0
+
+
+def test_refresher_does_not_spin_inside_min_interval():
+    pulls = []
+
+    def loader():
+        pulls.append(time.time())
+        return pd.DataFrame({"country": [f"Country {len(pulls)}"]})
+
+    store = EventStore(loader, ttl=TTL, min_interval=TTL)
+    # Slow subscribers finish the flight well after refreshed_at was stamped
+    store.subscribe(lambda store, delta: time.sleep(0.2))
+    store.refresh()
+    calls = []
+    refresh = store.refresh
+    store.refresh = lambda: calls.append(time.time()) or refresh()
+
+    refresher = BackgroundRefresher(store, lead=0).start()
+    time.sleep(RUN)
+    refresher.stop()
+
+    assert 1 <= len(pulls) - 1 <= RUN / TTL + 1
+    assert len(calls) <= RUN / TTL + 2
@@ -0,0 +1,69 @@
+"""Readers of a shared snapshot report the writer's freshness and failures"""
+import time
+
+import pandas as pd
+import pytest
+
+from who_data import EventStore, SharedSnapshot, WriterError, degraded_notice
+
+CHECKED_AT = time.time() - 1800   # upstream last confirmed the data half an hour ago
+
+
+class Upstream:
+    """Loader that answers from a snapshot checked at ``CHECKED_AT``, or fails once ``down`` is set"""
+
+    def __init__(self):
+        self.frame = pd.DataFrame({"country": ["Chad", "Mali"], "cases": [3, 5]})
+        self.down = False
+
+    def __call__(self):
+        if self.down:
+            raise ConnectionError("sheet unreachable")
+        return self.frame
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """A writer and a reader store over one shared file, the writer holding the lock"""
+    upstream = Upstream()
+    writer, reader = SharedSnapshot(tmp_path / "events.arrow"), SharedSnapshot(tmp_path / "events.arrow")
+    assert writer.is_writer() and not reader.is_writer()
+    writing = EventStore(writer.loader(upstream, checked_at=lambda: CHECKED_AT), checked_at=writer.checked_at)
+    reading = EventStore(reader.loader(upstream), checked_at=reader.checked_at)
+    return upstream, writing, reading
+
+
+def test_freshness_comes_from_upstream_not_from_the_poll(stores):
+    _, writing, reading = stores
+    writing.refresh()
+    reading.refresh()
+
+    assert writing.refreshed_at == reading.refreshed_at == CHECKED_AT
+    assert reading.frame["country"].tolist() == ["Chad", "Mali"]
+
+
+def test_readers_see_the_writers_failure(stores):
+    upstream, writing, reading = stores
+    writing.refresh()
+    reading.refresh()
+    upstream.down = True
+
+    with pytest.raises(ConnectionError):
+        writing.refresh()
+    with pytest.raises(WriterError, match="sheet unreachable"):
+        reading.refresh()
+
+    assert reading.frame is not None and reading.refreshed_at == CHECKED_AT
+    assert degraded_notice(reading) is not None
+
+
+def test_recovery_clears_the_failure(stores):
+    upstream, writing, reading = stores
+    upstream.down = True
+    with pytest.raises(ConnectionError):
+        writing.refresh()
+    upstream.down = False
+    writing.refresh()
+
+    reading.refresh()
+    assert reading.last_error is None and degraded_notice(reading) is None
@@ -0,0 +1,53 @@
+"""Concurrent sessions refreshing the store share one upstream request"""
+import threading
+
+from conftest import ROWS
+from who_data import CsvUrlSource, EventStore
+
+SESSIONS = 20
+DELAY = 0.3   # seconds the stub takes to answer, so every session arrives while the pull is in flight
+
+
+def stampede(call, sessions=SESSIONS):
+    """Run ``call`` from ``sessions`` threads released at the same moment; return what they got"""
+    barrier = threading.Barrier(sessions)
+    results, errors = [], []
+
+    def session():
+        barrier.wait()
+        try:
+            results.append(call())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    return results
+
+
+def test_concurrent_sessions_make_one_request(sheet, tmp_path):
+    sheet.delay = DELAY
+    store = EventStore(CsvUrlSource(sheet.url, directory=tmp_path).load, min_interval=60)
+
+    frames = stampede(store.current)
+
+    assert len(sheet.hits) == 1
+    assert len(frames) == SESSIONS
+    assert all(frame is frames[0] for frame in frames)
+    assert len(frames[0]) == ROWS
+
+
+def test_refresh_within_min_interval_makes_no_request(sheet, tmp_path):
+    sheet.delay = DELAY
+    store = EventStore(CsvUrlSource(sheet.url, directory=tmp_path).load, min_interval=60)
+    store.current()
+    sheet.hits.clear()
+
+    stampede(store.refresh)
+    store.refresh()
+
+    assert sheet.hits == []
@@ -0,0 +1,72 @@
+"""SnapshotCache parses a download only when the sheet changed"""
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import ROWS, sheet_csv
+from who_data import SnapshotCache
+
+
+@pytest.fixture
+def parses():
+    """Every frame the snapshot parsed, through a counting ``pd.read_csv``"""
+    return []
+
+
+@pytest.fixture
+def snapshot(sheet, tmp_path, parses):
+    def parse(raw):
+        frame = pd.read_csv(raw)
+        parses.append(frame)
+        return frame
+    return SnapshotCache(sheet.url, parse=parse, directory=tmp_path)
+
+
+def test_first_fetch_parses_and_writes_parquet_and_sidecar(snapshot, parses):
+    frame = snapshot.fetch()
+
+    assert snapshot.status == "parsed"
+    assert len(parses) == 1 and len(frame) == ROWS
+    pd.testing.assert_frame_equal(pd.read_parquet(snapshot.data_path), frame)
+    meta = json.loads(snapshot.meta_path.read_text())
+    assert meta["rows"] == ROWS and meta["etag"] and meta["sha256"]
+
+
+def test_not_modified_is_not_parsed(sheet, snapshot, parses):
+    snapshot.fetch()
+    frame = snapshot.fetch()
+
+    assert sheet.hits[-1]["If-None-Match"] == sheet.etag
+    assert snapshot.status == "not-modified"
+    assert len(parses) == 1 and len(frame) == ROWS
+
+
+def test_same_body_without_validators_is_not_parsed(sheet, snapshot, parses):
+    sheet.validators = False
+    snapshot.fetch()
+    frame = snapshot.fetch()
+
+    assert len(sheet.hits) == 2
+    assert snapshot.status == "unchanged"
+    assert len(parses) == 1 and len(frame) == ROWS
+
+
+def test_changed_body_is_parsed_again(sheet, snapshot, parses):
+    snapshot.fetch()
+    sheet.body = sheet_csv(disease="Measles")
+    frame = snapshot.fetch()
+
+    assert snapshot.status == "parsed"
+    assert len(parses) == 2
+    assert (frame["disease"] == "Measles").all()
+    assert (pd.read_parquet(snapshot.data_path)["disease"] == "Measles").all()
+
+
+def test_restart_loads_the_snapshot_without_parsing(sheet, snapshot, parses, tmp_path):
+    snapshot.fetch()
+    restarted = SnapshotCache(sheet.url, parse=snapshot.parse, directory=tmp_path)
+
+    assert restarted.fetch(max_age=3600) is not None
+    assert restarted.status == "loaded"
+    assert len(sheet.hits) == 1 and len(parses) == 1
@@ -0,0 +1,51 @@
+"""EventStore serves the last good table while its loader fails"""
+import time
+
+import pandas as pd
+import pytest
+
+from who_data import EventStore, degraded_notice
+
+SAVED_AT = time.time() - 600
+
+
+def failing():
+    raise ConnectionError("sheet unreachable")
+
+
+def saved():
+    return pd.DataFrame({"country": ["Chad", "Mali"], "cases": [3, 5]})
+
+
+def test_cold_start_during_an_outage_serves_the_fallback():
+    store = EventStore(failing, checked_at=lambda: SAVED_AT, fallback=saved)
+
+    frame = store.current()
+
+    assert frame["country"].tolist() == ["Chad", "Mali"]
+    assert store.refreshed_at == SAVED_AT
+    assert isinstance(store.last_error[1], ConnectionError)
+    assert "could not be reached" in degraded_notice(store)
+
+
+def test_cold_start_without_a_saved_table_raises():
+    store = EventStore(failing, fallback=lambda: None)
+    with pytest.raises(ConnectionError):
+        store.current()
+
+
+def test_failed_inline_refresh_keeps_serving_the_table():
+    pulls = []
+
+    def flaky():
+        pulls.append(1)
+        if len(pulls) > 1:
+            raise ConnectionError("sheet unreachable")
+        return saved()
+
+    store = EventStore(flaky, ttl=0.01)
+    first = store.current()
+    time.sleep(0.02)
+
+    assert store.current() is first and len(pulls) == 2
+    assert degraded_notice(store) is not None
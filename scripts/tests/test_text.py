@@ -0,0 +1,49 @@
+"""sanitize_descriptions against cleaning each description one string at a time"""
+import html
+import re
+
+import pandas as pd
+
+from who_data.text import SNIPPET_LENGTH, sanitize_descriptions
+
+DESCRIPTIONS = [
+    "<p>Cholera in <b>three</b> districts</p>",
+    "Cases &amp; deaths rising&nbsp;&nbsp;fast",
+    "&lt;script&gt;alert(1)&lt;/script&gt; outbreak",
+    "&amp;lt;b&amp;gt; double-escaped",
+    "Tabs\tand\nnew lines  and   runs",
+    "Quotes \"here\" and 'there' & <br/>breaks",
+    "x" * (SNIPPET_LENGTH + 20),
+    "",
+    None,
+]
+
+
+def reference(value):
+    """The cleaning applied to a single string in plain Python"""
+    if value is None:
+        return None
+    text = re.sub(r"<[^>]*>", " ", html.unescape(value))
+    return re.sub(r"[\s\xa0]+", " ", text).strip()
+
+
+def test_descriptions_match_cleaning_each_string():
+    rows = DESCRIPTIONS * 50
+    df = sanitize_descriptions(pd.DataFrame({"description": rows}))
+
+    expected = [reference(value) for value in rows]
+    assert df["description"].astype(object).where(df["description"].notna(), None).tolist() == expected
+    snippets = [html.escape(text[:SNIPPET_LENGTH] + ("..." if len(text) > SNIPPET_LENGTH else ""))
+                for text in (value or "" for value in expected)]
+    assert df["description_snippet"].tolist() == snippets
+
+
+def test_escaped_markup_never_becomes_a_tag():
+    df = sanitize_descriptions(pd.DataFrame({"description": ["&lt;script&gt;alert(1)&lt;/script&gt;"]}))
+    assert df["description"][0] == "alert(1)"
+    assert not df["description_snippet"].str.contains("<", regex=False).any()
+
+
+def test_tables_without_descriptions_are_untouched():
+    df = pd.DataFrame({"country": ["Chad"]})
+    assert sanitize_descriptions(df) is df
@@ -0,0 +1,18 @@
+"""read_workbook against pandas.read_excel on the same workbook"""
+import pandas as pd
+
+from who_data import apply_schema, generate_events
+from who_data.synthetic import write_xlsx
+from who_data.xlsx import read_workbook
+
+
+def test_tabs_stack_into_the_typed_table(tmp_path):
+    path = tmp_path / "events.xlsx"
+    write_xlsx(generate_events(3_000, seed=0), path, sheets=3)
+
+    frame, stats = read_workbook(path, chunk_rows=500)
+    expected = apply_schema(pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True))
+
+    assert stats.rows == 3_000 and stats.sheets == 3
+    assert frame["country"].dtype == "category"
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False, check_categorical=False)
@@ -0,0 +1,74 @@
+"""
+Shared data layer for the WHO Signal Intelligence Streamlit dashboards.
+
+The apps in ``scripts/`` import from here so that fetching, caching and
+preparing the event table happens the same way everywhere.
+"""
+from .breaker import CircuitBreaker, CircuitOpen
+from .config import DATA_SOURCE, SHARED_SNAPSHOT_PATH, SHEET_CSV_URL, SNAPSHOT_DIR
+from .cube import EventCube, LiveCube
+from .dates import PERIODS, DateIndex, parse_weeklines
+from .delta import Delta, event_keys
+from .feed import FeedTemplate
+from .filters import FilterIndex, facet_format
+from .maplayer import EventMap
+from .metrics import Kpis, MetricsKernel
+from .refresher import BackgroundRefresher, degraded_notice, live_badge
+from .schema import EVENT_SCHEMA, apply_schema, prepare_events
+from .shared import SharedSnapshot, WriterError
+from .snapshot import SnapshotCache
+from .sources import (
+    CsvUrlSource, DataSource, LocalFileSource, SQLiteSource, SyntheticSource, XlsxUrlSource, load_sources,
+    source_from_uri,
+)
+from .store import EventStore
+from .synthetic import generate_events, write_fixtures
+from .text import sanitize_descriptions
+from .theme import Theme, minify_css
+from .views import FilteredViews
+
+__all__ = [
+    "DATA_SOURCE",
+    "SHARED_SNAPSHOT_PATH",
+    "SHEET_CSV_URL",
+    "SNAPSHOT_DIR",
+    "EVENT_SCHEMA",
+    "PERIODS",
+    "BackgroundRefresher",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "CsvUrlSource",
+    "DataSource",
+    "DateIndex",
+    "Delta",
+    "EventCube",
+    "EventMap",
+    "EventStore",
+    "FeedTemplate",
+    "FilterIndex",
+    "FilteredViews",
+    "Kpis",
+    "LiveCube",
+    "LocalFileSource",
+    "MetricsKernel",
+    "SQLiteSource",
+    "SharedSnapshot",
+    "SnapshotCache",
+    "SyntheticSource",
+    "Theme",
+    "WriterError",
+    "XlsxUrlSource",
+    "apply_schema",
+    "degraded_notice",
+    "event_keys",
+    "facet_format",
+    "generate_events",
+    "live_badge",
+    "parse_weeklines",
+    "prepare_events",
+    "load_sources",
+    "minify_css",
+    "sanitize_descriptions",
+    "source_from_uri",
+    "write_fixtures",
+]
@@ -0,0 +1,104 @@
+"""
+Bounded, fail-fast fetches.
+
+``CircuitBreaker.run()`` gives a fetch a total latency budget, retries it a
+few times with full-jitter backoff inside that budget and counts calls that
+still fail. After ``threshold`` failed calls in a row the breaker opens:
+further calls fail at once with ``CircuitOpen`` instead of tying a thread
+up for the whole socket timeout. Once ``cooldown`` seconds have passed one
+trial call is let through; if it succeeds the breaker closes again, and if
+it fails or is cancelled the cooldown starts over.
+
+Callers keep serving the last good table (the in-memory frame, or the
+Parquet snapshot on a cold start) while the breaker is open.
+"""
+import asyncio
+import random
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling upstream while the breaker is open"""
+
+    def __init__(self, retry_in, cause=None):
+        super().__init__(f"upstream unavailable, next attempt in {retry_in:.0f}s"
+                         + (f" (last error: {cause})" if cause else ""))
+        self.retry_in = retry_in
+        self.cause = cause
+
+
+class CircuitBreaker:
+    """Latency budget, jittered retries and a failure counter around one upstream"""
+
+    def __init__(self, budget=10.0, attempts=3, backoff=0.5, threshold=3, cooldown=60.0):
+        self.budget = budget
+        self.attempts = attempts
+        self.backoff = backoff
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return CLOSED
+        return HALF_OPEN if time.time() - self.opened_at >= self.cooldown else OPEN
+
+    def retry_in(self):
+        """Seconds until the breaker lets a trial call through"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.time())
+
+    def _admit(self):
+        with self._lock:
+            state = self.state
+            if state == OPEN or (state == HALF_OPEN and self._trial):
+                raise CircuitOpen(self.retry_in() or self.cooldown, self.last_error)
+            self._trial = state == HALF_OPEN
+
+    def _record(self, error):
+        with self._lock:
+            self._trial = False
+            if error is None:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            self.last_error = error
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.time()
+
+    async def run(self, make_coro):
+        """Await ``make_coro()`` within the budget, retrying with jitter"""
+        self._admit()
+        try:
+            result = await self._attempts(make_coro)
+        except BaseException as e:
+            # Cancellation counts too, or a half-open trial would stay in flight for good
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    async def _attempts(self, make_coro):
+        deadline = time.monotonic() + self.budget
+        for attempt in range(self.attempts):
+            try:
+                return await asyncio.wait_for(make_coro(), max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                if attempt + 1 == self.attempts or time.monotonic() + delay >= deadline:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise TimeoutError(f"no answer within the {self.budget:.0f}s budget") from e
+                    raise
+                await asyncio.sleep(delay)
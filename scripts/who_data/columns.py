@@ -0,0 +1,17 @@
+"""
+Column lookup shared by the data layer.
+
+``streamlit_app_light.py`` upper-cases the sheet headers while the other
+dashboards use lower-case names, so everything here looks columns up
+case-insensitively and leaves the frame's own spelling alone.
+"""
+
+
+def find_column(df, *names):
+    """Return the frame's spelling of the first of ``names`` it has, or None"""
+    lookup = {str(col).lower(): col for col in df.columns}
+    for name in names:
+        col = lookup.get(name.lower())
+        if col is not None:
+            return col
+    return None
@@ -0,0 +1,21 @@
+"""Shared configuration for the Streamlit dashboards"""
+import os
+from pathlib import Path
+
+# Published CSV export of the WHO AFRO event tracker
+SHEET_CSV_URL = os.environ.get(
+    "WHO_SHEET_CSV_URL",
+    "https://docs.google.com/spreadsheets/d/e/"
+    "2PACX-1vQZWLeXBFUhH05FAjiJeZZxoGtm-coEqBASMOz_UrUt_VQeewe9qbOXYZmLQcJTJitOk5nd14zVCQAx/pub?output=csv",
+)
+
+# Optional adapter URI for the dashboards (see sources.source_from_uri):
+# a CSV/XLSX export URL, a local file or sqlite:///events.db
+DATA_SOURCE = os.environ.get("WHO_DATA_SOURCE")
+
+# Where parsed snapshots of remote sources are kept between restarts
+SNAPSHOT_DIR = Path(os.environ.get("WHO_SNAPSHOT_DIR", Path(__file__).resolve().parent.parent / ".snapshots"))
+
+# Set to a file path to share one memory-mapped event table between the
+# dashboard processes of a multi-worker deployment
+SHARED_SNAPSHOT_PATH = os.environ.get("WHO_SHARED_SNAPSHOT")
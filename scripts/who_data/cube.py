@@ -0,0 +1,172 @@
+"""
+Pre-aggregated event cube.
+
+Most figures the dashboards show are counts or sums over the same few
+dimensions. An ``EventCube`` holds events, cases and deaths for every
+combination of country, disease, grade, status, event type, WEEKLINE year
+and epi-week (the Monday starting it) that occurs in the table, so a trend
+or a breakdown is a roll-up of a few thousand cells instead of a scan of
+every event.
+
+A ``LiveCube`` keeps the cube of an ``EventStore`` current: it is built
+once, then each refresh's delta is aggregated on its own (inserted and
+updated rows counted in, removed rows and the old version of updated rows
+counted out) and added to the cells, so a refresh that touches a handful
+of events costs a handful of rows of work.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .columns import find_column
+from .singleflight import flights
+
+DIMENSIONS = ("country", "disease", "grade", "status", "event_type", "year", "epi_week")
+MEASURES = ("events", "cases", "deaths")
+MISSING = "(missing)"   # label for events without a value in a dimension
+UNDATED = "(undated)"   # epi-week of events without a report date
+
+
+def epi_weeks(frame):
+    """Monday of the week each event was reported in, as a ``YYYY-MM-DD`` category"""
+    col = find_column(frame, "report_date")
+    if col is None:
+        return pd.Series(pd.Categorical([UNDATED] * len(frame)), index=frame.index)
+    dates = pd.to_datetime(frame[col], errors="coerce").dt.normalize()
+    codes, weeks = pd.factorize(dates - pd.to_timedelta(dates.dt.weekday, unit="D"))
+    labels = list(weeks.strftime("%Y-%m-%d")) + [UNDATED]
+    codes[codes < 0] = len(labels) - 1
+    return pd.Series(pd.Categorical.from_codes(codes, labels), index=frame.index)
+
+
+def _labelled(values):
+    """``values`` with missing entries labelled, since NaN keys never match each other"""
+    if not values.hasnans:
+        return values
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        if MISSING not in values.cat.categories:
+            values = values.cat.add_categories([MISSING])
+        return values.fillna(MISSING)
+    return values.astype(object).fillna(MISSING)
+
+
+def aggregate(frame, sign=None):
+    """
+    Cube cells of ``frame``: events, cases and deaths per combination of
+    the dimensions. ``sign`` (one +1/-1 per row) counts rows in or out.
+    """
+    table = pd.DataFrame(index=frame.index)
+    for name in DIMENSIONS[:-1]:
+        col = find_column(frame, name)
+        table[name] = _labelled(frame[col]) if col is not None else MISSING
+    table["epi_week"] = epi_weeks(frame)
+    weight = np.ones(len(frame), dtype=np.int64) if sign is None else np.asarray(sign, dtype=np.int64)
+    table["events"] = weight
+    for name in MEASURES[1:]:
+        col = find_column(frame, name)
+        values = 0 if col is None else pd.to_numeric(frame[col], errors="coerce").fillna(0).to_numpy(np.int64)
+        table[name] = values * weight
+    cells = table.groupby(list(DIMENSIONS), observed=True, sort=False)[list(MEASURES)].sum()
+    # Plain labels, so cells from tables with different category sets line up
+    cells.index = cells.index.set_levels([level.astype(object) for level in cells.index.levels])
+    return cells
+
+
+class EventCube:
+    """Events, cases and deaths per combination of the cube dimensions"""
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    @classmethod
+    def build(cls, frame):
+        return cls(aggregate(frame))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def updated(self, delta):
+        """The cube after ``delta``, leaving this one untouched"""
+        parts = [delta.inserted, delta.updated, delta.previous, delta.removed]
+        signs = np.concatenate([np.full(len(part), sign) for part, sign in zip(parts, (1, 1, -1, -1))])
+        if not len(signs):
+            return self
+        change = aggregate(pd.concat(parts, ignore_index=True), signs)
+        at = self.cells.index.get_indexer(change.index)
+        found = at >= 0
+        values = self.cells.to_numpy(copy=True)
+        values[at[found]] += change.to_numpy()[found]
+        cells = pd.DataFrame(values, index=self.cells.index, columns=self.cells.columns)
+        if not found.all():
+            cells = pd.concat([cells, change[~found]])
+        if (cells["events"] == 0).any():
+            cells = cells[cells["events"] != 0]
+        return EventCube(cells)
+
+    def slice(self, **selections):
+        """
+        The cells matching ``selections``, as a cube of their own.
+
+        Selections use the sidebar's form: lists of values per dimension and
+        a ``report_date=(start, end)`` pair, which keeps the epi-weeks that
+        overlap the range. Any other name raises ``ValueError``, since
+        ignoring it would silently widen the selection.
+        """
+        unknown = set(selections) - set(DIMENSIONS) - {"report_date"}
+        if unknown:
+            raise ValueError(f"cannot slice the event cube by {', '.join(sorted(unknown))}")
+        mask = np.ones(len(self.cells), dtype=bool)
+        for name, values in selections.items():
+            if values is None or len(values) == 0:
+                continue
+            if name == "report_date":
+                # ISO dates compare as strings, and UNDATED sorts before them all
+                weeks = self.cells.index.get_level_values("epi_week")
+                start, end = values
+                dated = weeks != UNDATED
+                if start is not None:
+                    dated &= weeks > (pd.Timestamp(start) - pd.Timedelta(days=7)).strftime("%Y-%m-%d")
+                if end is not None:
+                    dated &= weeks <= pd.Timestamp(end).strftime("%Y-%m-%d")
+                mask &= np.asarray(dated)
+            else:
+                mask &= self.cells.index.get_level_values(name).isin(list(values))
+        return EventCube(self.cells[mask])
+
+    def rollup(self, *dimensions):
+        """
+        Measures summed over every dimension not named, indexed by the ones
+        that are; with no dimensions, the grand totals as a Series.
+        """
+        if not dimensions:
+            return self.cells.sum()
+        return self.cells.groupby(level=list(dimensions)).sum()
+
+
+class LiveCube:
+    """The ``EventCube`` of a store's table, kept current by applying each delta"""
+
+    def __init__(self, store):
+        self.store = store
+        self._state = (None, -1)
+        self._lock = threading.Lock()
+        store.subscribe(self._apply)
+
+    def current(self):
+        """The cube of the store's current version, built the first time it is asked for"""
+        cube, version = self._state
+        if version == self.store.version:
+            return cube
+        frame, version = self.store.view()
+        cube = flights.do(("cube", id(self), version), lambda: EventCube.build(frame))
+        with self._lock:
+            if version > self._state[1]:
+                self._state = (cube, version)
+        return cube
+
+    def _apply(self, store, delta):
+        with self._lock:
+            cube, version = self._state
+            if cube is not None and version == store.version - 1:
+                self._state = (cube.updated(delta), store.version)
@@ -0,0 +1,197 @@
+"""
+Report-date index for range filters.
+
+A ``DateIndex`` keeps the permutation that sorts one event table by
+``report_date``, built once per snapshot. Any date range is then a slice
+of that permutation found with two binary searches, so "last 30 days"
+costs ``O(log n)`` to locate however many events the tracker holds, and
+no rerun has to sort the table to find recent reports.
+
+The few newest rows of a filtered subset come from a partial selection
+(``np.argpartition``) over just that subset's dates, so the ticker and the
+Recent Signals feed never sort the whole filtered table either.
+
+``parse_weeklines`` decodes the sheet's WEEKLINE labels ("2025-W12") into
+year, ISO week and the Monday starting that week. A sheet repeats the same
+few hundred labels across all its rows, so each distinct label is parsed
+once, remembered across refreshes, and mapped back to the rows by code.
+"""
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Sidebar periods and how many days, up to the newest report, each covers
+PERIODS = {
+    "All time": None,
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "Last 90 days": 90,
+    "Last 365 days": 365,
+}
+
+DAY = np.timedelta64(1, "D")
+UNDATED = np.iinfo(np.int64).min + 1   # sorts below every date and still negates safely
+
+WEEKLINE_YEAR = re.compile(r"(\d{4})")
+WEEKLINE_WEEK = re.compile(r"W(?:EEK)?\s*(\d{1,2})(?!\d)", re.IGNORECASE)
+WEEKLINE_CACHE_SIZE = 10_000   # distinct labels remembered between refreshes
+
+_weeklines = {}
+_weeklines_lock = threading.Lock()
+
+
+class DateIndex:
+    """``report_date``-sorted permutation of one event table with binary-search range lookups"""
+
+    def __init__(self, values):
+        stamps = pd.to_datetime(pd.Series(values), errors="coerce")
+        if stamps.dt.tz is not None:
+            stamps = stamps.dt.tz_localize(None)
+        stamps = stamps.to_numpy(dtype="datetime64[ns]")
+        self.rows = len(stamps)
+        self.keys = np.where(np.isnat(stamps), UNDATED, stamps.view(np.int64))
+        # Stable, so rows reported on the same day keep their sheet order; NaT sorts last
+        self.order = np.argsort(stamps, kind="stable")
+        self.dated = int(np.count_nonzero(~np.isnat(stamps)))
+        self.sorted = stamps[self.order[:self.dated]]
+
+    @property
+    def first(self):
+        """Earliest report date, or None when no row has one"""
+        return pd.Timestamp(self.sorted[0]) if self.dated else None
+
+    @property
+    def last(self):
+        """Latest report date, or None when no row has one"""
+        return pd.Timestamp(self.sorted[-1]) if self.dated else None
+
+    def span(self, start=None, end=None):
+        """
+        ``(lo, hi)`` such that ``order[lo:hi]`` are the rows reported from
+        ``start`` through the whole day of ``end``. Either bound may be None.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.sorted, _day(start), side="left"))
+        hi = self.dated if end is None else int(np.searchsorted(self.sorted, _day(end) + DAY, side="left"))
+        return lo, max(lo, hi)
+
+    def positions(self, start=None, end=None):
+        """Row positions reported between ``start`` and ``end``, oldest first"""
+        lo, hi = self.span(start, end)
+        return self.order[lo:hi]
+
+    def count(self, start=None, end=None):
+        """Rows reported between ``start`` and ``end``"""
+        lo, hi = self.span(start, end)
+        return hi - lo
+
+    def mask(self, start=None, end=None):
+        """Packed bitmap of the rows reported between ``start`` and ``end``, for ``FilterIndex``"""
+        bits = np.zeros(self.rows, dtype=bool)
+        bits[self.positions(start, end)] = True
+        return np.packbits(bits)
+
+    def latest(self, n, positions=None):
+        """
+        Positions of the ``n`` most recently reported rows out of
+        ``positions`` (every row when None), newest first.
+
+        Rows reported the same day keep their order in ``positions`` (sheet
+        order when None) and undated rows come last, as a stable descending
+        sort would order them.
+        """
+        if n <= 0:
+            return self.order[:0] if positions is None else positions[:0]
+        if positions is None:
+            # The oldest date kept may only partly fit; its earliest sheet rows are the ones kept
+            cut = ties = 0
+            if self.dated:
+                boundary = self.sorted[max(0, self.dated - n)]
+                cut = int(np.searchsorted(self.sorted, boundary, side="left"))
+                ties = int(np.searchsorted(self.sorted, boundary, side="right"))
+            newer = self.order[ties:self.dated]
+            newer = newer[np.argsort(-self.keys[newer], kind="stable")]
+            oldest = self.order[cut:ties][:n - len(newer)]
+            undated = self.order[self.dated:][:n - len(newer) - len(oldest)]
+            return np.concatenate([newer, oldest, undated])
+        keys = self.keys[positions]
+        if len(keys) > n:
+            # Everything above the n-th largest date, then as many of the rows
+            # on that date as fit, taking the earlier ones first
+            threshold = keys[np.argpartition(keys, len(keys) - n)[len(keys) - n]]
+            above = np.flatnonzero(keys > threshold)
+            ties = np.flatnonzero(keys == threshold)
+            picks = np.concatenate([above, ties[:n - len(above)]])
+        else:
+            picks = np.arange(len(keys))
+        picks = picks[np.argsort(-keys[picks], kind="stable")]
+        return positions[picks]
+
+    def window(self, days):
+        """
+        ``(start, end)`` covering the last ``days`` days up to the newest
+        report, or None for all time or when no row has a date.
+
+        The window ends at the newest report rather than today, so a stale
+        snapshot still shows its most recent activity.
+        """
+        if days is None or not self.dated:
+            return None
+        end = self.last.normalize()
+        return end - pd.Timedelta(days=days - 1), end
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).tz_localize(None).normalize(), "ns")
+
+
+def _parse_weekline(label):
+    """``(year, week)`` of one WEEKLINE label; either may be None"""
+    year = WEEKLINE_YEAR.search(label)
+    week = WEEKLINE_WEEK.search(label)
+    week = int(week.group(1)) if week and 1 <= int(week.group(1)) <= 53 else None
+    return (int(year.group(1)) if year else None), week
+
+
+def parse_weeklines(values):
+    """
+    Year, ISO week and week-start date of every WEEKLINE label in ``values``.
+
+    Returns a frame with ``year`` (Int64), ``week`` (Int8) and ``week_start``
+    (the Monday of that ISO week) aligned with ``values``. Labels without a
+    year, or rows without a label, are missing; a label with a year but no
+    week keeps its year, and ``week_start`` is missing for a week 53 the
+    year does not have.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, labels = pd.factorize(values)
+    labels = [str(label) for label in labels]
+
+    # Hits are copied out under the lock: another thread may clear the cache before this one stores its misses
+    with _weeklines_lock:
+        known = {label: _weeklines[label] for label in labels if label in _weeklines}
+    parsed = {label: _parse_weekline(label) for label in labels if label not in known}
+    with _weeklines_lock:
+        if len(_weeklines) + len(parsed) > WEEKLINE_CACHE_SIZE:
+            _weeklines.clear()
+        _weeklines.update(parsed)
+    known.update(parsed)
+    decoded = [known[label] for label in labels]
+
+    years = pd.array([year for year, _ in decoded] + [None], dtype="Int64")
+    weeks = pd.array([week for _, week in decoded] + [None], dtype="Int8")
+    iso = pd.Series([f"{y}-W{w:02d}-1" if y is not None and w is not None else None for y, w in decoded] + [None],
+                    dtype=object)
+    starts = pd.to_datetime(iso, format="%G-W%V-%u", errors="coerce")
+
+    # Code -1 (no label) picks the trailing missing entry
+    take = np.where(codes < 0, len(decoded), codes)
+    return pd.DataFrame({
+        "year": years.take(take),
+        "week": weeks.take(take),
+        "week_start": starts.to_numpy()[take],
+    }, index=values.index)
@@ -0,0 +1,102 @@
+"""
+Row-level diff between two pulls of the event table.
+
+Every event gets a stable 64-bit key: the sheet's id column when it has a
+usable one, otherwise a hash of the columns that place an event (country,
+disease, event type, location, coordinates and start/report date) and
+leave out the ones an update changes (grade, status, counts, description).
+A second hash over the whole row tells unchanged events from updated ones,
+so reordering the sheet or removing one of several look-alike events does
+not show up as a wave of spurious updates. Without an id column the split
+between updates and insert/remove pairs is approximate: a new event that
+matches a removed one on every key column is reported as its update.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .columns import find_column
+
+ID_COLUMNS = ("id", "event_id", "eventid")
+KEY_COLUMNS = (("country",), ("disease", "event"), ("event_type",), ("location",), ("lat",), ("lon",),
+               ("start_date", "date_notified", "report_date"))
+
+
+def event_keys(df):
+    """Identity of every row as a uint64 array (repeats for look-alike events)"""
+    id_col = find_column(df, *ID_COLUMNS)
+    if id_col is not None and df[id_col].notna().all() and df[id_col].is_unique:
+        return pd.util.hash_array(df[id_col].astype(str).to_numpy(dtype=object))
+
+    cols = [c for c in (find_column(df, *names) for names in KEY_COLUMNS) if c is not None]
+    if not cols:
+        return np.zeros(len(df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[cols].astype(str), index=False).to_numpy()
+
+
+def row_hashes(df):
+    """Content hash of every row as a uint64 array"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _pair(new_values, old_values):
+    """
+    Position in ``old_values`` of each entry of ``new_values``, or -1.
+
+    Repeated values are paired off in order of appearance, so each old
+    entry is matched at most once.
+    """
+    def tagged(values):
+        occurrence = pd.Series(values).groupby(values, sort=False).cumcount().to_numpy()
+        return pd.MultiIndex.from_arrays([values, occurrence])
+
+    if len(new_values) == 0 or len(old_values) == 0:
+        return np.full(len(new_values), -1, dtype=np.intp)
+    return tagged(old_values).get_indexer(tagged(new_values))
+
+
+@dataclass
+class Delta:
+    """Rows that changed between two versions of the event table"""
+    inserted: pd.DataFrame
+    updated: pd.DataFrame
+    previous: pd.DataFrame
+    removed: pd.DataFrame
+
+    @property
+    def empty(self):
+        return self.inserted.empty and self.updated.empty and self.removed.empty
+
+    def __len__(self):
+        return len(self.inserted) + len(self.updated) + len(self.removed)
+
+
+def diff(old, old_keys, old_hashes, new, new_keys, new_hashes):
+    """
+    Compare two pulls given their keys and row hashes.
+
+    Rows that hash the same on both sides are unchanged wherever they moved.
+    The rest are matched on their key: a match is an update, and whatever is
+    left over was inserted or removed. ``updated`` holds the new version of
+    changed rows and ``previous`` the old version of the same rows, in the
+    same order, so aggregates can subtract one and add the other. Each frame
+    keeps the row positions of the table it came from as its index.
+    """
+    same = _pair(new_hashes, old_hashes)
+    kept = np.zeros(len(old_hashes), dtype=bool)
+    kept[same[same >= 0]] = True
+
+    new_rest = np.flatnonzero(same < 0)
+    old_rest = np.flatnonzero(~kept)
+    match = _pair(new_keys[new_rest], old_keys[old_rest])
+    updated = new_rest[match >= 0]
+    previous = old_rest[match[match >= 0]]
+    kept[previous] = True
+
+    return Delta(
+        inserted=new.iloc[new_rest[match < 0]],
+        updated=new.iloc[updated],
+        previous=old.iloc[previous],
+        removed=old[~kept],
+    )
@@ -0,0 +1,136 @@
+"""
+Bitmap index for the sidebar filters.
+
+For each filter column a ``FilterIndex`` keeps one packed bitmap per value
+(``np.packbits`` of ``column == value``), built once per snapshot. A
+selection ORs the bitmaps of the chosen values within a column, ANDs the
+columns together and unpacks the result once, so filtering is a handful
+of byte-wise operations on ``rows / 8`` bytes followed by a single gather,
+instead of a chain of ``isin`` calls that each materialise a new frame.
+
+Date ranges on ``report_date`` are answered from the snapshot's
+``DateIndex`` and combined with the value bitmaps the same way.
+
+The same bitmaps give cross-filter facet counts: how many rows each option
+would keep under the other current selections is a popcount of the
+option's bitmap ANDed with the mask of the other filters, so no option is
+ever filtered for on its own.
+"""
+import numpy as np
+import pandas as pd
+
+from .columns import find_column
+from .dates import DateIndex
+from .metrics import MetricsKernel
+
+FILTER_COLUMNS = ("grade", "country", "disease", "event_type", "status", "year")
+FACET_COLUMNS = ("grade", "country", "disease", "event_type")
+RANGE_COLUMNS = ("report_date",)   # selected as a (start, end) pair rather than a list of values
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(packed):
+    """Number of set bits in a packed bitmap"""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(packed).sum())
+    return int(_POPCOUNT[packed].sum())
+
+
+def facet_format(counts):
+    """``format_func`` for a multiselect that shows each option's facet count"""
+    return lambda value: f"{value} ({counts.get(value, 0):,})"
+
+
+class FilterIndex:
+    """Per-value bitmaps over the filter columns of one event table"""
+
+    def __init__(self, frame, columns=FILTER_COLUMNS):
+        self.frame = frame
+        self.rows = len(frame)
+        self.bitmaps = {}
+        self.totals = {}
+        for name in columns:
+            col = find_column(frame, name)
+            if col is None:
+                continue
+            values = frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values, sort=True)
+            self.bitmaps[name] = {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            self.totals[name] = dict(zip(uniques, counts.tolist()))
+        col = find_column(frame, "report_date")
+        self.dates = DateIndex(frame[col]) if col is not None else None
+        self._metrics = None
+
+    def mask(self, **selections):
+        """
+        Packed bitmap of the rows matching every non-empty selection, or None
+        when nothing is selected.
+
+        ``selections`` map a filter column to the values to keep, such as
+        ``grade=["Grade 3"], country=["Chad", "Niger"]``, and ``report_date``
+        to a ``(start, end)`` pair. Columns the table does not have are
+        ignored, as are values it has never seen.
+        """
+        packed = None
+        for name, values in selections.items():
+            if values is None or len(values) == 0:
+                continue
+            if name == "report_date" and self.dates is not None:
+                column = self.dates.mask(*values)
+            elif name in self.bitmaps:
+                column = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+                for value in values:
+                    bits = self.bitmaps[name].get(value)
+                    if bits is not None:
+                        np.bitwise_or(column, bits, out=column)
+            else:
+                continue
+            packed = column if packed is None else np.bitwise_and(packed, column, out=packed)
+        return packed
+
+    def positions(self, **selections):
+        """Row positions matching the selections, or None when nothing is selected"""
+        packed = self.mask(**selections)
+        if packed is None:
+            return None
+        return np.flatnonzero(np.unpackbits(packed, count=self.rows))
+
+    def select(self, **selections):
+        """The rows matching the selections, gathered once"""
+        positions = self.positions(**selections)
+        return self.frame if positions is None else self.frame.take(positions)
+
+    def recent(self, n, **selections):
+        """The ``n`` most recently reported rows matching the selections, newest first"""
+        positions = self.positions(**selections)
+        if self.dates is None:
+            return (self.frame if positions is None else self.frame.take(positions)).head(n)
+        return self.frame.take(self.dates.latest(n, positions))
+
+    def kpis(self, **selections):
+        """Metric-card figures of the rows matching the selections"""
+        if self._metrics is None:
+            self._metrics = MetricsKernel(self.frame)
+        return self._metrics(self.positions(**selections))
+
+    def facets(self, names=FACET_COLUMNS, **selections):
+        """
+        For each column in ``names``, the rows each of its values would match
+        under the selections on the other columns.
+        """
+        result = {}
+        for name in names:
+            if name not in self.bitmaps:
+                continue
+            others = self.mask(**{k: v for k, v in selections.items() if k != name})
+            if others is None:
+                result[name] = dict(self.totals[name])
+            else:
+                result[name] = {value: popcount(np.bitwise_and(bits, others))
+                                for value, bits in self.bitmaps[name].items()}
+        return result
@@ -0,0 +1,129 @@
+"""
+Event map layers built once per selection.
+
+The map fragments used to copy the whole filtered table, colour it with a
+per-row ``apply`` that built a Python list for every event, and hand every
+column to pydeck, which serialises records with ``indent=2`` and a fresh
+random layer id each run, so Streamlit's message cache never recognised an
+unchanged map. An ``EventMap`` keeps only what the layer draws and the
+tooltip shows: float32 positions, RGBA channels looked up from the grade
+codes, radii from ``event_count``, written as compact records by pandas'
+JSON writer. ``FilteredViews.deck`` caches the finished spec per snapshot,
+selection and map, so an unchanged map is neither rebuilt nor, since its
+JSON is byte-identical, re-sent to a browser that already has it.
+
+pydeck's binary transport only works through its Jupyter widget; Streamlit
+takes the deck as JSON, so the arrays are kept float32 in memory and
+rounded to ``COORD_DECIMALS`` on the wire.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+
+from .columns import find_column
+
+GRADE_COLORS = {"Grade 3": (255, 51, 85, 200), "Grade 2": (255, 153, 51, 200), "Grade 1": (255, 204, 0, 200)}
+OTHER_COLOR = (160, 160, 176, 180)
+TOOLTIP_FIELDS = ("country", "disease", "location", "grade", "cases", "deaths")
+COORD_DECIMALS = 4   # ~11 m at the equator, far below the smallest marker
+DATA_PLACEHOLDER = "__EVENT_MAP_DATA__"
+
+
+class PreparedDeck(pdk.Deck):
+    """A Deck whose JSON was written once; ``st.pydeck_chart`` sends ``spec`` as is"""
+
+    def __init__(self, spec, tooltip):
+        super().__init__(layers=[], tooltip=tooltip)
+        self.spec = spec
+
+    def to_json(self):
+        return self.spec
+
+
+class EventMap:
+    """A scatterplot of events, its style fixed at construction and its data filled in per frame"""
+
+    def __init__(self, name, map_style, tooltip, radius=(25000, 5000), colors=GRADE_COLORS, other_color=OTHER_COLOR,
+                 fields=TOOLTIP_FIELDS, zoom=3, center=None, **layer):
+        """
+        ``radius`` is either ``(base, per_event)`` metres, scaled by each
+        row's ``event_count``, or one radius for every marker. ``center``
+        fixes the view; by default it is the mean of the plotted points.
+        Further keywords go to the ``ScatterplotLayer``.
+        """
+        self.name = name
+        self.map_style = map_style
+        self.tooltip = tooltip
+        self.radius = radius
+        self.colors = colors
+        self.other_color = other_color
+        self.fields = fields
+        self.zoom = zoom
+        self.center = center
+        self.layer = layer
+
+    def palette(self, grades):
+        """One RGBA row per category of ``grades`` plus a last row for missing or unknown grades"""
+        rows = [self.colors.get(grade, self.other_color) for grade in grades.cat.categories]
+        return np.array(rows + [self.other_color], dtype=np.uint8).reshape(-1, 4)
+
+    def points(self, frame):
+        """The located rows of ``frame`` reduced to what the layer draws and the tooltip shows"""
+        lat, lon = find_column(frame, "lat"), find_column(frame, "lon")
+        if lat is None or lon is None:
+            return None
+        located = frame[lat].notna().to_numpy() & frame[lon].notna().to_numpy()
+        rows = frame[located]
+        points = pd.DataFrame({
+            "lon": rows[lon].to_numpy(dtype=np.float32),
+            "lat": rows[lat].to_numpy(dtype=np.float32),
+        })
+        grade = find_column(rows, "grade")
+        grades = rows[grade] if grade is not None else pd.Series(None, index=rows.index, dtype=object)
+        grades = grades.astype("category")
+        codes = grades.cat.codes.to_numpy()
+        rgba = self.palette(grades)[np.where(codes < 0, len(grades.cat.categories), codes)]
+        for i, channel in enumerate(("cr", "cg", "cb", "ca")):
+            points[channel] = rgba[:, i]
+        if isinstance(self.radius, tuple):
+            base, per_event = self.radius
+            count = find_column(rows, "event_count")
+            # int64: per_event * event_count passes 2**31 once a country has ~430k events
+            counts = rows[count].fillna(1).to_numpy(dtype=np.int64) if count is not None else 1
+            points["radius"] = np.full(len(rows), base, dtype=np.int64) + per_event * counts
+        for field in self.fields:
+            col = find_column(rows, field)
+            if col is not None:
+                points[field] = rows[col].to_numpy()
+        return points
+
+    def spec(self, frame):
+        """The whole deck for ``frame`` as JSON, or None when no row has a location"""
+        points = self.points(frame)
+        if points is None or points.empty:
+            return None
+        latitude, longitude = self.center or (float(points["lat"].mean()), float(points["lon"].mean()))
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            id=f"{self.name}-events",   # stable, so an unchanged map serialises to the same bytes
+            data=DATA_PLACEHOLDER,
+            get_position="[lon, lat]",
+            get_color="[cr, cg, cb, ca]",
+            get_radius="radius" if isinstance(self.radius, tuple) else self.radius,
+            **self.layer,
+        )
+        deck = pdk.Deck(
+            layers=[layer],
+            initial_view_state=pdk.ViewState(latitude=latitude, longitude=longitude, zoom=self.zoom, pitch=0),
+            tooltip=self.tooltip,
+            map_style=self.map_style,
+        )
+        spec = json.dumps(json.loads(deck.to_json()), separators=(",", ":"), sort_keys=True)
+        data = points.to_json(orient="records", double_precision=COORD_DECIMALS, force_ascii=False)
+        return spec.replace(json.dumps(DATA_PLACEHOLDER), data, 1)
+
+    def deck(self, spec):
+        """The Deck ``st.pydeck_chart`` takes for a spec from ``spec``"""
+        return PreparedDeck(spec, self.tooltip)
@@ -0,0 +1,76 @@
+"""
+Metric-card figures in one pass.
+
+The KPI cards used to filter the table once per figure
+(``len(df[df['status'] == 'New'])``, then ``'Ongoing'``, then
+``event_type == 'Outbreak'``) and the grade summary ran its own
+``value_counts``. A ``MetricsKernel`` keeps the categorical codes of every
+counted column and the case and death counts as plain arrays, built once
+per snapshot, and answers all the figures for a set of row positions with
+one ``np.bincount`` per column and one sum per count column.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .columns import find_column
+
+COUNTED_COLUMNS = ("status", "event_type", "grade", "country")
+SUMMED_COLUMNS = ("cases", "deaths")
+
+
+@dataclass(frozen=True)
+class Kpis:
+    """Figures for the metric cards of one selection"""
+    total: int
+    counts: dict   # column -> {value: rows}
+    sums: dict     # column -> total over the rows
+
+    def count(self, name, value):
+        """Rows whose ``name`` column is ``value``"""
+        return self.counts.get(name, {}).get(value, 0)
+
+    @property
+    def countries(self):
+        return sum(1 for rows in self.counts.get("country", {}).values() if rows)
+
+
+class MetricsKernel:
+    """Codes and count arrays of one event table, ready to aggregate any subset of its rows"""
+
+    def __init__(self, frame):
+        self.rows = len(frame)
+        self.codes = {}
+        self.labels = {}
+        for name in COUNTED_COLUMNS:
+            col = find_column(frame, name)
+            if col is None:
+                continue
+            values = frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, labels = pd.factorize(values, sort=True)
+            # Shifted by one so missing values (-1) land in a bin of their own
+            self.codes[name] = codes.astype(np.intp) + 1
+            self.labels[name] = list(labels)
+        self.values = {}
+        for name in SUMMED_COLUMNS:
+            col = find_column(frame, name)
+            if col is not None:
+                self.values[name] = pd.to_numeric(frame[col], errors="coerce").to_numpy(
+                    dtype=np.float64, na_value=0.0)
+
+    def __call__(self, positions=None):
+        """``Kpis`` of the rows at ``positions``, or of every row when None"""
+        counts = {}
+        for name, codes in self.codes.items():
+            picked = codes if positions is None else codes[positions]
+            bins = np.bincount(picked, minlength=len(self.labels[name]) + 1)
+            counts[name] = dict(zip(self.labels[name], bins[1:].tolist()))
+        sums = {}
+        for name, values in self.values.items():
+            picked = values if positions is None else values[positions]
+            sums[name] = int(picked.sum())
+        return Kpis(self.rows if positions is None else len(positions), counts, sums)
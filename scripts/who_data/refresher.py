@@ -0,0 +1,109 @@
+"""
+Stale-while-revalidate refresh for an EventStore.
+
+A daemon thread re-pulls the source a little before the store's TTL runs
+out and lets the store swap the new table in. Script reruns keep reading
+the last good table in the meantime, so no user ever waits on the network
+once the first table is loaded.
+"""
+import logging
+import threading
+import time
+
+from .breaker import CircuitOpen
+
+log = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """Daemon thread that keeps an EventStore fresh"""
+
+    def __init__(self, store, ttl=None, lead=60, retry=30):
+        self.store = store
+        self.ttl = ttl or store.ttl
+        self.lead = min(lead, self.ttl / 2)
+        self.retry = retry
+        self.last_success = store.refreshed_at
+        self.last_error = None
+        self.last_attempt = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Attach to the store and start refreshing in the background"""
+        if self._thread is None:
+            self.store.background = self
+            self._thread = threading.Thread(target=self._run, name="who-data-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self.store.background is self:
+            self.store.background = None
+
+    def trigger(self):
+        """Refresh as soon as possible instead of waiting for the TTL"""
+        self._wake.set()
+
+    def next_due(self):
+        """Seconds until the next refresh is due"""
+        if self.last_error is not None and (self.last_success or 0) < self.last_error[0]:
+            return max(0.0, self.last_error[0] + self.retry - time.time())
+        last = self.store.refreshed_at or time.time()
+        due = last + self.ttl - self.lead
+        if self.last_attempt is not None:
+            # refreshed_at is stamped before the pull's flight ends (or comes from upstream's own clock), and a
+            # refresh within the store's min_interval of that end only hands back the last result
+            due = max(due, self.last_attempt + self.store.min_interval)
+        return max(0.0, due - time.time())
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.next_due())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.store.refresh()
+                self.last_success = self.store.refreshed_at
+            except Exception as e:
+                self.last_error = (time.time(), e)
+                log.warning("Background refresh failed, serving last good data: %s", e)
+            finally:
+                self.last_attempt = time.time()
+
+
+def describe_age(seconds):
+    """Short human-readable age such as '42s', '5 min' or '3 h'"""
+    if seconds is None:
+        return "never"
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    return f"{int(seconds // 3600)} h"
+
+
+def live_badge(store):
+    """Header badge showing how fresh the store's data really is"""
+    stale = store.is_stale()
+    label = "STALE" if stale else "LIVE"
+    css = "live-badge stale" if stale else "live-badge"
+    return f'<div class="{css}" title="Last successful refresh">● {label} · {describe_age(store.age())} ago</div>'
+
+
+def degraded_notice(store):
+    """Warning to show while the store serves its last good table because upstream is failing"""
+    failed = store.last_error
+    if failed is None or failed[0] <= (store.refreshed_at or 0) or store.frame is None:
+        return None
+    error = failed[1]
+    if isinstance(error, CircuitOpen):
+        retry = f"next attempt in {describe_age(max(0.0, failed[0] + error.retry_in - time.time()))}"
+    else:
+        retry = "retrying automatically"
+    return (f"Showing the last good data, from {describe_age(store.age())} ago: "
+            f"the WHO data source could not be reached ({retry}).")
@@ -0,0 +1,57 @@
+"""
+Typed schema for the event table.
+
+Applied once at ingestion so that every ``isin`` filter and ``value_counts``
+in the dashboards works on small integer category codes instead of hashing
+Python strings on each rerun. Column names are matched case-insensitively.
+"""
+import pandas as pd
+
+from .columns import find_column
+from .text import sanitize_descriptions
+
+CATEGORY = "category"
+DATETIME = "datetime"
+
+EVENT_SCHEMA = {
+    "country": CATEGORY,
+    "disease": CATEGORY,
+    "grade": CATEGORY,
+    "status": CATEGORY,
+    "event_type": CATEGORY,
+    "lat": "float32",
+    "lon": "float32",
+    "cases": "Int32",
+    "deaths": "Int32",
+    "event_count": "Int32",
+    "report_date": DATETIME,
+    "start_date": DATETIME,
+}
+
+
+def convert_column(series, kind, dayfirst=False):
+    """Cast one column to a schema dtype kind"""
+    if kind == CATEGORY:
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype(CATEGORY)
+    if kind == DATETIME:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, dayfirst=dayfirst, errors="coerce")
+    if kind.startswith("Int"):
+        return pd.to_numeric(series, errors="coerce").round().astype(kind)
+    return pd.to_numeric(series, errors="coerce").astype(kind)
+
+
+def apply_schema(df, schema=EVENT_SCHEMA, dayfirst=False):
+    """Return ``df`` with every schema column it has cast to its declared dtype"""
+    df = df.copy()
+    for name, kind in schema.items():
+        col = find_column(df, name)
+        if col is not None:
+            df[col] = convert_column(df[col], kind, dayfirst)
+    return df
+
+
+def prepare_events(df, dayfirst=False):
+    """``apply_schema`` followed by the description clean-up the Recent Signals feed renders from"""
+    return sanitize_descriptions(apply_schema(df, dayfirst=dayfirst))
@@ -0,0 +1,166 @@
+"""
+Event table shared between dashboard processes.
+
+One process (whichever holds the lock file) pulls from upstream and
+publishes the typed table as an Arrow IPC file. Every process, the writer
+included, memory-maps that file, so the bulk of the table lives once in the
+OS page cache however many Streamlit workers run behind the load balancer.
+Text columns stay Arrow-backed and numeric columns without nulls are
+converted without copying; only small category codes and null masks are
+materialised per process.
+
+A new snapshot is written to a temporary file and moved over the old one,
+so readers either see the previous table or the new one, never a mix.
+Processes that still map the old file keep a valid view until they remap.
+
+After every upstream pull the writer records in a small status file next
+to the table when upstream last confirmed it and, while pulls fail, the
+error. Readers take their freshness from it and raise ``WriterError``, so
+their LIVE badge and degraded notice match the writer's instead of the
+time of their own poll.
+
+The conversion is zero-copy on pandas 3 only. pandas 2 copies the columns
+when the frame is converted and again when ``EventStore`` resets its index,
+so each process holds its own copy of the table there.
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from .snapshot import _atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process is always the writer
+    fcntl = None
+
+
+def _string_types(arrow_type):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+class WriterError(RuntimeError):
+    """The writer process could not pull from upstream; the shared table is the last good one"""
+
+
+class SharedSnapshot:
+    """Memory-mapped Arrow IPC copy of the event table"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.status_path = self.path.with_suffix(".status.json")
+        self.meta = {}
+        self._lock_fh = None
+        self._signature = None
+        self._frame = None
+        self._published = None
+
+    def is_writer(self):
+        """True if this process holds (or just took) the writer lock"""
+        if fcntl is None:
+            return True
+        if self._lock_fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fh = open(self.path.with_suffix(".lock"), "a")
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                fh.close()
+                return False
+            self._lock_fh = fh
+        return True
+
+    def publish(self, frame, **meta):
+        """Atomically replace the shared file with ``frame``"""
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        meta = {"published_at": str(time.time()), **{k: str(v) for k, v in meta.items()}}
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            **{f"who_data.{k}".encode(): v.encode() for k, v in meta.items()},
+        })
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._published = frame
+
+    def read(self):
+        """The published table, remapped only when the file was swapped"""
+        stat = os.stat(self.path)
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with pa.memory_map(str(self.path), "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            metadata = table.schema.metadata or {}
+            self.meta = {
+                k.decode()[len("who_data."):]: v.decode()
+                for k, v in metadata.items() if k.startswith(b"who_data.")
+            }
+            self._frame = table.to_pandas(split_blocks=True, types_mapper=_string_types)
+            self._signature = signature
+        return self._frame
+
+    def cached(self):
+        """The published table, or None before anything was published, for ``EventStore(fallback=...)``"""
+        return self.read() if self.path.exists() else None
+
+    def status(self):
+        """The writer's last report: ``checked_at``, plus ``error`` and ``failed_at`` while pulls fail"""
+        try:
+            return json.loads(self.status_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def checked_at(self):
+        """When the writer last confirmed the shared table upstream, for ``EventStore(checked_at=...)``"""
+        return self.status().get("checked_at")
+
+    def _report(self, **changes):
+        status = {**self.status(), **changes}
+        _atomic_write(self.status_path, lambda fh: fh.write(json.dumps(status).encode()))
+
+    def loader(self, upstream, checked_at=None):
+        """
+        Wrap an upstream loader for use with EventStore.
+
+        The writer process calls ``upstream``, publishes what changed and
+        reports the outcome; ``checked_at`` tells it when upstream last
+        confirmed the data, which is older than the pull when ``upstream``
+        answers from a saved snapshot. Every other process only maps the
+        shared file, and raises ``WriterError`` while the writer's pulls
+        fail. Until a writer has published anything, readers fall back to
+        ``upstream`` themselves.
+        """
+        def load():
+            if self.is_writer():
+                try:
+                    frame = upstream()
+                except Exception as e:
+                    self._report(error=f"{type(e).__name__}: {e}", failed_at=time.time())
+                    raise
+                if frame is not self._published or not self.path.exists():
+                    self.publish(frame)
+                self._report(checked_at=(checked_at() if checked_at is not None else None) or time.time(),
+                             error=None, failed_at=None)
+            elif not self.path.exists():
+                return upstream()
+            else:
+                error = self.status().get("error")
+                if error:
+                    raise WriterError(error)
+            return self.read()
+        return load
@@ -0,0 +1,65 @@
+"""
+Single-flight coordination for upstream fetches.
+
+When the cache expires or several people press Refresh at once, every
+session would otherwise start its own download of the same sheet. Calls
+made through ``flights.do(key, fn)`` while another call for the same key
+is running wait for that call and share its result (or its exception).
+A per-key minimum interval also hands back the previous result when the
+last fetch finished only moments ago.
+"""
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Process-wide de-duplication of concurrent calls by key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._last = {}
+
+    def do(self, key, fn, min_interval=0):
+        """Run ``fn`` unless a call for ``key`` is in flight or finished too recently"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                last = self._last.get(key)
+                if last is not None and time.monotonic() - last[0] < min_interval:
+                    return last[1]
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and min_interval > 0:
+                    self._last[key] = (time.monotonic(), call.result)
+            call.done.set()
+
+    def in_flight(self, key):
+        return key in self._calls
+
+
+# Shared by every store and snapshot in the process
+flights = SingleFlight()
@@ -0,0 +1,140 @@
+"""
+Local columnar snapshot of a published sheet.
+
+The parsed frame is kept on disk as Parquet next to a small JSON sidecar
+with the validators of the last download (ETag, Last-Modified and a SHA-256
+of the body). A refresh sends a conditional request; when the server answers
+304, or the body hashes the same as last time, the Parquet file is loaded
+instead of parsing the CSV again. Requests go out on the pooled
+``httpx.AsyncClient`` the source adapters share (see ``sources.py``), so a
+snapshot fetched directly reuses the same connections as the dashboards.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .config import SNAPSHOT_DIR
+from .singleflight import flights
+
+
+def _atomic_write(path, write):
+    """Write a file through a temporary sibling so readers never see half of it"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            write(fh)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class SnapshotCache:
+    """Parquet snapshot of one URL, refreshed with conditional requests"""
+
+    def __init__(self, url, parse=pd.read_csv, name=None, directory=None, timeout=30, min_interval=0):
+        self.url = url
+        self.parse = parse
+        self.timeout = timeout
+        self.min_interval = min_interval
+        if name is None:
+            # The same URL parsed two different ways gets two snapshots
+            parser = f"{getattr(parse, '__module__', '')}.{getattr(parse, '__qualname__', repr(parse))}"
+            name = hashlib.sha1(f"{url}|{parser}".encode()).hexdigest()[:16]
+        self.directory = Path(directory or SNAPSHOT_DIR)
+        self.data_path = self.directory / f"{name}.parquet"
+        self.meta_path = self.directory / f"{name}.json"
+        self.meta = self._read_meta()
+        self.status = "empty"
+        self._frame = None
+
+    def _read_meta(self):
+        try:
+            return json.loads(self.meta_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, **changes):
+        self.meta = {**self.meta, **changes}
+        _atomic_write(self.meta_path, lambda fh: fh.write(json.dumps(self.meta, indent=2).encode()))
+
+    def load(self):
+        """Return the frame saved on disk, or None if there is no snapshot yet"""
+        if self._frame is None and self.data_path.exists():
+            self._frame = pd.read_parquet(self.data_path)
+            self.status = "loaded"
+        return self._frame
+
+    def age(self):
+        """Seconds since upstream was last checked, or None if it never was"""
+        checked_at = self.meta.get("checked_at")
+        return None if checked_at is None else time.time() - checked_at
+
+    def conditional_headers(self):
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if not self.data_path.exists():
+            return headers
+        if self.meta.get("etag"):
+            headers["If-None-Match"] = self.meta["etag"]
+        if self.meta.get("last_modified"):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+        return headers
+
+    def fetch(self, max_age=None):
+        """
+        Return the current frame, downloading only what changed upstream.
+
+        With ``max_age`` set, a snapshot checked less than that many seconds
+        ago is returned from disk without any network request. Concurrent
+        fetches of the same snapshot share a single download.
+        """
+        age = self.age()
+        if max_age is not None and age is not None and age < max_age and self.load() is not None:
+            return self._frame
+        return flights.do(("snapshot", str(self.data_path)), self._download, self.min_interval)
+
+    def _download(self):
+        from .sources import _runner   # sources builds its URL adapters on this module
+        return _runner.run(self.request)
+
+    async def request(self, client):
+        """Send one conditional request with ``client`` and apply the answer, parsing in a worker thread"""
+        response = await client.get(self.url, headers=self.conditional_headers(), timeout=self.timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return await asyncio.to_thread(self.update, response.status_code, response.headers, response.content)
+
+    def update(self, status, headers, body):
+        """Apply one download result to the snapshot and return the current frame"""
+        validators = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "checked_at": time.time(),
+        }
+        if status == 304 and self.load() is not None:
+            self.status = "not-modified"
+            self._write_meta(**{k: v for k, v in validators.items() if v is not None})
+            return self._frame
+
+        digest = hashlib.sha256(body).hexdigest()
+        if digest == self.meta.get("sha256") and self.load() is not None:
+            self.status = "unchanged"
+            self._write_meta(**validators)
+            return self._frame
+
+        frame = self.parse(io.BytesIO(body))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.data_path, lambda fh: frame.to_parquet(fh, index=False))
+        self._write_meta(**validators, sha256=digest, parsed_at=validators["checked_at"], rows=len(frame))
+        self._frame = frame
+        self.status = "parsed"
+        return frame
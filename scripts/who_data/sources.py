@@ -0,0 +1,264 @@
+"""
+Pluggable data-source adapters.
+
+Every adapter turns one place the tracker is published into a DataFrame:
+
+* ``CsvUrlSource``   - a published CSV export (the Google Sheets feed)
+* ``XlsxUrlSource``  - the XLSX export used by ``app/api/who-data/route.ts``
+* ``LocalFileSource`` - a CSV, XLSX or Parquet file on disk
+* ``SQLiteSource``   - a SQLite mirror of the event table
+* ``SyntheticSource`` - generated events for offline benchmarks
+
+Fetches are coroutines. ``load_sources()`` runs several of them at once
+on a long-lived event loop that owns one pooled ``httpx.AsyncClient``, so
+connections to Google are reused from one refresh to the next. URL
+sources keep a Parquet snapshot and send conditional requests (see
+``snapshot.py``). Parsing runs in worker threads so it never blocks other
+downloads. Every source has a ``CircuitBreaker`` that bounds how long a
+fetch may take and fails fast while its upstream is down (see
+``breaker.py``).
+"""
+import asyncio
+import functools
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pandas as pd
+
+from .breaker import CircuitBreaker
+from .schema import DATETIME, EVENT_SCHEMA
+from .snapshot import SnapshotCache
+from .synthetic import generate_events
+from .xlsx import read_workbook
+
+
+INGEST_SCHEMA = {name: kind for name, kind in EVENT_SCHEMA.items() if kind != DATETIME}
+
+
+def _identity(df):
+    return df
+
+
+def _name_of(fn):
+    return f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+
+
+def read_xlsx(raw, sheets=None):
+    """Stream worksheets in read-only mode and stack them into one typed frame"""
+    # Dates are left to ``prepare``, which knows whether the sheet is day-first
+    frame, _ = read_workbook(raw, sheets, schema=INGEST_SCHEMA)
+    return frame
+
+
+class _Runner:
+    """Event loop on a daemon thread, shared by every synchronous caller"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+
+    def _start(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="who-data-io", daemon=True).start()
+
+        async def make_client():
+            limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(30.0), follow_redirects=True)
+
+        self._client = asyncio.run_coroutine_threadsafe(make_client(), self._loop).result()
+
+    def run(self, make_coro):
+        """Run ``make_coro(client)`` on the shared loop and wait for its result"""
+        with self._lock:
+            if self._loop is None:
+                self._start()
+        return asyncio.run_coroutine_threadsafe(make_coro(self._client), self._loop).result()
+
+
+_runner = _Runner()
+
+
+class DataSource:
+    """Somewhere the event table can be loaded from"""
+
+    def __init__(self, prepare=None, breaker=None):
+        self.prepare = prepare or _identity
+        self.breaker = breaker or CircuitBreaker()
+
+    async def fetch(self, client, max_age=None):
+        raise NotImplementedError
+
+    def load(self, max_age=None):
+        """Fetch this source synchronously"""
+        return load_sources(self, max_age=max_age)[0]
+
+    def cached(self):
+        """The last frame kept on disk for this source, if it keeps one"""
+        return None
+
+    @property
+    def checked_at(self):
+        """When the frame returned by ``cached()`` was last confirmed upstream"""
+        return None
+
+
+class _UrlSource(DataSource):
+    """Published export fetched over HTTP with a Parquet snapshot"""
+    kind = None
+
+    def __init__(self, url, prepare=None, directory=None):
+        super().__init__(prepare)
+        self.url = url
+        name = hashlib.sha1(f"{url}|{self.kind}|{_name_of(self.prepare)}".encode()).hexdigest()[:16]
+        self.snapshot = SnapshotCache(url, parse=self.parse, name=name, directory=directory)
+
+    def parse(self, raw):
+        raise NotImplementedError
+
+    def cached(self):
+        return self.snapshot.load()
+
+    @property
+    def checked_at(self):
+        return self.snapshot.meta.get("checked_at")
+
+    async def fetch(self, client, max_age=None):
+        age = self.snapshot.age()
+        if max_age is not None and age is not None and age < max_age and self.snapshot.load() is not None:
+            return self.snapshot.load()
+        return await self.snapshot.request(client)
+
+
+class CsvUrlSource(_UrlSource):
+    kind = "csv"
+
+    def parse(self, raw):
+        return self.prepare(pd.read_csv(raw))
+
+
+class XlsxUrlSource(_UrlSource):
+    kind = "xlsx"
+
+    def __init__(self, url, prepare=None, directory=None, sheets=None):
+        self.sheets = sheets
+        super().__init__(url, prepare, directory)
+
+    def parse(self, raw):
+        return self.prepare(read_xlsx(raw, self.sheets))
+
+
+class LocalFileSource(DataSource):
+    """CSV, XLSX or Parquet file, re-read only when it changes on disk"""
+
+    def __init__(self, path, prepare=None):
+        super().__init__(prepare)
+        self.path = Path(path)
+        self._signature = None
+        self._frame = None
+
+    def _read(self):
+        suffix = self.path.suffix.lower()
+        if suffix in (".xlsx", ".xlsm"):
+            return read_xlsx(self.path)
+        if suffix == ".parquet":
+            return pd.read_parquet(self.path)
+        return pd.read_csv(self.path)
+
+    async def fetch(self, client, max_age=None):
+        stat = self.path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            self._frame = self.prepare(await asyncio.to_thread(self._read))
+            self._signature = signature
+        return self._frame
+
+    def cached(self):
+        return self._frame
+
+
+class SQLiteSource(DataSource):
+    """Event table mirrored into a SQLite database"""
+
+    def __init__(self, path, table="events", prepare=None):
+        super().__init__(prepare)
+        self.path = str(path)
+        self.table = table
+
+    def _read(self):
+        with sqlite3.connect(f"file:{self.path}?mode=ro", uri=True) as conn:
+            return pd.read_sql_query(f'SELECT * FROM "{self.table}"', conn)
+
+    async def fetch(self, client, max_age=None):
+        return self.prepare(await asyncio.to_thread(self._read))
+
+
+class SyntheticSource(DataSource):
+    """Deterministic generated events (see ``synthetic.py``)"""
+
+    def __init__(self, rows=10_000, seed=0, prepare=None):
+        super().__init__(prepare)
+        self.rows = rows
+        self.seed = seed
+        self._frame = None
+
+    async def fetch(self, client, max_age=None):
+        if self._frame is None:
+            self._frame = self.prepare(await asyncio.to_thread(generate_events, self.rows, self.seed))
+        return self._frame
+
+    def cached(self):
+        return self._frame
+
+
+def write_sqlite_mirror(df, path, table="events"):
+    """Replace ``table`` in the SQLite database at ``path`` with ``df``"""
+    plain = df.copy()
+    for col in plain.columns:
+        if isinstance(plain[col].dtype, pd.CategoricalDtype):
+            plain[col] = plain[col].astype(object)
+    with sqlite3.connect(str(path)) as conn:
+        plain.to_sql(table, conn, if_exists="replace", index=False)
+
+
+async def gather_sources(sources, client, max_age=None):
+    """Fetch several sources concurrently with one HTTP client, each behind its breaker"""
+    return await asyncio.gather(*(
+        source.breaker.run(lambda source=source: source.fetch(client, max_age=max_age)) for source in sources
+    ))
+
+
+def load_sources(*sources, max_age=None):
+    """Fetch sources concurrently and return their frames in the same order"""
+    return _runner.run(lambda client: gather_sources(sources, client, max_age=max_age))
+
+
+@functools.lru_cache(maxsize=None)
+def source_from_uri(uri, prepare=None):
+    """
+    Pick an adapter for ``uri``.
+
+    The same URI and ``prepare`` always give back the same adapter, so its
+    snapshot and file-change tracking carry over between calls.
+
+    ``sqlite:///events.db?table=events`` (relative) or ``sqlite:////abs/events.db``
+    selects the SQLite mirror, ``synthetic:?rows=100000&seed=0`` generated
+    events, an http(s) URL ending in ``.xlsx`` or asking for ``output=xlsx`` the XLSX
+    export, any other URL the CSV export, and anything else a local file.
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme == "synthetic":
+        query = parse_qs(parsed.query)
+        rows, seed = int(query.get("rows", ["10000"])[0]), int(query.get("seed", ["0"])[0])
+        return SyntheticSource(rows, seed, prepare=prepare)
+    if parsed.scheme == "sqlite":
+        table = parse_qs(parsed.query).get("table", ["events"])[0]
+        return SQLiteSource(parsed.path[1:], table=table, prepare=prepare)
+    if parsed.scheme in ("http", "https"):
+        xlsx = parsed.path.endswith(".xlsx") or parse_qs(parsed.query).get("output") == ["xlsx"]
+        return (XlsxUrlSource if xlsx else CsvUrlSource)(uri, prepare=prepare)
+    return LocalFileSource(uri, prepare=prepare)
@@ -0,0 +1,158 @@
+"""
+Process-wide holder of the current event table.
+
+A refresh pulls a fresh frame from the loader, diffs it against the frame
+it already holds and hands only the delta to subscribers. The version only
+moves when something actually changed, so anything cached per version
+survives refreshes that bring nothing new.
+
+The frame and its version are published together as one tuple, so a
+reader never sees a new frame with an old version or the other way round.
+"""
+import threading
+import time
+
+import numpy as np
+
+from .delta import Delta, diff, event_keys, row_hashes
+from .singleflight import flights
+
+
+class EventStore:
+    """Current event table plus the deltas that produced it"""
+
+    def __init__(self, loader, ttl=None, min_interval=0, checked_at=None, fallback=None):
+        """
+        ``checked_at``, when given, is called after every pull for the time
+        its data was last confirmed upstream; a loader that may answer from
+        a saved snapshot reports the snapshot's time instead of the pull's.
+        ``fallback`` returns the last good table kept outside the process
+        (a source's snapshot on disk) or None; it stands in when the first
+        pull fails.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.min_interval = min_interval
+        self.checked_at = checked_at
+        self.fallback = fallback
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.refreshed_at = None
+        self.last_delta = None
+        self.last_error = None
+        self.background = None
+        self._current = (None, 0)
+        self._source = None
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._listeners = []
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    @property
+    def frame(self):
+        return self._current[0]
+
+    @property
+    def version(self):
+        return self._current[1]
+
+    def view(self):
+        """The current ``(frame, version)`` pair, read atomically"""
+        return self._current
+
+    def derived(self, name, build):
+        """
+        ``build(frame)`` for the current frame, computed once per version.
+
+        Indexes and lookup tables built from the event table are shared by
+        every session and rebuilt only when a refresh actually changed it.
+        Sessions that ask at the same moment share one build.
+        """
+        frame, version = self._current
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = flights.do(("derived", id(self), name, version), lambda: build(frame))
+        with self._lock:
+            if self._current[1] == version:
+                self._derived[name] = (version, value)
+        return value
+
+    def subscribe(self, callback):
+        """Call ``callback(store, delta)`` after every change"""
+        self._listeners.append(callback)
+
+    def age(self):
+        """Seconds since the data was last confirmed upstream, or None before the first pull"""
+        return None if self.refreshed_at is None else time.time() - self.refreshed_at
+
+    def is_stale(self):
+        age = self.age()
+        return self.ttl is not None and age is not None and age >= self.ttl
+
+    def current(self):
+        """
+        Return the event table.
+
+        Only the very first call waits on the loader. After that a stale
+        table is refreshed inline, unless a background refresher is attached,
+        in which case the last good table is served while it works. A failed
+        refresh raises only when there is no table to serve at all.
+        """
+        if self.frame is None or (self.background is None and self.is_stale()):
+            try:
+                self.refresh()
+            except Exception:
+                if self.frame is None:
+                    raise
+        return self.frame
+
+    def refresh(self):
+        """
+        Pull from the loader and apply whatever changed.
+
+        Concurrent refreshes share one pull, and a refresh within
+        ``min_interval`` seconds of the last one returns its delta again
+        without touching the loader. A failed pull is remembered in
+        ``last_error`` and re-raised; the current table stays in place. When
+        there is no table yet, the ``fallback`` table is applied instead and
+        the error is kept for the degraded notice.
+        """
+        try:
+            return flights.do(("store", id(self)), self._pull, self.min_interval)
+        except Exception as e:
+            saved = self.fallback() if self.frame is None and self.fallback is not None else None
+            if saved is not None:
+                checked_at = self.checked_at() if self.checked_at is not None else None
+                delta = self.apply(saved, refreshed_at=checked_at)
+            self.last_error = (time.time(), e)
+            if saved is None:
+                raise
+            return delta
+
+    def _pull(self):
+        new = self.loader()
+        return self.apply(new, refreshed_at=self.checked_at() if self.checked_at is not None else None)
+
+    def apply(self, new, refreshed_at=None):
+        """Replace the event table with ``new`` and return the delta"""
+        with self._lock:
+            self.refreshed_at = refreshed_at or time.time()
+            frame, version = self._current
+            if new is self._source:
+                # The loader handed back the very frame it gave last time
+                return Delta(*(frame.iloc[:0],) * 4)
+            self._source = new
+
+            new = new.reset_index(drop=True)
+            keys, hashes = event_keys(new), row_hashes(new)
+            old = frame if frame is not None else new.iloc[:0]
+            delta = diff(old, self.keys, self._hashes, new, keys, hashes)
+            if frame is not None and delta.empty:
+                return delta
+
+            self.keys, self._hashes = keys, hashes
+            self.last_delta = delta
+            self._current = (new, version + 1)
+            for callback in self._listeners:
+                callback(self, delta)
+        return delta
@@ -0,0 +1,162 @@
+"""
+Deterministic synthetic WHO events for offline benchmarks.
+
+``generate_events(rows, seed)`` builds an event table with the tracker's
+columns and the same seed always gives the same table. Values are skewed
+the way the real feed is: a handful of countries and diseases account for
+most events, higher grades are rarer, case counts are heavy-tailed and
+recent weeks hold more reports than old ones. Some descriptions carry HTML
+like the ones pasted into the sheet.
+
+``write_fixtures()`` saves a table as CSV, XLSX and Parquet so every loader,
+filter and renderer can be exercised without the network:
+
+    python scripts/benchmark.py fixtures --rows 1000000 --out fixtures/
+
+or point a dashboard straight at generated data with
+``WHO_DATA_SOURCE="synthetic:?rows=100000&seed=0"``.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Country, capital latitude, longitude
+COUNTRIES = [
+    ("Democratic Republic of the Congo", -4.32, 15.31), ("Nigeria", 9.08, 7.40), ("Ethiopia", 9.03, 38.74),
+    ("South Sudan", 4.85, 31.58), ("Mozambique", -25.97, 32.57), ("Malawi", -13.96, 33.77),
+    ("Kenya", -1.29, 36.82), ("Uganda", 0.35, 32.58), ("Cameroon", 3.85, 11.50), ("Niger", 13.51, 2.11),
+    ("Chad", 12.13, 15.06), ("Burkina Faso", 12.37, -1.52), ("Mali", 12.64, -8.00), ("Zambia", -15.42, 28.28),
+    ("Zimbabwe", -17.83, 31.05), ("United Republic of Tanzania", -6.79, 39.21), ("Angola", -8.84, 13.23),
+    ("Madagascar", -18.88, 47.51), ("Central African Republic", 4.39, 18.56), ("Ghana", 5.60, -0.19),
+    ("Guinea", 9.64, -13.58), ("Sierra Leone", 8.48, -13.23), ("Liberia", 6.30, -10.80),
+    ("Senegal", 14.69, -17.45), ("Côte d'Ivoire", 5.36, -4.01), ("Burundi", -3.38, 29.36),
+    ("Rwanda", -1.94, 30.06), ("South Africa", -25.75, 28.19), ("Algeria", 36.75, 3.06),
+    ("Botswana", -24.65, 25.91), ("Namibia", -22.56, 17.08), ("Benin", 6.50, 2.60), ("Togo", 6.13, 1.22),
+    ("Congo", -4.27, 15.28), ("Gabon", 0.42, 9.47), ("Eritrea", 15.32, 38.93), ("Mauritania", 18.08, -15.98),
+]
+
+# Disease, case fatality ratio
+DISEASES = [
+    ("Cholera", 0.02), ("Mpox", 0.03), ("Measles", 0.01), ("Malaria", 0.005), ("Dengue", 0.002),
+    ("Meningitis", 0.08), ("Anthrax", 0.05), ("Diphtheria", 0.1), ("Yellow Fever", 0.15),
+    ("Lassa Fever", 0.18), ("Poliomyelitis (cVDPV2)", 0.0), ("Ebola Virus Disease", 0.4),
+    ("Marburg Virus Disease", 0.5), ("Rift Valley Fever", 0.1), ("Typhoid", 0.01), ("Hepatitis E", 0.03),
+    ("Chikungunya", 0.001), ("Plague", 0.1), ("Crimean-Congo Haemorrhagic Fever", 0.3), ("Food Insecurity", 0.0),
+]
+
+GRADES = (["Ungraded", "Grade 1", "Grade 2", "Grade 3", "Protracted 1", "Protracted 2", "Protracted 3"],
+          [0.32, 0.25, 0.2, 0.1, 0.05, 0.05, 0.03])
+STATUSES = (["New", "Ongoing", "Closed"], [0.18, 0.67, 0.15])
+LOCATIONS = ["Capital region", "Border districts", "Multiple provinces", "Northern region", "Southern region",
+             "Coastal areas", "Refugee camps", "Rural districts"]
+EVENT_TYPES = (["Outbreak", "Humanitarian Crisis", "Epidemic", "Natural Disaster"], [0.74, 0.13, 0.08, 0.05])
+GRADE_SCALE = {"Ungraded": 0.5, "Grade 1": 1.0, "Grade 2": 2.5, "Grade 3": 6.0,
+               "Protracted 1": 1.5, "Protracted 2": 3.0, "Protracted 3": 5.0}
+XLSX_MAX_ROWS = 1_048_575   # a worksheet holds 1,048,576 rows including the header
+
+SENTENCES = [
+    "Cases reported in several districts.",
+    "Contact tracing ongoing.",
+    "Vaccination campaign planned.",
+    "Cross-border transmission suspected.",
+    "Surveillance and case management strengthened.",
+    "Laboratory confirmation pending.",
+    "Flooding & displacement are contributing factors.",
+    "IMS activated; partners supporting the response.",
+]
+
+
+def zipf_weights(n, exponent=1.1):
+    """Probabilities for ``n`` ranked values where rank ``k`` is drawn in proportion to ``1 / k**exponent``"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def generate_events(rows, seed=0, end="2025-12-31", days=3 * 365, html_share=0.3):
+    """
+    ``rows`` synthetic events reported over the ``days`` up to ``end``.
+
+    Columns are plain (strings, floats, ints and datetimes) like a freshly
+    parsed export, so loaders still apply the schema themselves.
+    """
+    rng = np.random.default_rng(seed)
+    countries = rng.choice(len(COUNTRIES), rows, p=zipf_weights(len(COUNTRIES)))
+    diseases = rng.choice(len(DISEASES), rows, p=zipf_weights(len(DISEASES), 1.3))
+    grades = np.asarray(GRADES[0])[rng.choice(len(GRADES[0]), rows, p=GRADES[1])]
+
+    names = np.array([c[0] for c in COUNTRIES], dtype=object)
+    lat = np.array([c[1] for c in COUNTRIES])[countries] + rng.normal(0, 1.5, rows)
+    lon = np.array([c[2] for c in COUNTRIES])[countries] + rng.normal(0, 1.5, rows)
+
+    scale = pd.Series(grades).map(GRADE_SCALE).to_numpy()
+    cases = np.ceil(rng.lognormal(3.5, 1.6, rows) * scale).astype(np.int64)
+    cfr = np.array([d[1] for d in DISEASES])[diseases]
+    deaths = rng.binomial(cases, cfr)
+
+    # Recent weeks carry more reports than old ones
+    age_days = np.minimum(rng.exponential(days / 4, rows), days - 1).astype(np.int64)
+    report_date = pd.Timestamp(end).normalize() - pd.to_timedelta(age_days, unit="D")
+    iso = report_date.isocalendar()
+
+    frame = pd.DataFrame({
+        "country": names[countries],
+        "disease": np.array([d[0] for d in DISEASES], dtype=object)[diseases],
+        "grade": grades,
+        "status": np.asarray(STATUSES[0])[rng.choice(3, rows, p=STATUSES[1])],
+        "event_type": np.asarray(EVENT_TYPES[0])[rng.choice(4, rows, p=EVENT_TYPES[1])],
+        "lat": lat.round(4),
+        "lon": lon.round(4),
+        "cases": cases,
+        "deaths": deaths,
+        "event_count": cases,
+        "location": np.asarray(LOCATIONS, dtype=object)[rng.integers(0, len(LOCATIONS), rows)],
+        "report_date": report_date,
+        "WEEKLINE": iso["year"].astype(str).to_numpy() + "-W" + iso["week"].astype(str).str.zfill(2).to_numpy(),
+    })
+    frame["description"] = _descriptions(rng, frame, html_share)
+    return frame
+
+
+def _descriptions(rng, frame, html_share):
+    text = frame["disease"] + " " + frame["event_type"].str.lower() + " in " + frame["country"] + ". " \
+        + frame["cases"].astype(str) + " cases and " + frame["deaths"].astype(str) + " deaths reported."
+    for _ in range(2):
+        picks = rng.integers(0, len(SENTENCES), len(frame))
+        extra = pd.Series(np.asarray(SENTENCES, dtype=object)[picks], index=frame.index)
+        text = text + " " + extra
+    html = rng.random(len(frame)) < html_share
+    text[html] = "<p>" + text[html].str.replace("&", "&amp;", regex=False) + "</p>"
+    return text
+
+
+def write_xlsx(df, path, sheets=1):
+    """Split ``df`` across ``sheets`` tabs of a new workbook"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for i, part in enumerate(np.array_split(np.arange(len(df)), sheets)):
+        sheet = workbook.create_sheet(f"Events {i + 1}")
+        sheet.append(list(df.columns))
+        for row in df.iloc[part].itertuples(index=False):
+            sheet.append([None if pd.isna(v) else v for v in row])
+    workbook.save(path)
+
+
+def write_fixtures(df, directory, formats=("csv", "xlsx", "parquet"), name="events", sheets=None):
+    """Write ``df`` as ``<name>.<format>`` in ``directory`` and return the paths written"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = directory / f"{name}.{fmt}"
+        if fmt == "csv":
+            df.to_csv(path, index=False, date_format="%Y-%m-%d")
+        elif fmt == "parquet":
+            df.to_parquet(path, index=False)
+        elif fmt == "xlsx":
+            write_xlsx(df, path, sheets or max(1, -(-len(df) // XLSX_MAX_ROWS)))
+        else:
+            raise ValueError(f"unknown fixture format {fmt!r}")
+        paths.append(path)
+    return paths
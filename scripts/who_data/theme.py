@@ -0,0 +1,40 @@
+"""
+Theme stylesheets compiled once per process.
+
+The two-theme dashboards used to pick one of two ``<style>`` literals on
+every run and rebuild their theme-dependent inline styles (tooltip colours,
+grade card shadows) with a chain of ``if theme == 'light'`` expressions. A
+``Theme`` holds the minified stylesheet and a token dictionary for the
+inline styles; the apps build both themes in ``st.cache_resource`` and only
+look them up afterwards. The stylesheet goes out through ``st.html``, which
+puts style-only HTML in the event container instead of the page layout.
+"""
+import re
+
+COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+WHITESPACE = re.compile(r"\s+")
+# Spaces next to these are never significant outside strings; ":" only loses the space after it,
+# since "a :hover" and "a:hover" are different selectors
+PUNCTUATION = re.compile(r"\s*([{};,>])\s*|(:)\s+")
+
+
+def minify_css(css):
+    """``css`` without comments, redundant whitespace and the last ``;`` of each block"""
+    css = WHITESPACE.sub(" ", COMMENTS.sub("", css))
+    css = PUNCTUATION.sub(lambda m: m.group(1) or m.group(2), css)
+    return css.replace(";}", "}").strip()
+
+
+class Theme:
+    """One dashboard theme: its stylesheet, minified once, and the tokens inline styles are built from"""
+
+    def __init__(self, name, css, **tokens):
+        self.name = name
+        self.tokens = tokens
+        self.stylesheet = f"<style>{minify_css(css)}</style>"
+
+    def __getitem__(self, token):
+        return self.tokens[token]
+
+    def __repr__(self):
+        return f"Theme({self.name!r}, {len(self.stylesheet):,} bytes of CSS)"
@@ -0,0 +1,165 @@
+"""
+Filtered views shared across sessions.
+
+Analysts tend to open the dashboards with the same few selections. A
+``FilteredViews`` keeps the filtered tables (and anything else computed
+from one, such as KPI counts) in an LRU keyed by the snapshot version and
+the normalised selection, so the second session asking for "Grade 3 only"
+gets the first session's result. The cache is bounded by an estimate of
+the bytes it holds and evicts least recently used entries to stay within
+it. Entries from older versions are dropped as soon as the store moves on.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .cube import UNDATED, LiveCube
+from .filters import RANGE_COLUMNS, FilterIndex
+from .singleflight import flights
+
+
+def selection_key(selections):
+    """Frozen, order-independent form of a sidebar selection; empty filters are left out"""
+    return tuple(sorted(
+        (name, tuple(values) if name in RANGE_COLUMNS else tuple(sorted(set(values), key=str)))
+        for name, values in selections.items()
+        if values is not None and len(values) > 0
+    ))
+
+
+def estimate_bytes(value):
+    """Bytes a cached value adds on top of the snapshot it was built from"""
+    if isinstance(value, pd.DataFrame):
+        # Shallow: object columns of a gathered frame point at the snapshot's strings
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=False, deep=False))
+    if isinstance(value, (pd.Index, np.ndarray)):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class FilteredViews:
+    """Size-bounded LRU of results keyed by (version, kind, selection)"""
+
+    def __init__(self, store, budget=256 * 2**20):
+        self.store = store
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._cube = None
+        store.subscribe(lambda store, delta: self.drop_before(store.version))
+
+    def cached(self, kind, selections, build):
+        """
+        ``build(index, selections)`` for the current snapshot, served from the LRU when possible.
+
+        ``kind`` names what is being built, so the filtered table and the
+        figures derived from it can share one budget.
+        """
+        version = self.store.version
+        key = (version, kind, selection_key(selections))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        index = self.index()
+        value = flights.do(("view", id(self), key), lambda: build(index, selections))
+        size = estimate_bytes(value)
+        with self._lock:
+            if size <= self.budget and key not in self._entries and self.store.version == version:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                while self.bytes > self.budget:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.bytes -= evicted
+                    self.evictions += 1
+        return value
+
+    def index(self):
+        """The current snapshot's ``FilterIndex``, built once per version"""
+        return self.store.derived("filters", FilterIndex)
+
+    def select(self, **selections):
+        """The event table filtered by ``selections``, as ``FilterIndex.select`` would return it"""
+        if not selection_key(selections):
+            return self.index().frame
+        return self.cached("rows", selections, lambda index, sel: index.select(**sel))
+
+    def recent(self, n, **selections):
+        """The ``n`` newest rows matching ``selections``, shared by the ticker and the feed"""
+        return self.cached(("recent", n), selections, lambda index, sel: index.recent(n, **sel))
+
+    def feed(self, template, n, **selections):
+        """The Recent Signals panel for ``selections``, rendered once per snapshot, selection and template"""
+        return self.cached(("feed", template.name, n), selections,
+                           lambda index, sel: template.render(self.recent(n, **sel)))
+
+    def deck(self, event_map, **selections):
+        """The map of ``selections`` as a Deck for ``st.pydeck_chart``, or None when nothing has a location"""
+        spec = self.cached(("deck", event_map.name), selections,
+                           lambda index, sel: event_map.spec(self.select(**sel)))
+        return event_map.deck(spec) if spec is not None else None
+
+    def kpis(self, **selections):
+        """Every metric-card figure for ``selections``, computed once per selection"""
+        return self.cached("kpis", selections, lambda index, sel: index.kpis(**sel))
+
+    def cube(self):
+        """The snapshot's ``EventCube``, kept current across refreshes by applying their deltas"""
+        with self._lock:
+            if self._cube is None:
+                self._cube = LiveCube(self.store)
+        return self._cube.current()
+
+    def weekly(self, weeks, **selections):
+        """Events per epi-week over the last ``weeks`` weeks for ``selections``, rolled up from the cube"""
+        def build(index, sel):
+            counts = self.cube().slice(**sel).rollup("epi_week")["events"].drop(UNDATED, errors="ignore")
+            if counts.empty:
+                return counts
+            counts.index = pd.to_datetime(counts.index)
+            span = pd.date_range(end=counts.index.max(), periods=weeks, freq="W-MON")
+            return counts.reindex(span, fill_value=0).rename_axis("epi_week")
+        return self.cached(("weekly", weeks), selections, build)
+
+    def drop_before(self, version):
+        """Forget everything computed from snapshots older than ``version``"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] < version]:
+                self.bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "budget": self.budget,
+            }
+
+    def describe(self):
+        """One-line summary of the counters for the sidebar"""
+        s = self.stats()
+        return (f"View cache: {s['hits']} hits · {s['misses']} misses ({s['hit_rate']:.0%}) · "
+                f"{s['entries']} views · {s['bytes'] / 2**20:.1f} of {s['budget'] / 2**20:.0f} MB · "
+                f"{s['evictions']} evicted")